@@ -0,0 +1,271 @@
+"""
+只读 JSON API：对外提供 BikeDataService 的当前快照
+
+其他工具不必抓取 Streamlit 页面或自己请求 OpenAPI，整个进程只由一个后台线程访问上游。
+每个快照版本的响应体只序列化（并 gzip 压缩）一次，之后的请求直接返回内存中的字节；
+ETag 由快照版本决定，客户端带 If-None-Match 重新验证时返回 304。
+
+接口:
+    GET /api/v1/snapshot              全部站点（字段名与 bikeList 相同，数值为数字）
+    GET /api/v1/status                无法租赁 / 无法归还的站点和分级统计（get_station_status）
+    GET /api/v1/metrics               状态指标（get_status_metrics）
+    GET /api/v1/stations/<stationId>  单个站点
+    GET /api/v1/health                当前快照版本、时效以及最近一次刷新是否失败（不缓存）
+
+运行:
+    python -m api.snapshot_api [--host 127.0.0.1] [--port 8099] [--no-refresh]
+"""
+import argparse
+import gzip
+import json
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from flask import Flask, Response, request
+
+try:
+    from config.settings import API_CONFIG
+    from components.data_service import bike_service, classify_snapshot
+    from utils.data_refresh import start_refresher
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config.settings import API_CONFIG
+    from components.data_service import bike_service, classify_snapshot
+    from utils.data_refresh import start_refresher
+
+logger = logging.getLogger(__name__)
+
+# API 输出的站点字段（与 bikeList 的字段名一致）
+STATION_COLUMNS = [
+    'stationId', 'stationName', 'parkingBikeTotCnt', 'rackTotCnt', 'shared',
+    'stationLatitude', 'stationLongitude', 'district'
+]
+
+# 序列化后的响应体：原始字节、gzip 字节（太小时为 None）、ETag（不含引号）
+Body = namedtuple('Body', ['raw', 'gzipped', 'etag'])
+
+def _dumps(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+class SnapshotBodies:
+    """
+    一个快照版本的全部响应体
+
+    各接口的响应体在第一次请求时序列化，同一版本之后的请求都复用；
+    单站点的响应体按站点逐个缓存。
+    """
+    def __init__(self, snapshot, gzip_min_bytes=1024, gzip_level=6):
+        self.snapshot = snapshot
+        self.gzip_min_bytes = gzip_min_bytes
+        self.gzip_level = gzip_level
+        self._lock = threading.Lock()
+        self._bodies = {}
+        self._station_rows = None
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    def get(self, name, build):
+        """返回名为 name 的响应体，没有时调用 build() 生成 payload 字节"""
+        body = self._bodies.get(name)
+        if body is None:
+            with self._lock:
+                body = self._bodies.get(name)
+                if body is None:
+                    body = self._bodies[name] = self._make_body(name, build())
+        return body
+
+    def _make_body(self, name, raw):
+        gzipped = None
+        if len(raw) >= self.gzip_min_bytes:
+            # mtime=0：同一内容压缩结果相同
+            gzipped = gzip.compress(raw, compresslevel=self.gzip_level, mtime=0)
+        return Body(raw, gzipped, f"v{self.version}-{name}")
+
+    def _meta(self):
+        return {'version': self.version, 'fetched_at': self.snapshot.fetched_at.isoformat(timespec='seconds')}
+
+    def snapshot_body(self):
+        frame = self.snapshot.data[[col for col in STATION_COLUMNS if col in self.snapshot.data.columns]]
+        # 站点数组直接由 pandas 序列化（坐标保留 6 位小数，约 0.1m）
+        stations = frame.to_json(orient='records', force_ascii=False, double_precision=6)
+        meta = _dumps(dict(self._meta(), count=len(frame)))
+        return meta[:-1] + b',"stations":' + stations.encode('utf-8') + b'}'
+
+    def status_body(self):
+        classified = classify_snapshot(self.snapshot)
+        return _dumps(dict(self._meta(), **classified))
+
+    def metrics_body(self):
+        classified = classify_snapshot(self.snapshot)
+        return _dumps(dict(
+            self._meta(),
+            total_stations=classified['total_stations'],
+            no_rental_count=classified['no_rental']['count'],
+            no_return_count=classified['no_return']['count'],
+            no_racks_count=classified['no_racks']['count']
+        ))
+
+    def station_position(self, station_id):
+        """stationId -> 快照中的行位置，没有时返回 None"""
+        if self._station_rows is None:
+            with self._lock:
+                if self._station_rows is None:
+                    ids = self.snapshot.data['stationId'].astype(str).tolist()
+                    self._station_rows = {station_id: i for i, station_id in enumerate(ids)}
+        return self._station_rows.get(station_id)
+
+    def station_body(self, position):
+        frame = self.snapshot.data
+        row = frame.iloc[[position]][[col for col in STATION_COLUMNS if col in frame.columns]]
+        station = json.loads(row.to_json(orient='records', force_ascii=False, double_precision=6))[0]
+        return _dumps(dict(self._meta(), station=station))
+
+def _matches(if_none_match, etag):
+    """If-None-Match 是否包含 etag（忽略 W/ 前缀，gzip 与原始表示视为同一版本）"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == etag or tag == f"{etag}-gz":
+            return True
+    return False
+
+def _accepts_gzip(accept_encoding):
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+def _json_error(status, message):
+    return Response(_dumps({'error': message}), status=status, content_type='application/json; charset=utf-8')
+
+def create_app(service=None, gzip_min_bytes=None, gzip_level=None):
+    """
+    创建 API 服务
+
+    Args:
+        service: BikeDataService（默认使用进程级的 bike_service）
+        gzip_min_bytes / gzip_level: 压缩设置，默认取 API_CONFIG
+    """
+    service = service or bike_service
+    gzip_min_bytes = API_CONFIG['gzip_min_bytes'] if gzip_min_bytes is None else gzip_min_bytes
+    gzip_level = API_CONFIG['gzip_level'] if gzip_level is None else gzip_level
+    app = Flask(__name__)
+    state = {'bodies': None}
+    state_lock = threading.Lock()
+
+    def current_bodies():
+        """
+        当前快照版本的响应体集合，版本变化时整体替换（旧版本的字节随之释放）
+
+        上游内容未变时快照版本不变，继续使用已生成的响应体（fetched_at 为该版本首次抓取的时间）。
+        """
+        snapshot = service.get_snapshot()
+        bodies = state['bodies']
+        if bodies is None or bodies.version != snapshot.version:
+            with state_lock:
+                bodies = state['bodies']
+                if bodies is None or bodies.version != snapshot.version:
+                    bodies = state['bodies'] = SnapshotBodies(snapshot, gzip_min_bytes, gzip_level)
+        return bodies
+
+    def respond(body):
+        headers = {'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        use_gzip = body.gzipped is not None and _accepts_gzip(request.headers.get('Accept-Encoding'))
+        etag = f"{body.etag}-gz" if use_gzip else body.etag
+        headers['ETag'] = f'"{etag}"'
+        if _matches(request.headers.get('If-None-Match'), body.etag):
+            return Response(status=304, headers=headers)
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
+        return Response(
+            body.gzipped if use_gzip else body.raw,
+            status=200, headers=headers, content_type='application/json; charset=utf-8'
+        )
+
+    def cached(name, build, check=None):
+        """
+        返回缓存的响应体（没有时用 build(bodies) 生成）
+
+        快照无法载入或为空时返回 503；check(bodies) 返回错误响应时直接返回它（例如站点不存在）。
+        """
+        try:
+            bodies = current_bodies()
+        except Exception as e:
+            logger.error(f"Error loading snapshot: {str(e)}")
+            return _json_error(503, 'snapshot unavailable')
+        if bodies.snapshot.data.empty:
+            return _json_error(503, 'snapshot unavailable')
+        if check is not None:
+            error = check(bodies)
+            if error is not None:
+                return error
+        return respond(bodies.get(name, lambda: build(bodies)))
+
+    @app.route('/api/v1/snapshot')
+    def snapshot():
+        return cached('snapshot', SnapshotBodies.snapshot_body)
+
+    @app.route('/api/v1/status')
+    def status():
+        return cached('status', SnapshotBodies.status_body)
+
+    @app.route('/api/v1/metrics')
+    def metrics():
+        return cached('metrics', SnapshotBodies.metrics_body)
+
+    @app.route('/api/v1/stations/<station_id>')
+    def station(station_id):
+        def build(bodies):
+            return bodies.station_body(bodies.station_position(station_id))
+
+        def check(bodies):
+            if bodies.station_position(station_id) is None:
+                return _json_error(404, f'station {station_id} not found')
+            return None
+        return cached(f'station:{station_id}', build, check)
+
+    @app.route('/api/v1/health')
+    def health():
+        snapshot = service.get_snapshot()
+        age = (datetime.now() - snapshot.fetched_at).total_seconds()
+        return Response(
+            _dumps({
+                'version': snapshot.version, 'age_seconds': round(age, 1), 'stale': snapshot.stale,
+                'stations': len(snapshot.data)
+            }),
+            status=200 if not snapshot.data.empty else 503,
+            headers={'Cache-Control': 'no-store'},
+            content_type='application/json; charset=utf-8'
+        )
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default=API_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=API_CONFIG['port'])
+    parser.add_argument('--no-refresh', action='store_true', help='不启动后台刷新线程（快照过期后由请求触发加载）')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    bike_service.restore_snapshot()
+    if not args.no_refresh:
+        start_refresher(bike_service.refresh)
+    logger.info(f"Serving snapshot API on http://{args.host}:{args.port}/api/v1/")
+    create_app().run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,28 @@
+import logging
 import streamlit as st
-from components.maps import render_seoul_map
 from components.header import render_header
 from components.station_panel import StationPanel
 from components.dynamic_scroll_view import DynamicScrollView
 from components.data_service import bike_service
+from components.live_updates import start_live_updates, render_live_updates
 from config.page_config import setup_page
 from utils.data_refresh import setup_auto_refresh, should_refresh_data
+from utils.instrumentation import span, start_metrics_server
+from config.settings import METRICS_CONFIG, PUSH_CONFIG
+from styles.bundle import render_styles
 
 # 确保这是第一个被执行的命令
 setup_page()
 
+# 日志只在入口配置一次（各模块导入时不再配置）
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
 def load_styles():
-    """加载样式文件"""
-    with open('static/styles/main.css', encoding='utf-8') as f:
-        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+    """注入样式包（static/styles 下的样式文件合并压缩而成，进程内只构建一次）"""
+    render_styles()
 
 def init_session_state():
     """初始化session state"""
@@ -28,44 +37,14 @@ def render_layout():
     """渲染页面布局"""
     # 添加主容器
     with st.container():
-        # 添加页面顶部边距
-        st.markdown("""
-            <style>
-                /* 添加页面顶部边距 */
-                section.main {
-                    padding-top: 4rem !important;
-                }
-                
-                .main-content {
-                    max-width: 1600px;
-                    margin: 0 auto;
-                    padding: 0;
-                }
-                .columns-container {
-                    margin-top: 1rem;
-                    display: flex;
-                }
-                /* 确保列容器与header对齐 */
-                [data-testid="column"] {
-                    padding-left: 0 !important;
-                    padding-right: 0 !important;
-                }
-                /* 调整列间距 */
-                [data-testid="column"]:not(:first-child) {
-                    margin-left: 1rem !important;
-                }
-                
-                /* 调整整体容器的边距 */
-                .block-container {
-                    padding-top: 2rem !important;
-                    margin-top: 1rem !important;
-                }
-            </style>
-            <div class="main-content">
-        """, unsafe_allow_html=True)
+        st.markdown('<div class="main-content">', unsafe_allow_html=True)
         
         # 1. 首先渲染 header
         render_header()
+        
+        # 新快照的变化由推送连接直接更新页头、地图和列表，不需要整页重绘
+        if PUSH_CONFIG['enabled']:
+            render_live_updates()
 
         # 2. 显示加载状态
         if st.session_state.get('is_loading', False):
@@ -75,30 +54,8 @@ def render_layout():
                 </div>
             """, unsafe_allow_html=True)
 
-        # 3. 创建内容容器，移除左右padding以确保对齐
-        st.markdown("""
-            <style>
-                .main-content {
-                    max-width: 1600px;
-                    margin: 0 auto;
-                    padding: 0;  /* 移除padding */
-                }
-                .columns-container {
-                    margin-top: 1rem;
-                    display: flex;
-                }
-                /* 确保列容器与header对齐 */
-                [data-testid="column"] {
-                    padding-left: 0 !important;
-                    padding-right: 0 !important;
-                }
-                /* 调整列间距 */
-                [data-testid="column"]:not(:first-child) {
-                    margin-left: 1rem !important;
-                }
-            </style>
-            <div class="main-content">
-        """, unsafe_allow_html=True)
+        # 3. 创建内容容器
+        st.markdown('<div class="main-content">', unsafe_allow_html=True)
         
         # 4. 创建三列布局，使用small间距
         col1, col2, col3 = st.columns([2.5, 4.5, 3], gap="small")
@@ -108,6 +65,8 @@ def render_layout():
             DynamicScrollView().render()
             
         with col2:
+            # 地图依赖 folium/branca，在这里才导入：页头和列表先发送到浏览器
+            from components.maps import render_seoul_map
             render_seoul_map()
             
         with col3:
@@ -115,15 +74,26 @@ def render_layout():
 
         st.markdown('</div>', unsafe_allow_html=True)
 
+def apply_snapshot(snapshot):
+    """将快照数据写入当前会话"""
+    # 表格只是几列的选择，重新构建比应用增量更快（benchmarks/bench_delta.py）
+    with span('panel'):
+        st.session_state['station_panel'].update_data(snapshot.data)
+    st.session_state['bike_data'] = snapshot.data
+    st.session_state['snapshot_version'] = snapshot.version
+    st.session_state['last_update_time'] = snapshot.fetched_at
+    # 清除 header 中基于旧数据缓存的统计值
+    st.session_state.pop('total_stations', None)
+    st.session_state.pop('current_available_bikes', None)
+
 def update_data():
-    """更新数据"""
+    """更新数据（后台线程已发布新快照时，仅切换到新版本）"""
     if should_refresh_data():
         st.session_state['is_loading'] = True
         try:
-            bike_data = bike_service.get_bike_data()
-            if not bike_data.empty:
-                st.session_state['bike_data'] = bike_data
-                st.session_state['station_panel'].update_data(bike_data)
+            snapshot = bike_service.get_snapshot()
+            if not snapshot.data.empty:
+                apply_snapshot(snapshot)
         except Exception as e:
             st.error(f"데이터 업데이트 중 오류 발생: {str(e)}")
         finally:
@@ -134,20 +104,30 @@ def main():
     init_session_state()
     
     try:
-        # 设置自动刷新
-        setup_auto_refresh()
+        # 载入本地保存的最近一次快照（进程内只载入一次），首次渲染不等待 OpenAPI
+        bike_service.restore_snapshot()
+        
+        # 启动实时推送服务（/events，进程内只启动一次；在首个快照发布之前订阅）
+        if PUSH_CONFIG['enabled']:
+            start_live_updates()
+        
+        # 启动后台刷新线程
+        setup_auto_refresh(bike_service.refresh)
+        
+        # 启动指标服务（/metrics，进程内只启动一次）
+        if METRICS_CONFIG['enabled']:
+            start_metrics_server()
         
         # 更新数据
         update_data()
         
         # 如果没有数据，尝试首次加载
         if st.session_state['bike_data'] is None:
-            bike_data = bike_service.get_bike_data()
-            if bike_data.empty:
+            snapshot = bike_service.get_snapshot()
+            if snapshot.data.empty:
                 st.warning("데이터를 불러올 수 없습니다. 잠시 후 다시 시도해주세요.")
                 return
-            st.session_state['bike_data'] = bike_data
-            st.session_state['station_panel'].update_data(bike_data)
+            apply_snapshot(snapshot)
             
         render_layout()
         
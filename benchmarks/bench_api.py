@@ -0,0 +1,77 @@
+"""
+只读 JSON API 基准：每次请求重新序列化 vs 按快照版本预先序列化的响应体
+
+使用 Flask 测试客户端（不含网络开销），分别测量首个请求（需要序列化和压缩）、
+之后的 200 响应（gzip）和 If-None-Match 命中的 304 响应。
+
+运行: python -m benchmarks.bench_api [--sizes 3000 30000] [--requests 2000]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from config.settings import HISTORY_CONFIG, SNAPSHOT_STORE_CONFIG
+
+# 基准测试发布的快照不写入历史存储和本地快照文件（必须在导入 data_service 之前设置）
+HISTORY_CONFIG['enabled'] = False
+SNAPSHOT_STORE_CONFIG['enabled'] = False
+
+from api.snapshot_api import SnapshotBodies, create_app
+from components.data_service import BikeDataService, bike_service
+from utils.snapshot_cache import snapshot_cache
+from benchmarks.fixtures import make_rows
+
+ENDPOINTS = ['/api/v1/snapshot', '/api/v1/status', '/api/v1/metrics', '/api/v1/stations/ST-1']
+
+def per_request(client, path, headers, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        response = client.get(path, headers=headers)
+    return count / (time.perf_counter() - started), response
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3000, 30000])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'stations':>8} {'endpoint':>22} {'body(KB)':>9} {'gzip(KB)':>9} {'first(ms)':>10} "
+          f"{'re-serialize/s':>15} {'200/s':>8} {'304/s':>8}")
+    for size in args.sizes:
+        frame = BikeDataService()._clean_data(pd.DataFrame(make_rows(size, seed=size)))
+        snapshot = snapshot_cache.refresh(lambda: frame)
+        client = create_app(bike_service).test_client()
+        for path in ENDPOINTS:
+            started = time.perf_counter()
+            first = client.get(path, headers={'Accept-Encoding': 'gzip'})
+            first_ms = (time.perf_counter() - started) * 1000
+            raw = client.get(path)
+
+            # 对比：每个请求都重新生成响应体（不压缩）
+            name = path.rsplit('/', 1)[-1]
+            build = {
+                'snapshot': SnapshotBodies.snapshot_body,
+                'status': SnapshotBodies.status_body,
+                'metrics': SnapshotBodies.metrics_body
+            }.get(name)
+            count = max(args.requests // 100, 5)
+            started = time.perf_counter()
+            for _ in range(count):
+                bodies = SnapshotBodies(snapshot)
+                if build:
+                    build(bodies)
+                else:
+                    bodies.station_body(bodies.station_position(name))
+            reserialize = count / (time.perf_counter() - started)
+
+            ok, _ = per_request(client, path, {'Accept-Encoding': 'gzip'}, args.requests)
+            not_modified, response = per_request(
+                client, path, {'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']}, args.requests
+            )
+            assert response.status_code == 304
+            print(f"{size:>8} {path:>22} {len(raw.data) / 1024:>9.1f} {len(first.data) / 1024:>9.1f} "
+                  f"{first_ms:>10.1f} {reserialize:>15.0f} {ok:>8.0f} {not_modified:>8.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+站点分类基准：逐行 iterrows 实现 vs 向量化 classify_stations
+
+运行: python -m benchmarks.bench_classify [--sizes 3000 30000 300000] [--legacy-max 30000]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from components.data_service import BikeDataService
+from components.station_classifier import classify_stations
+from benchmarks.fixtures import make_rows
+
+def legacy_classify(bike_data):
+    """旧的 BikeStationStatus.get_realtime_status 分类逻辑"""
+    no_rental_stations = []
+    no_return_stations = []
+    for _, station in bike_data.iterrows():
+        try:
+            parking = int(station['parkingBikeTotCnt'])
+            rack_total = int(station['rackTotCnt'])
+            shared = int(station['shared'])
+            station_info = {
+                'id': station['stationId'],
+                'name': station['stationName'].strip(),
+                'parking': parking,
+                'rack_count': rack_total,
+                'shared': shared
+            }
+            if parking == 0:
+                no_rental_stations.append(station_info)
+            if rack_total == 0:
+                no_return_stations.append(station_info)
+        except (ValueError, KeyError):
+            continue
+
+    def get_station_number(station):
+        try:
+            return int(station['id'].replace('ST-', ''))
+        except (ValueError, AttributeError):
+            return 0
+
+    no_rental_stations.sort(key=get_station_number)
+    no_return_stations.sort(key=get_station_number)
+    return no_rental_stations, no_return_stations
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3000, 30000, 300000])
+    parser.add_argument('--legacy-max', type=int, default=30000, help='超过该站点数时跳过旧实现')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'stations':>8} {'legacy(ms)':>11} {'vectorized(ms)':>15} {'speedup':>8}")
+    for size in args.sizes:
+        df = BikeDataService()._clean_data(pd.DataFrame(make_rows(size)))
+        vec, result = timed(lambda: classify_stations(df), args.repeat)
+        if size <= args.legacy_max:
+            legacy, (no_rental, _) = timed(lambda: legacy_classify(df), 1)
+            assert [s['id'] for s in no_rental] == [s['id'] for s in result['no_rental']['stations']]
+            print(f"{size:>8} {legacy * 1000:>11.1f} {vec * 1000:>15.1f} {legacy / vec:>7.1f}x")
+        else:
+            print(f"{size:>8} {'-':>11} {vec * 1000:>15.1f} {'-':>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+bikeList 解码基准：json.loads -> 每页 DataFrame -> pd.concat -> build_station_frame
+vs 边解析边写入按列预分配的缓冲区（page_decoder）-> frame_from_columns
+
+两条路径得到相同的快照；峰值内存用 tracemalloc 单独测量一次（不含原始响应体本身）。
+
+运行: python -m benchmarks.bench_decode [--sizes 3000 30000 300000] [--repeat 5]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+from components.page_decoder import decode_page, concat_columns
+from components.snapshot import build_station_frame, frame_from_columns
+from benchmarks.fixtures import make_rows
+
+PAGE_SIZE = 1000
+
+def make_bodies(rows):
+    """把行切分为与 OpenAPI 相同格式的分页响应体"""
+    return [
+        json.dumps({
+            'rentBikeStatus': {
+                'list_total_count': len(rows),
+                'RESULT': {'CODE': 'INFO-000', 'MESSAGE': '정상 처리되었습니다.'},
+                'row': rows[start:start + PAGE_SIZE]
+            }
+        }, ensure_ascii=False).encode('utf-8')
+        for start in range(0, len(rows), PAGE_SIZE)
+    ]
+
+def legacy_decode(bodies):
+    """改动前的路径：每页的行 dict 列表 -> DataFrame，拼接后再转换类型"""
+    frames = [pd.DataFrame(json.loads(body)['rentBikeStatus']['row']) for body in bodies]
+    return build_station_frame(pd.concat(frames, ignore_index=True))
+
+def column_decode(bodies):
+    parts = [decode_page(body, PAGE_SIZE)[0].trim() for body in bodies]
+    return frame_from_columns(*concat_columns(parts))
+
+def measure(func, bodies, repeat):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = func(bodies)
+        times.append((time.perf_counter() - started) * 1000)
+    del result
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func(bodies)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3000, 30000, 300000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'stations':>8} {'body(KB)':>9} {'legacy(ms)':>11} {'column(ms)':>11} "
+          f"{'legacy peak':>12} {'column peak':>12} {'peak ratio':>11}")
+    for size in args.sizes:
+        bodies = make_bodies(make_rows(size, seed=size))
+        legacy_ms, legacy_peak, expected = measure(legacy_decode, bodies, args.repeat)
+        column_ms, column_peak, actual = measure(column_decode, bodies, args.repeat)
+        pd.testing.assert_frame_equal(actual, expected)
+        print(f"{size:>8} {sum(map(len, bodies)) / 1024:>9.0f} {legacy_ms:>11.1f} {column_ms:>11.1f} "
+              f"{legacy_peak / 1024:>10.0f}KB {column_peak / 1024:>10.0f}KB {column_peak / legacy_peak:>10.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+快照变化基准：派生视图全量重建 vs 应用变化
+
+每次刷新有一部分站点的车辆数发生变化，另有少量站点新增/移除。
+diff 在进程内每个版本只计算一次，各会话只需 apply。
+
+运行: python -m benchmarks.bench_delta [--sizes 3000 30000 300000] [--changed 0.05]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from components.snapshot import build_station_frame
+from components.snapshot_delta import diff_snapshots, apply_delta
+from components.station_panel import StationPanel
+from components.station_classifier import StationStatusView
+from benchmarks.fixtures import make_rows
+
+def evolve(rows, changed, churn, seed=1):
+    """生成下一次刷新的原始数据：部分站点车辆数变化，少量站点新增和移除"""
+    rng = np.random.default_rng(seed)
+    rows = [dict(row) for row in rows]
+    for i in rng.choice(len(rows), int(len(rows) * changed), replace=False):
+        rows[i]['parkingBikeTotCnt'] = str(int(rows[i]['parkingBikeTotCnt']) + int(rng.integers(1, 4)))
+    removed = int(len(rows) * churn)
+    extra = make_rows(len(rows) + removed, seed=seed)[len(rows):]
+    return rows[removed:] + extra
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3000, 30000, 300000])
+    parser.add_argument('--changed', type=float, default=0.05, help='车辆数变化的站点比例')
+    parser.add_argument('--churn', type=float, default=0.005, help='新增/移除的站点比例')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'':>8} {'':>8} {'--- station panel ---':>33} {'--- status view ---':>24}")
+    print(f"{'stations':>8} {'changed':>8} {'diff(ms)':>9} {'rebuild(ms)':>12} {'apply(ms)':>10} "
+          f"{'rebuild(ms)':>12} {'apply(ms)':>10}")
+    for size in args.sizes:
+        rows = make_rows(size)
+        prev = build_station_frame(pd.DataFrame(rows))
+        curr = build_station_frame(pd.DataFrame(evolve(rows, args.changed, args.churn)))
+        base = StationPanel._prepare(prev)
+
+        rebuild, expected = timed(lambda: StationPanel._prepare(curr), args.repeat)
+        diff, delta = timed(lambda: diff_snapshots(prev, curr), args.repeat)
+        apply, result = timed(lambda: apply_delta(base.copy(), delta), args.repeat)
+        copy_cost, _ = timed(base.copy, args.repeat)
+
+        pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index(), check_dtype=False,
+                                      check_categorical=False)
+
+        def rebuild_status():
+            view = StationStatusView()
+            view.rebuild(curr)
+            return view.to_dict()
+
+        def apply_status():
+            view = StationStatusView()
+            view.rebuild(prev)
+            started = time.perf_counter()
+            view.apply_delta(curr, delta)
+            result = view.to_dict()
+            return time.perf_counter() - started, result
+
+        status_rebuild, expected_status = timed(rebuild_status, args.repeat)
+        status_apply, status = min((apply_status() for _ in range(args.repeat)), key=lambda r: r[0])
+        assert status['tiers'] == expected_status['tiers']
+        assert [s['id'] for s in status['no_rental']['stations']] == \
+            [s['id'] for s in expected_status['no_rental']['stations']]
+
+        print(f"{size:>8} {len(delta.changed):>8} {diff * 1000:>9.2f} {rebuild * 1000:>12.2f} "
+              f"{max(apply - copy_cost, 0) * 1000:>10.2f} {status_rebuild * 1000:>12.2f} {status_apply * 1000:>10.2f}")
+
+if __name__ == '__main__':
+    main()
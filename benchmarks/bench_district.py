@@ -0,0 +1,66 @@
+"""
+站点-行政区映射基准：逐点逐区的纯 Python 射线法 vs 外接矩形预筛 + 向量化射线法（及缓存命中）
+
+运行: python -m benchmarks.bench_district [--sizes 3000 30000]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from components.district_index import DistrictIndex
+from components.snapshot import build_station_frame
+from benchmarks.fixtures import make_rows
+
+def naive_locate(index, lng, lat):
+    """每个站点依次检查每个区的每条边"""
+    codes = []
+    for x, y in zip(lng, lat):
+        found = -1
+        for code, district in enumerate(index._districts):
+            inside = False
+            for x1, y1, x2, y2 in district['edges']:
+                if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                    inside = not inside
+            if inside:
+                found = code
+                break
+        codes.append(found)
+    return codes
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3000, 30000])
+    parser.add_argument('--naive-limit', type=int, default=3000, help='纯 Python 版本只在不超过该规模时运行')
+    args = parser.parse_args()
+
+    index = DistrictIndex()
+    _, load_ms = timed(index._load)
+    print(f"load district polygons: {load_ms:.1f} ms")
+
+    print(f"{'stations':>8} {'naive(ms)':>10} {'vector(ms)':>11} {'cached(ms)':>11} {'matched':>8}")
+    for size in args.sizes:
+        frame = build_station_frame(pd.DataFrame(make_rows(size, seed=size)))
+        lng = frame['stationLongitude'].to_numpy()
+        lat = frame['stationLatitude'].to_numpy()
+
+        naive = '-'
+        if size <= args.naive_limit:
+            expected, naive_ms = timed(lambda: naive_locate(index, lng.astype(float), lat.astype(float)))
+            naive = f"{naive_ms:.0f}"
+
+        cold = DistrictIndex()
+        cold._load()
+        districts, vector_ms = timed(lambda: cold.assign(frame))
+        if size <= args.naive_limit:
+            assert list(districts.codes) == expected, 'vectorized result differs from naive ray casting'
+        _, cached_ms = timed(lambda: cold.assign(frame))
+        print(f"{size:>8} {naive:>10} {vector_ms:>11.1f} {cached_ms:>11.2f} {int(districts.notna().sum()):>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+BikeDataService.fetch_bike_data 抓取耗时基准
+
+在本地启动一个模拟 bikeList API 的 HTTP 服务（每个请求带固定延迟），
+比较逐页串行抓取与并发抓取在不同页数下的耗时。
+
+运行: python -m benchmarks.bench_fetch [--latency 0.2] [--pages 1 3 5 10]
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import requests
+
+from config.settings import SEOUL_API_CONFIG
+
+# 本地模拟服务不需要限流和时间预算（必须在导入 data_service 之前设置）
+SEOUL_API_CONFIG.update(rate_limit=1e6, burst=1e6, refresh_budget=3600)
+
+from components.data_service import BikeDataService
+from benchmarks.fixtures import make_rows, make_page
+
+PAGE_PATTERN = re.compile(r'/json/bikeList/(\d+)/(\d+)')
+
+def start_stub_server(rows, latency):
+    """启动本地模拟服务，返回 (server, base_url)"""
+    bodies = {}   # 每一页只序列化一次，避免模拟服务本身的开销计入客户端耗时
+
+    def page_body(start, end):
+        if (start, end) not in bodies:
+            bodies[(start, end)] = json.dumps(make_page(rows, start, end)).encode('utf-8')
+        return bodies[(start, end)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            match = PAGE_PATTERN.search(self.path)
+            if not match:
+                self.send_error(404)
+                return
+            time.sleep(latency)
+            body = page_body(int(match.group(1)), int(match.group(2)))
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def fetch_sequential(service, total_count):
+    """旧实现：逐页串行请求，每次新建连接"""
+    dfs = []
+    for start, end in service._page_ranges(total_count):
+        url = f"{service.base_url}/{service.api_key}/json/bikeList/{start}/{end}"
+        response = requests.get(url, timeout=10)
+        dfs.append(pd.DataFrame(response.json()['rentBikeStatus']['row']))
+    return service._clean_data(pd.concat(dfs, ignore_index=True))
+
+def timed(func, repeat, before=None):
+    best = float('inf')
+    for _ in range(repeat):
+        if before:
+            before()
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.2, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 3, 5, 10])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'pages':>5} {'stations':>8} {'sequential(s)':>14} {'concurrent(s)':>14} {'speedup':>8}")
+    for pages in args.pages:
+        rows = make_rows(pages * 1000 - 500 if pages > 1 else 800)
+        server, base_url = start_stub_server(rows, args.latency)
+        try:
+            service = BikeDataService()
+            service.base_url = base_url
+            seq, _ = timed(lambda: fetch_sequential(service, len(rows)), args.repeat)
+            # 模拟服务每次返回相同内容，清空分页缓存以测量完整的抓取和解析
+            conc, df = timed(service.fetch_bike_data, args.repeat, before=service.forget_pages)
+            assert len(df) == len(rows), f"expected {len(rows)} rows, got {len(df)}"
+            print(f"{pages:>5} {len(rows):>8} {seq:>14.3f} {conc:>14.3f} {seq / conc:>7.1f}x")
+        finally:
+            server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+行政区划 GeoJSON 基准：每次读取原始文件 vs MapService 内存中的多分辨率版本
+
+运行: python -m benchmarks.bench_geojson [--repeat 50]
+"""
+import argparse
+import gzip
+import json
+import time
+
+from components.map import MapService, map_service
+from config.settings import GEOJSON_LOD_CONFIG
+
+def best_ms(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    path = MapService().geojson_path
+
+    def load_source():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    started = time.perf_counter()
+    stats = map_service.get_level_stats()
+    print(f"prepare all levels (once per process): {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    print(f"{'level':>8} {'zoom':>5} {'vertices':>9} {'size(KB)':>9} {'gzip(KB)':>9} {'load(ms)':>9}")
+    source = path.read_bytes()
+    print(f"{'source':>8} {'':>5} {stats['source']['vertices']:>9} {len(source) / 1024:>9.1f} "
+          f"{len(gzip.compress(source)) / 1024:>9.1f} {best_ms(load_source, args.repeat):>9.2f}")
+    for name, level in GEOJSON_LOD_CONFIG['levels'].items():
+        text = map_service.get_seoul_geojson_text(name).encode('utf-8')
+        load_ms = best_ms(lambda: map_service.get_seoul_geojson(name), args.repeat)
+        print(f"{name:>8} {level['min_zoom']:>5} {stats[name]['vertices']:>9} {len(text) / 1024:>9.1f} "
+              f"{len(gzip.compress(text)) / 1024:>9.1f} {load_ms:>9.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+历史存储基准：写入、按天合并、按时间窗口/站点集合读取
+
+模拟每 5 分钟一个快照，写入若干天的数据（当天之前的日期会被合并为 day.parquet）。
+
+运行: python -m benchmarks.bench_history [--stations 3000] [--days 3] [--path /tmp/history-bench]
+"""
+import argparse
+import shutil
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from components.snapshot import build_station_frame
+from utils.history_store import HistoryStore
+from utils.snapshot_cache import Snapshot
+from benchmarks.fixtures import make_rows
+
+def dir_size(path):
+    return sum(f.stat().st_size for f in path.rglob('*.parquet'))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stations', type=int, default=3000)
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--interval', type=int, default=300, help='快照间隔（秒）')
+    parser.add_argument('--path', default='/tmp/history-bench')
+    args = parser.parse_args()
+
+    shutil.rmtree(args.path, ignore_errors=True)
+    store = HistoryStore(args.path)
+    base = build_station_frame(pd.DataFrame(make_rows(args.stations)))
+    rng = np.random.default_rng(0)
+
+    per_day = 86400 // args.interval
+    start = datetime(2024, 1, 1)
+    write_times = []
+    compact_times = []
+    for i in range(per_day * args.days):
+        fetched_at = start + timedelta(seconds=i * args.interval)
+        parking = np.clip(base['parkingBikeTotCnt'].to_numpy() + rng.integers(-2, 3, len(base)), 0, None)
+        snapshot = Snapshot(i + 1, base.assign(parkingBikeTotCnt=parking.astype(np.int16)), fetched_at)
+        started = time.perf_counter()
+        store.write_snapshot(snapshot)
+        write_times.append(time.perf_counter() - started)
+        if i % per_day == per_day - 1:
+            started = time.perf_counter()
+            store.compact_day(fetched_at.date())
+            compact_times.append(time.perf_counter() - started)
+
+    rows = per_day * args.days * len(base)
+    size = dir_size(store.path)
+    print(f"rows written        {rows:,} ({per_day * len(base):,}/day)")
+    print(f"on disk             {size / 2**20:.1f} MB ({size / rows:.2f} bytes/row)")
+    print(f"write per snapshot  {np.median(write_times) * 1000:.1f} ms (median)")
+    print(f"compact per day     {np.median(compact_times) * 1000:.0f} ms (median)")
+
+    end = start + timedelta(days=args.days)
+    stations = list(base['stationId'][:10])
+    for label, kwargs in [
+        ('1 hour, all stations', dict(start=end - timedelta(hours=1), end=end)),
+        ('1 day, all stations', dict(start=end - timedelta(days=1), end=end)),
+        (f'{args.days} days, 10 stations', dict(start=start, end=end, station_ids=stations)),
+        (f'{args.days} days, hourly totals', None)
+    ]:
+        started = time.perf_counter()
+        if kwargs is None:
+            result = store.hourly_totals(start, end)
+        else:
+            result = store.read(**kwargs)
+        print(f"read {label:<26} {(time.perf_counter() - started) * 1000:>8.1f} ms  {len(result):>9,} rows")
+
+if __name__ == '__main__':
+    main()
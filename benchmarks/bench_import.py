@@ -0,0 +1,82 @@
+"""
+导入耗时基准：在新的解释器中冷导入模块，用 -X importtime 得到逐个模块的耗时，并按顶层包汇总
+
+`streamlit run app.py` 执行页面脚本时 streamlit 已经导入，因此默认先导入 streamlit（不计入结果），
+只统计之后导入目标模块新增的模块。
+
+运行: python -m benchmarks.bench_import [--modules components components.data_service app] [--repeat 5] [--top 12]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORT_TARGETS = ['components', 'components.data_service', 'app']
+# 页面首次渲染不需要、应当按需导入的依赖
+LAZY_MODULES = ['folium', 'branca', 'plotly', 'pyarrow.dataset', 'pyarrow.parquet', 'requests']
+MARKER = '#bench-import-start'
+
+def import_profile(module, preload=('streamlit',)):
+    """
+    在新的解释器中导入 module
+
+    Returns:
+        (总耗时 ms, {模块名: 自身耗时 us})，只包含 preload 之后新导入的模块
+    """
+    code = (
+        "import sys, time\n"
+        + ''.join(f"import {name}\n" for name in preload)
+        + f"sys.stderr.write('{MARKER}\\n'); sys.stderr.flush()\n"
+        f"started = time.perf_counter()\n"
+        f"import {module}\n"
+        f"print((time.perf_counter() - started) * 1000)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    lines = result.stderr.splitlines()
+    modules = {}
+    for line in lines[lines.index(MARKER) + 1:]:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|', 2)
+        modules[name.strip()] = int(self_us)
+    return float(result.stdout.strip().splitlines()[-1]), modules
+
+def measure(module, repeat, preload=('streamlit',)):
+    """重复 repeat 次，返回 (各次总耗时 ms, 各顶层包自身耗时之和的中位数 ms, 导入的模块)"""
+    totals = []
+    packages = defaultdict(list)
+    modules = {}
+    for _ in range(repeat):
+        total, modules = import_profile(module, preload)
+        totals.append(total)
+        per_package = defaultdict(int)
+        for name, self_us in modules.items():
+            per_package[name.split('.')[0]] += self_us
+        for package, self_us in per_package.items():
+            packages[package].append(self_us / 1000)
+    return totals, {package: statistics.median(times) for package, times in packages.items()}, modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=IMPORT_TARGETS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=12, help='列出自身耗时最多的顶层包个数')
+    parser.add_argument('--preload', nargs='*', default=['streamlit'], help='预先导入、不计入结果的模块')
+    args = parser.parse_args()
+
+    for module in args.modules:
+        totals, packages, modules = measure(module, args.repeat, args.preload)
+        loaded = [name for name in LAZY_MODULES if name in modules]
+        print(f"import {module}: median {statistics.median(totals):.0f} ms, min {min(totals):.0f} ms, "
+              f"{len(modules)} modules; lazy deps loaded: {', '.join(loaded) or 'none'}")
+        for package, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {package:<28} {ms:>8.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+指标记录开销基准：span / observe / inc 的单次耗时，以及 /metrics 渲染耗时
+
+运行: python -m benchmarks.bench_instrumentation [--count 200000]
+"""
+import argparse
+import time
+
+from utils.instrumentation import Metrics
+
+def per_call_ns(func, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - started) / count * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=200000)
+    args = parser.parse_args()
+
+    metrics = Metrics()
+
+    def with_span():
+        with metrics.span('bench', mode='rebuild'):
+            pass
+
+    baseline = per_call_ns(lambda: None, args.count)
+    print(f"{'operation':>12} {'ns/call':>8}")
+    print(f"{'span':>12} {per_call_ns(with_span, args.count) - baseline:>8.0f}")
+    print(f"{'observe':>12} {per_call_ns(lambda: metrics.observe('bench_seconds', 0.1), args.count) - baseline:>8.0f}")
+    print(f"{'inc':>12} {per_call_ns(lambda: metrics.inc('bench_total', page='1'), args.count) - baseline:>8.0f}")
+
+    # 与实际运行时相近的规模：十几个阶段、每个阶段窗口已满
+    for stage in range(16):
+        for _ in range(metrics.window):
+            metrics.observe('pipeline_stage_seconds', 0.01, stage=str(stage))
+    started = time.perf_counter()
+    text = metrics.render()
+    print(f"render /metrics: {(time.perf_counter() - started) * 1000:.2f} ms, {len(text)} bytes")
+
+if __name__ == '__main__':
+    main()
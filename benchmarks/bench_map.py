@@ -0,0 +1,50 @@
+"""
+地图 HTML 生成基准：每个站点一个 CircleMarker vs 单个紧凑数据层 vs 缓存底图上组合站点层 / 按区设色
+
+运行: python -m benchmarks.bench_map [--sizes 3000 10000]
+"""
+import argparse
+import time
+import warnings
+
+import pandas as pd
+
+from components.maps import build_seoul_map, get_base_map, get_seoul_map_html
+from components.snapshot import build_station_frame
+from components.district_index import district_index
+from benchmarks.fixtures import make_rows
+
+def build_html(bike_data, station_layer):
+    if station_layer == 'cached':
+        # 每次都是新版本：底图已缓存，只生成站点层
+        return get_seoul_map_html(bike_data)
+    if station_layer == 'districts':
+        return get_seoul_map_html(bike_data, station_layer='districts')
+    return build_seoul_map(bike_data, station_layer=station_layer).get_root().render()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    # 底图只在第一次调用时构建
+    started = time.perf_counter()
+    base_html = get_base_map().html
+    print(f"base map: {(time.perf_counter() - started) * 1000:.1f} ms, {len(base_html.encode('utf-8')) / 1024:.0f} KB (built once)")
+
+    print(f"{'stations':>8} {'layer':>8} {'build(ms)':>10} {'html(KB)':>9}")
+    for size in args.sizes:
+        bike_data = build_station_frame(pd.DataFrame(make_rows(size)))
+        bike_data['district'] = district_index.assign(bike_data)
+        for layer in ['markers', 'compact', 'cached', 'districts']:
+            best = float('inf')
+            for _ in range(args.repeat if layer == 'compact' else 1):
+                started = time.perf_counter()
+                html = build_html(bike_data, layer)
+                best = min(best, time.perf_counter() - started)
+            print(f"{size:>8} {layer:>8} {best * 1000:>10.1f} {len(html.encode('utf-8')) / 1024:>9.0f}")
+
+if __name__ == '__main__':
+    main()
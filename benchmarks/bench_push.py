@@ -0,0 +1,139 @@
+"""
+实时推送基准：每次更新发送的字节数，以及推送服务每个连接的 CPU 开销
+
+- 字节数：推送的变化消息 vs 整页重绘时重新发送的地图和列表 HTML
+- CPU：在子进程中打开 N 个 /events 连接，主进程连续发布 K 条消息，
+  用 process_time 统计推送服务（发布 + 所有连接线程写出）消耗的 CPU，按 N*K 平均
+
+运行: python -m benchmarks.bench_push [--stations 3000] [--changed 0.05] [--clients 1 10 100] [--updates 50]
+"""
+import argparse
+import multiprocessing
+import selectors
+import socket
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from config.settings import HISTORY_CONFIG, PUSH_CONFIG, SNAPSHOT_STORE_CONFIG
+
+# 基准测试不写入历史存储和本地快照文件；心跳间隔调大，避免计入 ping
+HISTORY_CONFIG['enabled'] = False
+SNAPSHOT_STORE_CONFIG['enabled'] = False
+PUSH_CONFIG['heartbeat'] = 3600
+
+from components.data_service import BikeDataService
+from components.dynamic_scroll_view import get_station_list_html
+from components.live_updates import encode_delta
+from components.maps import get_seoul_map_html
+from components.snapshot_delta import diff_snapshots
+from components.station_classifier import classify_stations
+from utils.push_server import PushHub, create_push_server
+from utils.snapshot_cache import Snapshot
+from benchmarks.bench_delta import evolve
+from benchmarks.fixtures import make_rows
+
+def _clients(port, count, targets, ready, done):
+    """
+    子进程：打开 count 个连接
+
+    每收到一个目标字节数（不含响应头），读到所有连接都达到该字节数后报告，收到 None 时退出。
+    """
+    selector = selectors.DefaultSelector()
+    received = {}
+    headers = {}
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(b'GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ)
+        received[sock] = 0
+    ready.send(True)
+    while True:
+        target = targets.recv()
+        if target is None:
+            break
+        while any(n < target for n in received.values()):
+            for key, _ in selector.select(timeout=0.05):
+                sock = key.fileobj
+                data = sock.recv(1 << 20)
+                if sock not in headers:
+                    headers[sock] = data
+                    end = data.find(b'\r\n\r\n')
+                    if end < 0:
+                        continue
+                    data = data[end + 4:]
+                received[sock] += len(data)
+        done.send(True)
+    for sock in received:
+        sock.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stations', type=int, default=3000)
+    parser.add_argument('--changed', type=float, default=0.05, help='每次更新车辆数变化的站点比例')
+    parser.add_argument('--churn', type=float, default=0.0, help='新增/移除的站点比例')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--updates', type=int, default=50)
+    args = parser.parse_args()
+
+    service = BikeDataService()
+    rows = make_rows(args.stations)
+    prev = Snapshot(1, service._clean_data(pd.DataFrame(rows)), datetime.now())
+    curr = Snapshot(2, service._clean_data(pd.DataFrame(evolve(rows, args.changed, args.churn))), datetime.now())
+    delta = diff_snapshots(prev.data, curr.data, prev.version, curr.version)
+    started = time.perf_counter()
+    message = encode_delta(delta, curr).encode('utf-8')
+    encode_ms = (time.perf_counter() - started) * 1000
+
+    # 整页重绘时，地图和列表 iframe 的内容随版本变化，需要重新发送
+    map_bytes = len(get_seoul_map_html(curr.data, station_layer='compact').encode('utf-8'))
+    stations = classify_stations(curr.data)['no_rental']['stations']
+    list_bytes = len(get_station_list_html(stations).encode('utf-8'))
+    print(f"stations={args.stations} changed={len(delta.changed)} encode={encode_ms:.1f} ms (once per version)")
+    print(f"push message: {len(message) / 1024:.1f} KB; "
+          f"full rerun: map {map_bytes / 1024:.1f} KB + list {list_bytes / 1024:.1f} KB "
+          f"({(map_bytes + list_bytes) / max(len(message), 1):.0f}x)")
+
+    print(f"{'clients':>8} {'updates':>8} {'cpu/update(ms)':>15} {'cpu/client/update(us)':>22} {'wall/update(ms)':>16}")
+    for count in args.clients:
+        hub = PushHub(history=args.updates + 1)
+        server = create_push_server(hub, host='127.0.0.1', port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_port
+        ready_recv, ready_send = multiprocessing.Pipe(duplex=False)
+        targets_recv, targets_send = multiprocessing.Pipe(duplex=False)
+        done_recv, done_send = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_clients, args=(port, count, targets_recv, ready_send, done_send), daemon=True
+        )
+        process.start()
+        ready_recv.recv()
+        while hub.clients < count:
+            time.sleep(0.01)
+
+        text = message.decode('utf-8')
+        # HTTP 响应头之后是 retry 行，然后是各条消息
+        sent = len(b'retry: 3000\n\n')
+        targets_send.send(sent)
+        done_recv.recv()
+        cpu_started = time.process_time()
+        wall_started = time.perf_counter()
+        for version in range(args.updates):
+            sent += len(hub.publish('delta', text, version))
+            # 等所有连接都收到这一条后再发布下一条（不让连接线程合并多条消息）
+            targets_send.send(sent)
+            done_recv.recv()
+        cpu = time.process_time() - cpu_started
+        wall = time.perf_counter() - wall_started
+        print(f"{count:>8} {args.updates:>8} {cpu / args.updates * 1000:>15.3f} "
+              f"{cpu / args.updates / count * 1e6:>22.1f} {wall / args.updates * 1000:>16.2f}")
+        targets_send.send(None)
+        process.join()
+        server.shutdown()
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+StationPanel 检索基准：站点名索引构建耗时与查询延迟
+
+- 名称索引（进程级，只为新出现的名称建索引）首次构建
+- 每个快照的检索视图（排序顺序）构建
+- 各类查询（名称、输入中的音节、초성、编号前缀、编号+名称、无结果）过滤 + 排序 + 取一页的延迟
+
+运行: python -m benchmarks.bench_search [--stations 30000] [--repeat 200]
+"""
+import argparse
+import statistics
+import time
+
+import pandas as pd
+
+from components.snapshot import build_station_frame
+from components.station_search import NameIndex, SnapshotSearch, SORT_OPTIONS
+import components.station_search as station_search
+from benchmarks.fixtures import make_rows
+
+QUERIES = ['', '망원역', '망원여', 'ㅁㅇㅇ', '102', '102 망원', '1번출구', '없는대여소']
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95) - 1], result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stations', type=int, default=30000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args()
+
+    frame = build_station_frame(pd.DataFrame(make_rows(args.stations, seed=args.stations)))
+    categories = frame['stationName'].cat.categories
+
+    started = time.perf_counter()
+    index = NameIndex()
+    index.extend(categories)
+    print(f"name index build ({len(categories)} names): {(time.perf_counter() - started) * 1000:.1f} ms")
+    # 之后的检索视图使用这个索引
+    station_search.name_index = index
+
+    started = time.perf_counter()
+    search = SnapshotSearch(frame)
+    print(f"snapshot search build ({len(frame)} stations): {(time.perf_counter() - started) * 1000:.1f} ms")
+    # 首次查询时才拼接检索字符串
+    search.query('망원')
+
+    print(f"{'query':>12} {'sort':>18} {'matches':>8} {'p50(ms)':>9} {'p95(ms)':>9}")
+    for query in QUERIES:
+        for sort in (['number', 'bikes_desc'] if query else list(SORT_OPTIONS)):
+            p50, p95, result = timed(
+                lambda: search.query(query, sort=sort, page=1, page_size=args.page_size), args.repeat
+            )
+            print(f"{query!r:>12} {sort:>18} {result.total:>8} {p50:>9.3f} {p95:>9.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+快照内存占用基准：旧的 _clean_data 结果（object 字符串 + float64/int64）vs 紧凑快照
+
+紧凑快照的 stationId/stationName 字典在进程内共享，只计算一次；
+每个快照自身只占用编码和数值列。
+
+运行: python -m benchmarks.bench_snapshot_memory [--sizes 3000 30000] [--snapshots 288]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from components.snapshot import build_station_frame, snapshot_nbytes, station_ids, station_names
+from benchmarks.fixtures import make_rows
+
+def legacy_clean(df):
+    """旧的 BikeDataService._clean_data"""
+    for col in ['parkingBikeTotCnt', 'rackTotCnt', 'shared', 'stationLatitude', 'stationLongitude']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+def shared_dictionary_nbytes(frame):
+    """进程级共享字典（stationId/stationName 的 categories）的字节数"""
+    return sum(
+        frame[col].cat.categories.memory_usage(deep=True)
+        for col in ['stationId', 'stationName']
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3000, 30000])
+    parser.add_argument('--snapshots', type=int, default=288, help='进程中保存的快照数（默认一天 5 分钟一次）')
+    args = parser.parse_args()
+
+    print(f"{'stations':>8} {'legacy/snap':>12} {'compact/snap':>13} {'shared dict':>12} "
+          f"{'legacy x N':>11} {'compact x N':>12} {'build(ms)':>10}")
+    for size in args.sizes:
+        raw = pd.DataFrame(make_rows(size))
+        legacy = legacy_clean(raw.copy())
+        legacy_bytes = legacy.memory_usage(deep=True).sum()
+
+        started = time.perf_counter()
+        compact = build_station_frame(raw)
+        build_ms = (time.perf_counter() - started) * 1000
+        compact_bytes = snapshot_nbytes(compact)
+        shared_bytes = shared_dictionary_nbytes(compact)
+
+        n = args.snapshots
+        print(f"{size:>8} {legacy_bytes / 1024:>10.0f}KB {compact_bytes / 1024:>11.0f}KB {shared_bytes / 1024:>10.0f}KB "
+              f"{legacy_bytes * n / 2**20:>9.1f}MB {(compact_bytes * n + shared_bytes) / 2**20:>10.1f}MB {build_ms:>10.1f}")
+    print(f"interned ids={len(station_ids)} names={len(station_names)}")
+
+if __name__ == '__main__':
+    main()
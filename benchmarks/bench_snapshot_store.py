@@ -0,0 +1,91 @@
+"""
+本地快照基准：保存最近一次快照的开销，以及冷启动时载入它 vs 重新构建快照和分类结果
+
+载入在新的子进程中测量（进程级字典为空，与真实的冷启动相同）。
+重新构建只计算解析后的清理、分区和分类，不含 OpenAPI 的网络请求（实际冷启动还要加上全部分页请求的时间）。
+
+运行: python -m benchmarks.bench_snapshot_store [--sizes 3000 30000] [--path /tmp/snapshot-store-bench]
+"""
+import argparse
+import multiprocessing
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config.settings import HISTORY_CONFIG, SNAPSHOT_STORE_CONFIG
+
+# 基准测试不写入历史存储和进程级的本地快照文件
+HISTORY_CONFIG['enabled'] = False
+SNAPSHOT_STORE_CONFIG['enabled'] = False
+
+from components.data_service import BikeDataService
+from components.district_stats import aggregate_districts
+from components.snapshot_store import SnapshotStore
+from components.station_classifier import classify_stations
+from utils.snapshot_cache import Snapshot
+from benchmarks.fixtures import make_rows
+
+def _cold_load(path, result):
+    """子进程：载入一次保存的快照，返回耗时（毫秒）和站点数"""
+    started = time.perf_counter()
+    saved = SnapshotStore(path).load()
+    elapsed = (time.perf_counter() - started) * 1000
+    result.send((elapsed, len(saved.data), saved.classification is not None))
+
+def cold_load(path):
+    context = multiprocessing.get_context('spawn')
+    receive, send = context.Pipe(duplex=False)
+    process = context.Process(target=_cold_load, args=(str(path), send))
+    process.start()
+    result = receive.recv()
+    process.join()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3000, 30000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--path', default='/tmp/snapshot-store-bench')
+    args = parser.parse_args()
+
+    shutil.rmtree(args.path, ignore_errors=True)
+    print(f"{'stations':>8} {'file(KB)':>9} {'save(ms)':>9} {'load warm(ms)':>14} {'load cold(ms)':>14} "
+          f"{'rebuild(ms)':>12}")
+    for size in args.sizes:
+        service = BikeDataService()
+        raw = pd.DataFrame(make_rows(size, seed=size))
+        store = SnapshotStore(Path(args.path) / f"{size}.arrow")
+
+        rebuild_times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            frame = service._clean_data(raw)
+            classify_stations(frame)
+            aggregate_districts(frame)
+            rebuild_times.append(time.perf_counter() - started)
+
+        snapshot = Snapshot(1, frame, datetime.now())
+        save_times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            store.save(snapshot)
+            save_times.append(time.perf_counter() - started)
+
+        load_times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            saved = store.load()
+            load_times.append(time.perf_counter() - started)
+        assert len(saved.data) == len(frame)
+
+        cold_ms, stations, derived = cold_load(store.path)
+        assert stations == len(frame) and derived
+        print(f"{size:>8} {store.path.stat().st_size / 1024:>9.0f} {np.median(save_times) * 1000:>9.1f} "
+              f"{np.median(load_times) * 1000:>14.1f} {cold_ms:>14.1f} {np.median(rebuild_times) * 1000:>12.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+样式包基准：每次重绘发送的样式字节数，各组件分别内联 <style> vs 合并压缩后的样式包
+
+按 Streamlit 的 ForwardMsg 计算：不小于 global.minCachedMessageSize 的消息在同一会话中
+第一次发送完整内容，之后只发送内容哈希的引用。
+内联方式按每个样式文件一个未压缩的 <style> 消息估算（不含原来重复输出的布局样式和缩进，是下限）。
+
+运行: python -m benchmarks.bench_styles [--reruns 10]
+"""
+import argparse
+import time
+
+from streamlit import config
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.forward_msg_cache import create_reference_msg, populate_hash_if_needed
+from streamlit.runtime.runtime import is_cacheable_msg
+
+from styles.bundle import STYLE_SOURCES, STYLES_DIR, build_bundle
+
+def markdown_msg(body):
+    msg = ForwardMsg()
+    msg.metadata.delta_path[:] = [0, 0]
+    msg.delta.new_element.markdown.body = body
+    msg.delta.new_element.markdown.allow_html = True
+    return msg
+
+def sent_bytes(msg, cached):
+    """发送这条消息的字节数；cached 为 True 表示浏览器已经缓存过同样内容的消息"""
+    size = msg.ByteSize()
+    if cached and is_cacheable_msg(msg) and size >= config.get_option('global.minCachedMessageSize'):
+        populate_hash_if_needed(msg)
+        return create_reference_msg(msg).ByteSize()
+    return size
+
+def session_bytes(bodies, reruns):
+    """返回 (首次渲染字节数, 之后每次重绘的字节数)"""
+    first = sum(sent_bytes(markdown_msg(body), cached=False) for body in bodies)
+    rerun = sum(sent_bytes(markdown_msg(body), cached=True) for body in bodies)
+    return first, rerun
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=10, help='每个会话的重绘次数')
+    args = parser.parse_args()
+
+    inline = [
+        f"<style>\n{(STYLES_DIR / name).read_text(encoding='utf-8')}\n</style>" for name in STYLE_SOURCES
+    ]
+    started = time.perf_counter()
+    bundle = build_bundle()
+    build_ms = (time.perf_counter() - started) * 1000
+    bundled = [f'<style data-bundle="{bundle.digest}">{bundle.css}</style>']
+
+    print(f"bundle {bundle.digest}: {bundle.source_bytes / 1024:.1f} KB -> {len(bundle.css.encode('utf-8')) / 1024:.1f} KB "
+          f"minified, built in {build_ms:.1f} ms (once per process)")
+    print(f"{'':>10} {'messages':>9} {'first(B)':>10} {'rerun(B)':>10} {f'session x{args.reruns}(KB)':>18}")
+    results = {}
+    for name, bodies in (('inline', inline), ('bundle', bundled)):
+        first, rerun = session_bytes(bodies, args.reruns)
+        results[name] = rerun
+        print(f"{name:>10} {len(bodies):>9} {first:>10} {rerun:>10} {(first + rerun * args.reruns) / 1024:>18.1f}")
+    print(f"saved per rerun: {results['inline'] - results['bundle']} bytes")
+
+if __name__ == '__main__':
+    main()
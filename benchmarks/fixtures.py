@@ -0,0 +1,41 @@
+"""基准测试使用的合成数据"""
+import random
+
+# 首尔市范围内的经纬度
+LAT_RANGE = (37.43, 37.70)
+LNG_RANGE = (126.80, 127.18)
+
+PLACES = ['망원역', '합정역', '여의도공원', '서울숲', '잠실역', '강남역', '신촌역', '홍대입구역',
+          '광화문', '종로3가', '을지로입구', '성수역', '건대입구역', '노량진역', '사당역', '목동역']
+SUFFIXES = ['1번출구 앞', '2번출구 옆', '사거리', '버스정류장', '앞', '공영주차장']
+
+def make_rows(count, seed=0):
+    """生成与 bikeList API 格式一致的站点行（所有字段都是字符串）"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(1, count + 1):
+        rack_total = rng.randint(5, 40)
+        parking = max(0, int(rng.gauss(rack_total * 0.6, rack_total * 0.5)))
+        rows.append({
+            'rackTotCnt': str(rack_total),
+            'stationName': f"{100 + i}. {rng.choice(PLACES)} {rng.choice(SUFFIXES)}",
+            'parkingBikeTotCnt': str(parking),
+            'shared': str(parking * 100 // rack_total),
+            'stationLatitude': f"{rng.uniform(*LAT_RANGE):.8f}",
+            'stationLongitude': f"{rng.uniform(*LNG_RANGE):.8f}",
+            'stationId': f"ST-{i}"
+        })
+    return rows
+
+def make_page(rows, start, end):
+    """按照 bikeList API 的格式返回 start~end（从1开始）范围内的一页"""
+    page = rows[start - 1:end]
+    if not page:
+        return {'RESULT': {'CODE': 'INFO-200', 'MESSAGE': '해당하는 데이터가 없습니다.'}}
+    return {
+        'rentBikeStatus': {
+            'list_total_count': len(rows),
+            'RESULT': {'CODE': 'INFO-000', 'MESSAGE': '정상 처리되었습니다.'},
+            'row': page
+        }
+    }
@@ -0,0 +1,341 @@
+"""
+数据与渲染热点路径的基准测试套件
+
+对合成快照（默认 3k / 30k / 300k 个站点）和录制的真实 bikeList 数据（若存在）测量：
+耗时（中位数/最小值，比较时使用中位数）、峰值内存（tracemalloc）和输出大小，
+以及页面入口模块在新进程中的冷导入耗时（benchmarks.bench_import），结果写入 JSON 文件，
+compare 子命令比较两次运行并标出性能退化。
+
+运行:
+    python -m benchmarks.suite run [--sizes 3000 30000 300000] [--cases ...] [--output results.json]
+    python -m benchmarks.suite compare old.json new.json [--threshold 0.25]
+    python -m benchmarks.suite record [--output benchmarks/payloads/bikeList.json.gz]   # 需要访问 OpenAPI
+"""
+import argparse
+import contextlib
+import gc
+import gzip
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from config.settings import HISTORY_CONFIG, SEOUL_API_CONFIG, SNAPSHOT_STORE_CONFIG
+
+# 基准测试发布的快照不写入历史存储和本地快照文件；本地模拟服务不需要限流和时间预算（必须在导入 data_service 之前设置）
+HISTORY_CONFIG['enabled'] = False
+SNAPSHOT_STORE_CONFIG['enabled'] = False
+SEOUL_API_CONFIG.update(rate_limit=1e6, burst=1e6, refresh_budget=3600)
+
+import pandas as pd
+
+from components.data_service import BikeDataService, bike_service
+from components.bike_status import BikeStationStatus
+from components.dynamic_scroll_view import get_station_list_html
+from components.maps import get_seoul_map_html
+from components.snapshot import snapshot_nbytes
+from components.station_panel import StationPanel
+from components.station_search import SnapshotSearch
+from utils.snapshot_cache import snapshot_cache
+from benchmarks.bench_fetch import start_stub_server
+from benchmarks.bench_import import IMPORT_TARGETS
+from benchmarks.bench_import import measure as measure_import
+from benchmarks.fixtures import make_rows
+
+DEFAULT_SIZES = [3000, 30000, 300000]
+DEFAULT_PAYLOAD = Path(__file__).parent / 'payloads' / 'bikeList.json.gz'
+DEFAULT_OUTPUT = Path(__file__).parent / 'results' / 'latest.json'
+METRICS = ['time_ms', 'peak_kb', 'output_bytes']
+
+class Fixture:
+    """一组原始 API 行，以及按需生成的快照和本地模拟服务"""
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+        self._raw = None
+        self._snapshot = None
+        self._server = None
+
+    @property
+    def stations(self):
+        return len(self.rows)
+
+    @property
+    def raw(self):
+        if self._raw is None:
+            self._raw = pd.DataFrame(self.rows)
+        return self._raw
+
+    @property
+    def snapshot(self):
+        if self._snapshot is None:
+            self._snapshot = BikeDataService()._clean_data(self.raw)
+        return self._snapshot
+
+    def stub_url(self):
+        if self._server is None:
+            self._server = start_stub_server(self.rows, 0)
+        return self._server[1]
+
+    def close(self):
+        if self._server is not None:
+            self._server[0].shutdown()
+            self._server = None
+
+def publish(frame):
+    """
+    发布两个新版本，使各会话共享的派生视图无法使用增量，下一次调用走完整计算
+
+    每次发布不同的 DataFrame 对象：与当前快照是同一个对象时 SnapshotCache 视为未变化，不会发布新版本。
+    """
+    snapshot_cache.refresh(lambda: frame.copy())
+    snapshot_cache.refresh(lambda: frame.copy())
+
+# ---- 测试用例：prepare(fixture) 返回 (每次调用前的准备函数, 被测函数, 输出大小函数) ----
+
+def case_get_bike_data(fixture):
+    service = BikeDataService()
+    service.base_url = fixture.stub_url()
+    # 模拟服务每次返回相同内容，清空分页缓存以测量完整的抓取和解析
+    return service.forget_pages, service.fetch_bike_data, snapshot_nbytes
+
+def case_get_bike_data_unchanged(fixture):
+    service = BikeDataService()
+    service.base_url = fixture.stub_url()
+    service.fetch_bike_data()
+    return None, service.fetch_bike_data, snapshot_nbytes
+
+def case_clean_data(fixture):
+    service = BikeDataService()
+    raw = fixture.raw
+    return None, lambda: service._clean_data(raw), snapshot_nbytes
+
+def case_realtime_status(fixture):
+    status = BikeStationStatus()
+    frame = fixture.snapshot
+    return lambda: publish(frame), status.get_realtime_status, _json_bytes
+
+def case_station_status(fixture):
+    frame = fixture.snapshot
+    return lambda: publish(frame), bike_service.get_station_status, _json_bytes
+
+def case_station_list_html(fixture):
+    publish(fixture.snapshot)
+    stations = BikeStationStatus().get_realtime_status()['no_rental']['stations']
+    # 不传版本：每次都重新生成，测量的是未命中缓存时的开销
+    return None, lambda: get_station_list_html(stations), _text_bytes
+
+def case_panel_prepare(fixture):
+    frame = fixture.snapshot
+
+    def prepare():
+        panel = StationPanel()
+        panel.update_data(frame)
+        return panel.display_data
+    return None, prepare, lambda df: int(df.memory_usage(index=True, deep=True).sum())
+
+def case_station_search(fixture):
+    search = SnapshotSearch(fixture.snapshot)
+    # 第一次查询会拼接检索字符串，不计入
+    search.query('망원')
+    return None, lambda: search.query('망원역', sort='bikes_desc'), lambda result: int(result.rows.nbytes)
+
+def case_map_html(fixture):
+    frame = fixture.snapshot
+    return None, lambda: get_seoul_map_html(frame), _text_bytes
+
+def case_map_html_districts(fixture):
+    frame = fixture.snapshot
+    return None, lambda: get_seoul_map_html(frame, station_layer='districts'), _text_bytes
+
+def _text_bytes(text):
+    return len(text.encode('utf-8'))
+
+def _json_bytes(result):
+    return len(json.dumps(result, ensure_ascii=False, default=str).encode('utf-8'))
+
+CASES = {
+    'get_bike_data': case_get_bike_data,
+    'get_bike_data_unchanged': case_get_bike_data_unchanged,
+    'clean_data': case_clean_data,
+    'realtime_status': case_realtime_status,
+    'station_status': case_station_status,
+    'station_list_html': case_station_list_html,
+    'panel_prepare': case_panel_prepare,
+    'station_search': case_station_search,
+    'map_html': case_map_html,
+    'map_html_districts': case_map_html_districts
+}
+
+def measure(before, func, size_of, repeat):
+    """返回 (各次耗时, 峰值内存, 输出大小)；峰值内存单独运行一次测量，避免 tracemalloc 影响耗时"""
+    times = []
+    result = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            if before:
+                before()
+            gc.collect()
+            started = time.perf_counter()
+            result = func()
+            times.append((time.perf_counter() - started) * 1000)
+
+        if before:
+            before()
+        del result
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return times, peak, size_of(result)
+
+def load_fixtures(sizes, payload):
+    fixtures = [Fixture(f'synthetic-{size}', make_rows(size, seed=size)) for size in sizes]
+    if payload and Path(payload).exists():
+        with gzip.open(payload, 'rt', encoding='utf-8') as f:
+            recorded = json.load(f)
+        fixtures.append(Fixture(f"recorded-{recorded['recorded_at']}", recorded['rows']))
+    else:
+        print(f"no recorded payload at {payload}; run `python -m benchmarks.suite record` to add one")
+    return fixtures
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def run(args):
+    cases = args.cases or list(CASES)
+    fixtures = load_fixtures(args.sizes, args.payload)
+    results = []
+    print(f"{'case':>24} {'fixture':>22} {'min(ms)':>10} {'median(ms)':>11} {'peak(KB)':>10} {'output(B)':>12}")
+    for fixture in fixtures:
+        try:
+            for name in cases:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    before, func, size_of = CASES[name](fixture)
+                times, peak, output = measure(before, func, size_of, args.repeat)
+                entry = {
+                    'case': name,
+                    'fixture': fixture.name,
+                    'stations': fixture.stations,
+                    'time_ms': round(statistics.median(times), 3),
+                    'time_ms_min': round(min(times), 3),
+                    'peak_kb': round(peak / 1024, 1),
+                    'output_bytes': output
+                }
+                results.append(entry)
+                print(f"{name:>24} {fixture.name:>22} {entry['time_ms_min']:>10.2f} {entry['time_ms']:>11.2f} "
+                      f"{entry['peak_kb']:>10.0f} {entry['output_bytes']:>12}")
+        finally:
+            fixture.close()
+
+    # 冷启动导入耗时（新的解释器中测量，streamlit 预先导入，与 streamlit run 执行页面脚本时相同）
+    for module in args.imports:
+        times, _, modules = measure_import(module, args.repeat)
+        entry = {
+            'case': f'import {module}',
+            'fixture': 'cold-process',
+            'stations': 0,
+            'time_ms': round(statistics.median(times), 3),
+            'time_ms_min': round(min(times), 3),
+            'peak_kb': 0.0,
+            'output_bytes': 0,
+            'modules': len(modules)
+        }
+        results.append(entry)
+        print(f"{entry['case']:>24} {entry['fixture']:>22} {entry['time_ms_min']:>10.2f} {entry['time_ms']:>11.2f} "
+              f"{'':>10} {'':>12}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat
+        },
+        'results': results
+    }, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"results written to {output}")
+
+def compare(args):
+    """比较两次运行，新结果超过旧结果 (1 + threshold) 倍的指标视为退化，有退化时返回非零退出码"""
+    old = {(r['case'], r['fixture']): r for r in json.loads(Path(args.old).read_text(encoding='utf-8'))['results']}
+    new = {(r['case'], r['fixture']): r for r in json.loads(Path(args.new).read_text(encoding='utf-8'))['results']}
+    regressions = 0
+    print(f"{'case':>24} {'fixture':>22} " + ' '.join(f"{metric:>14}" for metric in METRICS))
+    for key in sorted(old.keys() & new.keys()):
+        cells = []
+        for metric in METRICS:
+            before, after = old[key][metric], new[key][metric]
+            ratio = after / before if before else (1.0 if after == before else float('inf'))
+            # 耗时太短（低于 min_ms）时波动大，不判定退化
+            flagged = ratio > 1 + args.threshold and not (metric == 'time_ms' and after < args.min_ms)
+            regressions += flagged
+            cells.append(f"{ratio:>12.2f}x{'!' if flagged else ' '}")
+        print(f"{key[0]:>24} {key[1]:>22} " + ' '.join(cells))
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f"{key[0]:>24} {key[1]:>22} only in {'old' if key in old else 'new'} run")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+def record(args):
+    """从 OpenAPI 录制一份完整的 bikeList 原始数据，供 run 作为真实数据使用"""
+    try:
+        rows = BikeDataService().fetch_raw_rows()
+    except Exception as e:
+        print(f"failed to fetch bikeList: {str(e)}")
+        return 1
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(output, 'wt', encoding='utf-8') as f:
+        json.dump({'recorded_at': datetime.now().strftime('%Y%m%dT%H%M'), 'rows': rows}, f, ensure_ascii=False)
+    print(f"recorded {len(rows)} stations to {output}")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='运行基准测试并写入结果文件')
+    run_parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES)
+    run_parser.add_argument('--cases', nargs='+', choices=list(CASES))
+    run_parser.add_argument('--payload', default=str(DEFAULT_PAYLOAD), help='录制的真实数据（gzip JSON）')
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--output', default=str(DEFAULT_OUTPUT))
+    run_parser.add_argument('--imports', nargs='*', default=IMPORT_TARGETS, help='测量冷导入耗时的模块（为空时跳过）')
+
+    compare_parser = commands.add_parser('compare', help='比较两次运行的结果')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.25, help='允许的相对增长（默认 25%%）')
+    compare_parser.add_argument('--min-ms', type=float, default=5.0, help='低于该耗时的用例不判定耗时退化')
+
+    record_parser = commands.add_parser('record', help='录制真实的 bikeList 数据')
+    record_parser.add_argument('--output', default=str(DEFAULT_PAYLOAD))
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    elif args.command == 'compare':
+        sys.exit(compare(args))
+    else:
+        sys.exit(record(args))
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,32 @@
-# 空文件，用于标记这是一个Python包 
+"""
+components 包
 
-from .data_service import get_bike_data, get_station_status
-from .error_boundary import error_boundary
-from .dynamic_scroll_view import DynamicScrollView
-from .maps import render_seoul_map
-from .header import render_header
-from .station_panel import StationPanel
-from .metrics import render_metrics
+子模块按需导入：`import components`（以及 `import components.xxx` 时先执行的本文件）
+不会加载地图（folium）、数据服务等较重的依赖，第一次访问下面导出的名称时才导入对应的子模块。
+"""
+import importlib
 
-__all__ = [
-    'get_bike_data',
-    'get_station_status',
-    'error_boundary',
-    'DynamicScrollView',
-    'render_seoul_map',
-    'render_header',
-    'StationPanel',
-    'render_metrics'
-] 
\ No newline at end of file
+# 导出的名称 -> 所在的子模块
+_EXPORTS = {
+    'get_bike_data': 'data_service',
+    'get_station_status': 'data_service',
+    'error_boundary': 'error_boundary',
+    'DynamicScrollView': 'dynamic_scroll_view',
+    'render_seoul_map': 'maps',
+    'render_header': 'header',
+    'StationPanel': 'station_panel',
+    'render_metrics': 'metrics'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,75 +1,34 @@
 from datetime import datetime
 import pytz
-from .data_service import get_bike_data
+from .data_service import get_station_classification
 
 class BikeStationStatus:
     def get_realtime_status(self):
         """获取实时的自行车站状态数据"""
         try:
-            # 从 data_service 获取数据
-            bike_data = get_bike_data()
+            # 从 data_service 获取分类结果：无法租赁(没有可用车辆)、无法返还(车架已满)和没有车架的站点，按站点编号排序
+            classified = get_station_classification()
             
-            if bike_data.empty:
+            if classified is None:
                 print("No stations data received")
                 return self._get_empty_response()
             
-            print(f"Total stations received: {len(bike_data)}")
+            print(f"Total stations received: {classified['total_stations']}")
             
-            # 将车站分为两类：无法租赁(没有可用车辆)和无法返还(车架已满)
-            no_rental_stations = []  # 无法租赁的站点（没有可用车辆）
-            no_return_stations = []  # 无法返还的站点（车架已满）
-            
-            for _, station in bike_data.iterrows():
-                try:
-                    parking = int(station['parkingBikeTotCnt'])  # 当前可用车辆数
-                    rack_total = int(station['rackTotCnt'])      # 总车架数
-                    shared = int(station['shared'])              # 使用率
-                    
-                    station_info = {
-                        'id': station['stationId'],
-                        'name': station['stationName'].strip(),
-                        'parking': parking,
-                        'rack_count': rack_total,
-                        'shared': shared
-                    }
-                    
-                    # 如果没有可用车辆，归类为无法租赁
-                    if parking == 0:
-                        no_rental_stations.append(station_info)
-                    # 只有当总车架数为0时，才归类为无法返还
-                    if rack_total == 0:
-                        no_return_stations.append(station_info)
-                        
-                except (ValueError, KeyError) as e:
-                    print(f"Error processing station {station.get('stationName', 'Unknown')}: {e}")
-                    continue
+            no_rental_stations = classified['no_rental']['stations']
+            no_return_stations = classified['no_return']['stations']
             
             # 获取当前韩国时间
             seoul_tz = pytz.timezone('Asia/Seoul')
             current_time = datetime.now(seoul_tz).strftime('%Y-%m-%d %H:%M:%S')
             
-            # 按站点ID排序（处理带有 'ST-' 前缀的ID）
-            def get_station_number(station):
-                try:
-                    # 移除 'ST-' 前缀并转换为整数
-                    return int(station['id'].replace('ST-', ''))
-                except (ValueError, AttributeError):
-                    return 0  # 如果转换失败，返回0
-            
-            no_rental_stations.sort(key=get_station_number)
-            no_return_stations.sort(key=get_station_number)
-            
             result = {
-                'no_rental': {
-                    'count': len(no_rental_stations),
-                    'stations': no_rental_stations
-                },
-                'no_return': {
-                    'count': len(no_return_stations),
-                    'stations': no_return_stations
-                },
+                'no_rental': classified['no_rental'],
+                'no_return': classified['no_return'],
+                'no_racks': classified['no_racks'],
+                'tiers': classified['tiers'],
                 'last_updated': current_time,
-                'total_stations': len(bike_data)
+                'total_stations': classified['total_stations']
             }
             
             print(f"Processing complete: Found {len(no_rental_stations)} no-rental and {len(no_return_stations)} no-return stations")
@@ -86,6 +45,7 @@ class BikeStationStatus:
         return {
             'no_rental': {'count': 0, 'stations': []},
             'no_return': {'count': 0, 'stations': []},
+            'no_racks': {'count': 0, 'stations': []},
             'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'total_stations': 0
         }
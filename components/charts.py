@@ -1,18 +1,29 @@
 import streamlit as st
-import plotly.express as px
-import numpy as np
+from datetime import datetime, timedelta
 from config.settings import COLORS
+from utils.history_store import history_store
+from components.data_service import get_district_stats
+
+def _px():
+    """plotly 较重，只在绘制图表时导入"""
+    import plotly.express as px
+    return px
 
 # 차트 렌더링 함수들
 def render_district_usage():
     with st.container(border=True, height=400):
         st.subheader("구별 이용 현황")
-        districts = ['강남구', '서초구', '종로구', '마포구', '영등포구']
-        values = [150, 130, 120, 100, 90]
-        fig = px.bar(
-            x=districts, 
-            y=values,
-            labels={'x': '구', 'y': '이용량'},
+        # 各区当前可用自行车数（按快照增量维护的汇总）
+        stats = get_district_stats()
+        if stats is None or stats.empty:
+            st.info("데이터를 불러올 수 없습니다.")
+            return
+        stats = stats.sort_values('bikes', ascending=False)
+        fig = _px().bar(
+            x=stats.index, 
+            y=stats['bikes'],
+            labels={'x': '구', 'y': '대여 가능 자전거'},
+            hover_data={'거치대 대비': (stats['utilization'] * 100).round(1).astype(str) + '%'},
             template='none'
         )
         fig.update_traces(marker_color=COLORS["primary"])
@@ -21,15 +32,21 @@ def render_district_usage():
 def render_hourly_usage():
     with st.container(border=True, height=400):
         st.subheader("시간대별 이용 추이")
-        hours = list(range(24))
-        usage = np.random.normal(100, 20, 24)
-        fig = px.line(
-            x=hours, 
-            y=usage,
-            labels={'x': '시간', 'y': '이용량'},
+        # 最近 24 小时内每小时的平均可用自行车数（来自历史存储）
+        end = datetime.now()
+        totals = history_store.hourly_totals(end - timedelta(hours=24), end)
+        if totals.empty:
+            st.info("아직 기록된 데이터가 없습니다.")
+            return
+        # 横轴使用时间戳（窗口跨越午夜时按时间顺序排列），刻度只显示小时
+        fig = _px().line(
+            x=totals.index,
+            y=totals.values,
+            labels={'x': '시간', 'y': '대여 가능 자전거'},
             template='none'
         )
         fig.update_traces(line_color=COLORS["primary"])
+        fig.update_xaxes(tickformat='%H시', hoverformat='%m-%d %H시')
         st.plotly_chart(fig, use_container_width=True)
 
 def render_age_distribution():
@@ -37,7 +54,7 @@ def render_age_distribution():
         st.subheader("연령대별 이용")
         age_groups = ['20대', '30대', '40대', '50대', '60대 이상']
         usage_by_age = [25, 30, 20, 15, 10]
-        fig = px.bar(
+        fig = _px().bar(
             x=age_groups,
             y=usage_by_age,
             labels={'x': '연령대', 'y': '이용률'},
@@ -49,7 +66,7 @@ def render_age_distribution():
 def render_member_types():
     with st.container(border=True, height=300):
         st.subheader("회원 유형별 이용")
-        fig = px.pie(
+        fig = _px().pie(
             values=[60, 40],
             names=['정기권', '일일권'],
             template='none'
@@ -62,7 +79,7 @@ def render_monthly_trend():
         st.subheader("월별 이용 추이")
         months = ['1월', '2월', '3월', '4월', '5월', '6월']
         monthly_usage = [80, 85, 90, 95, 100, 110]
-        fig = px.line(
+        fig = _px().line(
             x=months,
             y=monthly_usage,
             labels={'x': '월', 'y': '이용량'},
@@ -1,101 +1,360 @@
 import pandas as pd
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import hashlib
+import json
+import threading
+from collections import namedtuple
 import pytz
 import logging
+from config.settings import SEOUL_API_CONFIG, HISTORY_CONFIG, SNAPSHOT_STORE_CONFIG
+from utils.snapshot_cache import snapshot_cache
+from utils.history_store import history_store
+from utils.instrumentation import metrics, span
+from utils.api_client import api_client, ApiUnavailable, UpstreamError
+from .station_classifier import StationStatusView
+from .snapshot import build_station_frame, frame_from_columns
+from .page_decoder import decode_page, concat_columns
+from .district_index import district_index
+from .district_stats import DistrictStatsView
+from .snapshot_delta import delta_tracker
+from .snapshot_store import snapshot_store
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# 进程级站点分类结果：每个快照版本只计算一次，相邻版本之间按变化增量更新
+_status_view = StationStatusView()
+_district_view = DistrictStatsView()
+_status_lock = threading.Lock()
+
+def _sync_view(view, snapshot, stage):
+    """将派生视图更新到快照的版本：相邻版本应用变化，否则完整重建"""
+    if view.version != snapshot.version:
+        delta = delta_tracker.get(view.version, snapshot.version)
+        if delta is not None:
+            with span(stage, mode='delta'):
+                view.apply_delta(snapshot.data, delta)
+        else:
+            with span(stage, mode='rebuild'):
+                view.rebuild(snapshot.data, snapshot.version)
+
+def classify_snapshot(snapshot):
+    """返回快照的站点分类结果（各会话共享，请勿修改）"""
+    with _status_lock:
+        _sync_view(_status_view, snapshot, 'classify')
+        return _status_view.to_dict()
+
+def district_stats_snapshot(snapshot):
+    """返回快照的各区汇总（各会话共享，请勿修改）"""
+    with _status_lock:
+        _sync_view(_district_view, snapshot, 'district_stats')
+        return _district_view.to_frame()
+
+def _check_result(body):
+    """
+    bikeList 在 HTTP 200 中返回错误结果码时（{"RESULT": {"CODE": "ERROR-500"}}）抛出 UpstreamError
+
+    只检查很短的响应体（正常分页很大，不在这里解析）；服务端错误（ERROR-5xx/6xx）可以重试。
+    """
+    if len(body) > 512 or b'ERROR-' not in body:
+        return
+    try:
+        code = json.loads(body).get('RESULT', {}).get('CODE', '')
+    except ValueError:
+        return
+    if code.startswith('ERROR-'):
+        raise UpstreamError(f"bikeList result {code}", retryable=code[6:7] in ('5', '6'))
+
+class PageError(ApiUnavailable):
+    """一页数据无法使用（无法解码、结果码异常或中间缺页），整次刷新放弃"""
+    reason = 'page'
+
+# 一页抓取结果：响应体指纹、解码后的 (列, valid 掩码)、行数、list_total_count
+Page = namedtuple('Page', ['digest', 'columns', 'count', 'total'])
+EMPTY_PAGE = Page(None, None, 0, 0)
+
 class BikeDataService:
     def __init__(self):
         """初始化数据服务"""
-        self.api_key = "4a5148476d7a657238397858415851"
-        self.base_url = "http://openapi.seoul.go.kr:8088"
+        self.api_key = SEOUL_API_CONFIG['api_key']
+        self.base_url = SEOUL_API_CONFIG['base_url']
+        self.page_size = SEOUL_API_CONFIG['page_size']
+        self.max_workers = SEOUL_API_CONFIG['max_workers']
+        self.timeout = SEOUL_API_CONFIG['timeout']
+        # 上一次抓取的各页指纹：digest -> Page，以及由这些页构建的快照
+        self._pages = {}
+        self._last_digests = None
+        self._last_frame = None
         
+    def get_snapshot(self):
+        """获取当前数据快照 (version, data, fetched_at)"""
+        return snapshot_cache.get(self.fetch_bike_data)
+    
+    def refresh(self):
+        """从 API 重新加载并发布新快照（由后台刷新线程调用）"""
+        return snapshot_cache.refresh(self.fetch_bike_data)
+    
+    def restore_snapshot(self):
+        """
+        进程启动时载入本地保存的最近一次快照（还没有快照时，整个进程只生效一次）
+
+        载入的快照为版本 1 并标记为 stale，首次渲染不必等待 OpenAPI；
+        保存时的分类结果和各区汇总直接作为派生视图的初始状态，
+        之后的第一次刷新按变化增量更新它们。没有可用的文件时返回 None。
+        """
+        if not SNAPSHOT_STORE_CONFIG['enabled'] or snapshot_cache.peek() is not None:
+            return None
+        with span('restore'):
+            saved = snapshot_store.load()
+            if saved is None:
+                return None
+            snapshot = snapshot_cache.restore(saved.data, saved.fetched_at)
+            if snapshot is None:
+                return None
+            delta_tracker.on_snapshot(snapshot)
+            with _status_lock:
+                if saved.classification is not None:
+                    _status_view.restore(saved.classification, snapshot.version)
+                if saved.district_stats is not None:
+                    _district_view.restore(snapshot.data, saved.district_stats, snapshot.version)
+        logger.info(f"Restored {len(snapshot.data)} stations saved at {snapshot.fetched_at:%Y-%m-%d %H:%M:%S}")
+        return snapshot
+    
     def get_bike_data(self):
+        """获取自行车数据（经过进程级快照缓存，返回的 DataFrame 为共享数据，请勿修改）"""
+        return self.get_snapshot().data
+    
+    def fetch_bike_data(self):
         """서울시 공공자전거 실시간 대여정보 API 호출"""
+        with span('fetch'):
+            return self._fetch_bike_data()
+    
+    def _fetch_bike_data(self):
+        # 本次刷新的所有请求、限流等待和重试共用一个时间预算
+        budget = api_client.budget()
         try:
-            urls = [
-                f"{self.base_url}/{self.api_key}/json/bikeList/1/1000",
-                f"{self.base_url}/{self.api_key}/json/bikeList/1001/2000",
-                f"{self.base_url}/{self.api_key}/json/bikeList/2001/3000"
-            ]
+            pages = self._fetch_pages(lambda start, end: self._fetch_page_result(start, end, budget))
             
-            dfs = []
-            for url in urls:
-                try:
-                    response = requests.get(url, timeout=10)
-                    response.raise_for_status()
-                    
-                    data = response.json()
-                    if 'rentBikeStatus' not in data:
-                        logger.warning(f"Unexpected API response format: {data}")
-                        continue
-                        
-                    df = pd.DataFrame(data['rentBikeStatus']['row'])
-                    dfs.append(df)
-                except Exception as e:
-                    logger.error(f"Error fetching data from {url}: {str(e)}")
-                    continue
+            # 所有页与上一次完全相同：直接沿用上一次的快照，跳过解析和派生计算
+            # （上一次没能分配区而区的边界现在可用时除外）
+            digests = tuple(page.digest for page in pages)
+            if digests == self._last_digests and self._last_frame is not None and (
+                    len(self._last_frame['district'].cat.categories) or not district_index.ready):
+                metrics.inc('snapshots_unchanged_total')
+                return self._last_frame
             
-            if not dfs:
-                raise ValueError("No data retrieved from any API endpoint")
-                
-            final_df = pd.concat(dfs, ignore_index=True)
-            self._clean_data(final_df)
-            return final_df
+            with span('concat'):
+                columns, valid = concat_columns([page.columns for page in pages])
+            with span('clean'):
+                frame = frame_from_columns(columns, valid)
+            frame = self._with_district(frame)
+            
+            self._pages = {page.digest: page for page in pages}
+            self._last_digests = digests
+            self._last_frame = frame
+            return frame
             
+        except ApiUnavailable as e:
+            # 预算用完、熔断打开或重试后仍失败：不发布缺页的快照，沿用上一次的快照（标记为过期）
+            metrics.inc('refresh_aborted_total', reason=e.reason)
+            logger.warning(f"Refresh abandoned, serving the last snapshot: {str(e)}")
+            return pd.DataFrame()
         except Exception as e:
-            logger.error(f"Error in get_bike_data: {str(e)}")
+            metrics.inc('pipeline_stage_errors_total', stage='fetch')
+            logger.error(f"Error in fetch_bike_data: {str(e)}")
             return pd.DataFrame()
     
-    def _clean_data(self, df):
-        """清理和转换数据"""
-        numeric_columns = ['parkingBikeTotCnt', 'rackTotCnt', 'shared']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+    def forget_pages(self):
+        """清除页指纹，下一次抓取完整解析所有页"""
+        self._pages = {}
+        self._last_digests = None
+        self._last_frame = None
+    
+    def _fetch_pages(self, fetch, count=lambda page: page.count, total=lambda page: page.total):
+        """
+        请求全部分页，返回有数据的各页（按页的顺序）
+
+        先请求第一页，根据 list_total_count 计算剩余页的范围并发请求；最后一页仍然是满的时继续向后探测。
+        fetch(start, end) 请求一页，count(page)、total(page) 返回这一页的行数和 list_total_count。
+
+        Raises:
+            ValueError: 第一页没有数据
+            PageError: 不满的页（包括没有数据的页）之后的页仍有数据（中间缺行），
+                或行数少于大于一页的 list_total_count
+        """
+        first = fetch(1, self.page_size)
+        first_count = count(first)
+        if not first_count:
+            raise ValueError("No data retrieved from the first page")
+        
+        pages = [first]
+        reported = total(first)
+        received = first_count
+        # 第一个行数少于请求范围的页：只能是数据的最后一页
+        short = (1, self.page_size) if first_count < self.page_size else None
+        ranges = self._page_ranges(max(reported, first_count))[1:]
+        if not ranges and first_count >= self.page_size:
+            ranges = self._probe_ranges(self.page_size)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while ranges:
+                results = list(executor.map(lambda r: fetch(*r), ranges))
+                for (start, end), page in zip(ranges, results):
+                    rows = count(page)
+                    if rows and short is not None:
+                        raise PageError(
+                            f"bikeList page {short[0]}-{short[1]} returned fewer rows than requested "
+                            f"before the end of the data"
+                        )
+                    if rows < end - start + 1 and short is None:
+                        short = (start, end)
+                    if rows:
+                        pages.append(page)
+                        received += rows
+                        reported = max(reported, total(page))
+                
+                # 最后一页仍然是满的，说明后面可能还有数据，继续向后翻页
+                last_end = ranges[-1][1]
+                ranges = self._probe_ranges(last_end) if short is None else []
+        
+        # list_total_count 大于一页时才可信（只报告一页大小时由上面的探测补全）
+        if reported > self.page_size and received < reported:
+            raise PageError(f"bikeList returned {received} of {reported} rows")
+        return pages
+    
+    def fetch_raw_rows(self):
+        """
+        请求全部分页的原始站点行（用于录制基准测试数据，不经过快照缓存）
+
+        分页方式与 fetch_bike_data 相同。
+
+        Raises:
+            ApiUnavailable: 某一页请求失败或中间缺页
+            ValueError: 第一页没有数据
+        """
+        budget = api_client.budget()
+        pages = self._fetch_pages(
+            lambda start, end: self._fetch_page(start, end, budget),
+            count=lambda page: len(page[0]), total=lambda page: page[1]
+        )
+        return [row for rows, _ in pages for row in rows]
+    
+    def _page_ranges(self, total_count):
+        """根据总条数计算每页的 (start, end) 范围"""
+        return [
+            (start, min(start + self.page_size - 1, total_count))
+            for start in range(1, total_count + 1, self.page_size)
+        ]
+    
+    def _probe_ranges(self, last_end):
+        """list_total_count 不足以覆盖全部数据时，生成下一批待探测的页范围"""
+        return [
+            (last_end + 1 + i * self.page_size, last_end + (i + 1) * self.page_size)
+            for i in range(self.max_workers)
+        ]
+    
+    def _fetch_page(self, start, end, budget=None):
+        """请求单页数据，返回完整的原始行 (rows, list_total_count)；超出数据范围时 rows 为空列表"""
+        body = self._request_page(start, end, budget)
+        status = json.loads(body).get('rentBikeStatus', {})
+        return status.get('row', []), int(status.get('list_total_count', 0))
+    
+    def _request_page(self, start, end, budget=None):
+        """
+        通过共享的 api_client 请求单页的原始响应体（限流、退避重试、熔断）
+
+        Raises:
+            ApiUnavailable: 重试后仍失败、熔断打开或时间预算用完
+        """
+        url = f"{self.base_url}/{self.api_key}/json/bikeList/{start}/{end}"
+        try:
+            return api_client.get(url, 'bikeList', budget=budget, validate=_check_result)
+        except ApiUnavailable as e:
+            metrics.inc('upstream_page_errors_total', page=str(start), kind=e.reason)
+            logger.error(f"Error fetching data from {url}: {str(e)}")
+            raise
+    
+    def _fetch_page_result(self, start, end, budget=None):
+        """
+        请求单页数据，返回 Page
+
+        先对原始响应体计算指纹，与上一次抓取的某一页相同时直接复用那一页已解码的列，
+        不再解码 JSON；否则边解析边把站点行写入按列预分配的类型化缓冲区（page_decoder）。
+        超出数据范围（INFO-200）时 count 为 0；请求失败、无法解码或结果码不是 INFO-000 时
+        抛出 ApiUnavailable（整次刷新放弃，不发布缺页的快照）。
+        """
+        body = self._request_page(start, end, budget)
+        page = str(start)
+        try:
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            cached = self._pages.get(digest)
+            if cached is not None:
+                metrics.inc('upstream_pages_total', result='unchanged')
+                metrics.inc('upstream_decode_skipped_bytes_total', len(body))
+                return cached
+            metrics.inc('upstream_pages_total', result='changed')
+            
+            with span('decode'):
+                buffer, data = decode_page(body, end - start + 1)
+        except Exception as e:
+            metrics.inc('upstream_page_errors_total', page=page, kind='decode')
+            logger.error(f"Error decoding bikeList page {start}-{end}: {str(e)}")
+            raise PageError(f"bikeList page {start}-{end} could not be decoded: {str(e)}") from e
         
-        df['stationLatitude'] = pd.to_numeric(df['stationLatitude'], errors='coerce')
-        df['stationLongitude'] = pd.to_numeric(df['stationLongitude'], errors='coerce')
+        if 'rentBikeStatus' not in data:
+            # 超出数据范围时 API 返回 INFO-200（해당하는 데이터가 없습니다）
+            if data.get('RESULT', {}).get('CODE') == 'INFO-200':
+                return EMPTY_PAGE
+            metrics.inc('upstream_page_errors_total', page=page, kind='format')
+            logger.warning(f"Unexpected API response format: {data}")
+            raise PageError(f"bikeList page {start}-{end}: unexpected response format")
         
-        return df
+        status = data['rentBikeStatus']
+        code = status.get('RESULT', {}).get('CODE', 'INFO-000')
+        if code != 'INFO-000':
+            metrics.inc('upstream_page_errors_total', page=page, kind='format')
+            raise PageError(f"bikeList page {start}-{end}: result {code}")
+        metrics.observe('upstream_page_rows', buffer.count)
+        return Page(digest, buffer.trim(), buffer.count, int(status.get('list_total_count', 0)))
+    
+    def _clean_data(self, df):
+        """清理和转换原始行组成的 DataFrame，生成紧凑的只读快照（附带站点所在的区）"""
+        with span('clean'):
+            frame = build_station_frame(df)
+        return self._with_district(frame)
+    
+    def _with_district(self, frame):
+        with span('district'):
+            frame['district'] = district_index.assign(frame)
+        return frame
+    
+    def get_classification(self):
+        """获取当前快照的站点分类结果，没有数据时返回 None"""
+        snapshot = self.get_snapshot()
+        if snapshot.data.empty:
+            return None
+        return classify_snapshot(snapshot)
+    
+    def get_district_stats(self):
+        """获取当前快照的各区汇总，没有数据时返回 None"""
+        snapshot = self.get_snapshot()
+        if snapshot.data.empty:
+            return None
+        return district_stats_snapshot(snapshot)
     
     def get_station_status(self):
         """获取站点状态统计"""
         try:
-            df = self.get_bike_data()
-            if df.empty:
+            classified = self.get_classification()
+            if classified is None:
                 logger.warning("No bike data available")
                 return self._get_empty_status()
             
-            # 计算每个站点的剩余车架数
-            df['remaining_racks'] = df['rackTotCnt'] - df['parkingBikeTotCnt']
-            
-            # 识别无法租赁和无法返还的站点
-            no_rental_stations = df[df['parkingBikeTotCnt'] == 0]
-            no_return_stations = df[df['remaining_racks'] == 0]
-            
             # 获取当前韩国时间
             seoul_tz = pytz.timezone('Asia/Seoul')
             current_time = datetime.now(seoul_tz).strftime('%Y-%m-%d %H:%M:%S')
             
-            result = {
-                'no_rental': {
-                    'count': len(no_rental_stations),
-                    'stations': self._convert_stations(no_rental_stations)
-                },
-                'no_return': {
-                    'count': len(no_return_stations),
-                    'stations': self._convert_stations(no_return_stations)
-                },
-                'total_stations': len(df),
-                'last_updated': current_time
-            }
+            result = dict(classified, last_updated=current_time)
             
             logger.info(f"Station status updated: {result['total_stations']} total stations")
             return result
@@ -104,31 +363,12 @@ class BikeDataService:
             logger.error(f"Error processing station status: {str(e)}")
             return self._get_empty_status()
     
-    def _convert_stations(self, stations_df):
-        """转换站点数据为列表格式"""
-        try:
-            return [
-                {
-                    'id': row['stationId'],
-                    'name': row['stationName'].strip(),
-                    'parking': int(row['parkingBikeTotCnt']),    
-                    'rack_count': int(row['rackTotCnt']),        
-                    'remaining_racks': int(row['remaining_racks']),
-                    'shared': int(row['shared']),
-                    'lat': float(row['stationLatitude']),
-                    'lng': float(row['stationLongitude'])
-                }
-                for _, row in stations_df.iterrows()
-            ]
-        except Exception as e:
-            logger.error(f"Error converting station data: {str(e)}")
-            return []
-    
     def _get_empty_status(self):
         """返回空状态响应"""
         return {
             'no_rental': {'count': 0, 'stations': []},
             'no_return': {'count': 0, 'stations': []},
+            'no_racks': {'count': 0, 'stations': []},
             'total_stations': 0,
             'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
@@ -144,15 +384,50 @@ class BikeDataService:
             'total_stations': status['total_stations'],
             'no_rental_count': status['no_rental']['count'],
             'no_return_count': status['no_return']['count'],
+            'no_racks_count': status['no_racks']['count'],
             'last_updated': status['last_updated']
         }
 
 # 创建单例实例
 bike_service = BikeDataService()
 
+# 每个新快照只计算一次与上一版本的差异，供各会话增量更新
+snapshot_cache.subscribe(delta_tracker.on_snapshot)
+
+# 每个新快照都追加到本地历史存储（后台线程写入）
+if HISTORY_CONFIG['enabled']:
+    snapshot_cache.subscribe(history_store.append)
+
+# 每个新快照都保存为本地的最近一次快照，供下次启动时立即载入（后台线程写入）
+if SNAPSHOT_STORE_CONFIG['enabled']:
+    snapshot_cache.subscribe(snapshot_store.submit)
+
+# 快照时效等指标在抓取 /metrics 时才计算
+def _snapshot_gauge(func):
+    def collect():
+        snapshot = snapshot_cache.peek()
+        return func(snapshot) if snapshot is not None else None
+    return collect
+
+metrics.gauge_callback('snapshot_age_seconds', _snapshot_gauge(
+    lambda snapshot: (datetime.now() - snapshot.fetched_at).total_seconds()
+))
+metrics.gauge_callback('snapshot_version', _snapshot_gauge(lambda snapshot: snapshot.version))
+metrics.gauge_callback('snapshot_stations', _snapshot_gauge(lambda snapshot: len(snapshot.data)))
+metrics.gauge_callback('snapshot_stale', _snapshot_gauge(lambda snapshot: int(snapshot.stale)))
+metrics.gauge_callback('snapshot_cache_requests_total', lambda: {
+    (('result', result),): count for result, count in snapshot_cache.get_stats().items()
+})
+
 # 导出便捷函数
 def get_bike_data():
     return bike_service.get_bike_data()
 
 def get_station_status():
-    return bike_service.get_station_status() 
\ No newline at end of file
+    return bike_service.get_station_status()
+
+def get_station_classification():
+    return bike_service.get_classification()
+
+def get_district_stats():
+    return bike_service.get_district_stats()
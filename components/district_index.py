@@ -0,0 +1,173 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    from .map import map_service
+    from .snapshot import station_ids
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from components.map import map_service
+    from components.snapshot import station_ids
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN = -2      # 尚未计算
+UNASSIGNED = -1   # 不在任何区内（或坐标无效）
+CHUNK_SIZE = 4096
+
+def _polygons(geometry):
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+def _edges(feature):
+    """把一个区的所有环（含 MultiPolygon 和洞）展开为边数组 (x1, y1, x2, y2)"""
+    segments = []
+    for polygon in _polygons(feature['geometry']):
+        for ring in polygon:
+            ring = np.asarray(ring, dtype=np.float64)[:, :2]
+            segments.append(np.hstack([ring[:-1], ring[1:]]))
+    return np.vstack(segments)
+
+def points_in_edges(lng, lat, edges):
+    """
+    向量化射线法（奇偶规则）
+
+    对每个点向右发出水平射线，统计与边相交的次数，奇数为在多边形内。
+    所有环一起计算，洞和多个多边形自然得到正确结果。
+    """
+    x1, y1, x2, y2 = (edges[:, i] for i in range(4))
+    inside = np.zeros(len(lng), dtype=bool)
+    # 顶点 y 相同的边不会与水平射线相交，提前去掉以免除零
+    sloped = y1 != y2
+    x1, y1, x2, y2 = x1[sloped], y1[sloped], x2[sloped], y2[sloped]
+    slope = (x2 - x1) / (y2 - y1)
+    for start in range(0, len(lng), CHUNK_SIZE):
+        px = lng[start:start + CHUNK_SIZE, None]
+        py = lat[start:start + CHUNK_SIZE, None]
+        crosses = ((y1 > py) != (y2 > py)) & (px < x1 + (py - y1) * slope)
+        inside[start:start + CHUNK_SIZE] = np.count_nonzero(crosses, axis=1) % 2 == 1
+    return inside
+
+class DistrictIndex:
+    """
+    站点 -> 行政区（구）映射
+
+    区的边界来自 MapService 的全精度 GeoJSON，先用每个区的外接矩形筛掉不可能的点，
+    再对剩余的点做向量化射线法。结果按 station_idx（stationId 的稳定编码）缓存，
+    之后的快照只计算新出现的站点。
+    行政区划数据加载失败（MapService 只有备用轮廓）时不分配区、不缓存，下一次再尝试加载。
+    """
+    def __init__(self, geojson=None):
+        self._geojson = geojson
+        self._lock = threading.Lock()
+        self._districts = None
+        self._dtype = None
+        self._codes = np.empty(0, dtype=np.int16)
+
+    def _load(self):
+        """加载区的边界，返回是否可用"""
+        if self._districts is not None:
+            return True
+        geojson = self._geojson
+        if geojson is None:
+            geojson = map_service.get_seoul_geojson('full')
+            if not map_service.geometry_loaded():
+                # 得到的是备用轮廓，不能当作区的边界
+                logger.warning("District boundaries unavailable, stations are left unassigned")
+                return False
+        features = sorted(
+            geojson['features'],
+            key=lambda f: (str(f['properties'].get('code', '')), f['properties'].get('name', ''))
+        )
+        districts = []
+        for feature in features:
+            edges = _edges(feature)
+            xs = np.concatenate([edges[:, 0], edges[:, 2]])
+            ys = np.concatenate([edges[:, 1], edges[:, 3]])
+            districts.append({
+                'code': feature['properties'].get('code'),
+                'name': feature['properties'].get('name'),
+                'bbox': (xs.min(), ys.min(), xs.max(), ys.max()),
+                'edges': edges
+            })
+        self._districts = districts
+        self._dtype = pd.CategoricalDtype([d['name'] for d in districts])
+        return True
+
+    @property
+    def ready(self):
+        """区的边界是否可用（不可用时会尝试重新加载）"""
+        with self._lock:
+            return self._load()
+
+    @property
+    def dtype(self):
+        """district 列的 CategoricalDtype（按区代码排序的区名），边界不可用时没有类别"""
+        with self._lock:
+            return self._dtype if self._load() else pd.CategoricalDtype([])
+
+    @property
+    def districts(self):
+        """[(区代码, 区名)]，顺序与 district 列的类别编码一致"""
+        with self._lock:
+            if not self._load():
+                return []
+            return [(d['code'], d['name']) for d in self._districts]
+
+    def locate(self, lng, lat):
+        """计算一组坐标所在区的编码（不使用缓存），不在任何区内时为 -1"""
+        lng = np.asarray(lng, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        codes = np.full(len(lng), UNASSIGNED, dtype=np.int16)
+        pending = ~(np.isnan(lng) | np.isnan(lat))
+        for code, district in enumerate(self._districts):
+            min_x, min_y, max_x, max_y = district['bbox']
+            candidates = np.flatnonzero(
+                pending & (lng >= min_x) & (lng <= max_x) & (lat >= min_y) & (lat <= max_y)
+            )
+            if len(candidates) == 0:
+                continue
+            inside = candidates[points_in_edges(lng[candidates], lat[candidates], district['edges'])]
+            codes[inside] = code
+            pending[inside] = False
+        return codes
+
+    def assign(self, frame):
+        """
+        返回快照中每个站点所在区的 Categorical（不在首尔范围内的站点为 NaN）
+
+        frame 需要包含 station_idx、stationLongitude、stationLatitude 列。
+        """
+        try:
+            station_idx = frame['station_idx'].to_numpy()
+            with self._lock:
+                if not self._load():
+                    return pd.Categorical([None] * len(frame), categories=[])
+                if len(self._codes) < len(station_ids):
+                    grown = np.full(len(station_ids), UNKNOWN, dtype=np.int16)
+                    grown[:len(self._codes)] = self._codes
+                    self._codes = grown
+
+                missing = np.flatnonzero(self._codes[station_idx] == UNKNOWN)
+                if len(missing):
+                    self._codes[station_idx[missing]] = self.locate(
+                        frame['stationLongitude'].to_numpy()[missing],
+                        frame['stationLatitude'].to_numpy()[missing]
+                    )
+                    logger.info(f"Assigned districts for {len(missing)} new stations")
+                codes = self._codes[station_idx]
+                dtype = self._dtype
+            return pd.Categorical.from_codes(codes, dtype=dtype, validate=False)
+        except Exception as e:
+            logger.error(f"Error assigning districts: {str(e)}")
+            return pd.Categorical([None] * len(frame), categories=[])
+
+# 进程级站点-区映射
+district_index = DistrictIndex()
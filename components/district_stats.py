@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from .station_classifier import compute_tiers
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from components.station_classifier import compute_tiers
+
+# 各区累加的指标
+SUM_COLUMNS = ['bikes', 'racks', 'stations', 'empty_stations', 'full_stations']
+
+def station_contributions(parking, rack_total, config=None):
+    """每个站点对各项指标的贡献，(n, len(SUM_COLUMNS)) 的整数矩阵"""
+    parking = np.asarray(parking, dtype=np.int64)
+    rack_total = np.asarray(rack_total, dtype=np.int64)
+    tiers = np.asarray(compute_tiers(
+        pd.DataFrame({'parkingBikeTotCnt': parking, 'rackTotCnt': rack_total}), config
+    ))
+    return np.column_stack([
+        parking,
+        rack_total,
+        np.ones(len(parking), dtype=np.int64),
+        tiers == 'empty',
+        tiers == 'full'
+    ]).astype(np.int64)
+
+def aggregate_districts(df, config=None):
+    """
+    按区汇总一个快照
+
+    Returns:
+        以区名为索引的 DataFrame: bikes, racks, stations, empty_stations, full_stations,
+        utilization（可用车辆 / 车架数）；没有站点的区也会出现（各项为 0）
+    """
+    contributions = pd.DataFrame(
+        station_contributions(df['parkingBikeTotCnt'], df['rackTotCnt'], config),
+        columns=SUM_COLUMNS
+    )
+    totals = contributions.groupby(df['district'].to_numpy(), observed=False).sum()
+    return _with_utilization(totals.reindex(df['district'].cat.categories, fill_value=0))
+
+def _with_utilization(totals):
+    totals = totals.copy()
+    racks = totals['racks'].to_numpy()
+    totals['utilization'] = np.divide(
+        totals['bikes'].to_numpy(), racks,
+        out=np.zeros(len(totals), dtype=np.float64), where=racks > 0
+    )
+    totals.index.name = 'district'
+    return totals
+
+class DistrictStatsView:
+    """
+    可增量更新的各区汇总
+
+    rebuild() 对整个快照做一次 groupby；apply_delta() 只对变化、新增、移除的站点
+    减去旧贡献、加上新贡献，计算量与变化的站点数成正比。
+    """
+    def __init__(self, config=None):
+        self.config = config
+        self.version = None
+        self._districts = pd.Index([])
+        self._sums = np.zeros((0, len(SUM_COLUMNS)), dtype=np.int64)
+        self._district_of = np.empty(0, dtype=np.int16)   # station_idx -> 区编码
+        self._result = None
+
+    def rebuild(self, df, version=None):
+        """对整个快照重新汇总"""
+        self.restore(df, aggregate_districts(df, self.config), version)
+
+    def restore(self, df, totals, version=None):
+        """直接使用已有的各区汇总（只需要 SUM_COLUMNS 列，例如本地保存的快照）"""
+        self._districts = totals.index
+        self._sums = totals[SUM_COLUMNS].to_numpy(dtype=np.int64)
+        self._district_of = np.full(int(df['station_idx'].to_numpy().max(initial=-1)) + 1, -1, dtype=np.int16)
+        self._district_of[df['station_idx'].to_numpy()] = df['district'].cat.codes.to_numpy()
+        self.version = version
+        self._result = totals if 'utilization' in totals else None
+
+    def apply_delta(self, df, delta):
+        """根据快照变化更新汇总，df 为变化之后的快照"""
+        if not df['district'].cat.categories.equals(self._districts):
+            # 区的划分变化（例如行政区划数据之后才加载成功）：编码不再对应，重新汇总
+            self.rebuild(df, delta.to_version)
+            return
+        added_idx = delta.added['station_idx'].to_numpy()
+        if len(added_idx) and added_idx.max() >= len(self._district_of):
+            grown = np.full(int(added_idx.max()) + 1, -1, dtype=np.int16)
+            grown[:len(self._district_of)] = self._district_of
+            self._district_of = grown
+        if len(added_idx):
+            self._district_of[added_idx] = delta.added['district'].cat.codes.to_numpy()
+
+        changed_districts = self._district_of[delta.changed['station_idx'].to_numpy()]
+        parts = [
+            (changed_districts, delta.changed['parkingBikeTotCnt_before'], delta.changed['rackTotCnt_before'], -1),
+            (changed_districts, delta.changed['parkingBikeTotCnt_after'], delta.changed['rackTotCnt_after'], 1),
+            (delta.removed['district'].cat.codes.to_numpy(), delta.removed['parkingBikeTotCnt'], delta.removed['rackTotCnt'], -1),
+            (delta.added['district'].cat.codes.to_numpy(), delta.added['parkingBikeTotCnt'], delta.added['rackTotCnt'], 1)
+        ]
+        for districts, parking, rack_total, sign in parts:
+            assigned = districts >= 0
+            if not assigned.any():
+                continue
+            contributions = station_contributions(
+                parking.to_numpy()[assigned], rack_total.to_numpy()[assigned], self.config
+            )
+            np.add.at(self._sums, districts[assigned], sign * contributions)
+
+        self.version = delta.to_version
+        self._result = None
+
+    def to_frame(self):
+        """返回以区名为索引的汇总结果（各会话共享，请勿修改）"""
+        if self._result is None:
+            self._result = _with_utilization(pd.DataFrame(self._sums, index=self._districts, columns=SUM_COLUMNS))
+        return self._result
@@ -1,9 +1,13 @@
 import streamlit as st
-import time
-from datetime import datetime
+import json
+import threading
+from collections import OrderedDict
+from html import escape
+from streamlit.components.v1 import html as st_html
 from .error_boundary import error_boundary
 from .bike_status import BikeStationStatus
 from utils.data_refresh import should_refresh_data
+from utils.instrumentation import span
 
 try:
     # 当作为包的一部分导入时
@@ -16,144 +20,271 @@ except ImportError:
     from components.data_service import get_station_status
     from components.error_boundary import error_boundary
 
+# 列表窗口化参数：只生成可见行以及上下各 OVERSCAN 行
+OVERSCAN = 10
+LIST_HEIGHT = 440
+
+CATEGORY_TITLES = {
+    'no_rental': '대여 불가 대여소',
+    'no_return': '반환 불가 대여소'
+}
+
+# 独立的 iframe 文档：站点以 JSON 数组发送一次，滚动时由浏览器只绘制可见窗口内的行
+_LIST_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+    html, body {
+        margin: 0;
+        height: 100%;
+        font-family: 'Inter', -apple-system, BlinkMacSystemFont, system-ui, sans-serif;
+    }
+    .container {
+        padding: 12px;
+        background-color: white;
+        height: 100%;
+        box-sizing: border-box;
+        overflow: hidden;
+    }
+    .section-box {
+        background-color: #f8f9fa;
+        border-radius: 6px;
+        padding: 10px;
+        display: flex;
+        flex-direction: column;
+        height: 100%;
+        box-sizing: border-box;
+    }
+    .section-header {
+        margin-bottom: 6px;
+    }
+    .section-title {
+        font-size: 17px;
+        font-weight: bold;
+        color: #2c3e50;
+        margin-bottom: 2px;
+        padding: 0 4px;
+        height: 28px;
+        display: flex;
+        align-items: center;
+    }
+    .section-subtitle {
+        font-size: 14px;
+        color: #34495e;
+        padding: 0 4px;
+        height: 20px;
+        display: flex;
+        align-items: center;
+    }
+    .station-list {
+        flex: 1;
+        position: relative;
+        overflow-y: auto;
+        background-color: white;
+        border: 1px solid #e9ecef;
+        border-radius: 4px;
+        padding: 5px;
+        contain: strict;
+    }
+    .station-window {
+        position: absolute;
+        top: 5px;
+        left: 5px;
+        right: 5px;
+        will-change: transform;
+    }
+    .empty-message {
+        display: flex;
+        justify-content: center;
+        align-items: center;
+        height: 100%;
+        color: #666;
+        font-size: 0.9rem;
+        padding: 1rem;
+        box-sizing: border-box;
+    }
+    .station-item {
+        padding: 4px 6px;
+        border-bottom: 1px solid #e9ecef;
+        font-size: 14px;
+        line-height: 1.5;
+        height: 28px;
+        display: flex;
+        align-items: center;
+        box-sizing: border-box;
+        white-space: nowrap;
+        overflow: hidden;
+        text-overflow: ellipsis;
+    }
+    .station-item:last-child {
+        border-bottom: none;
+    }
+    /* 自定义滚动条样式 */
+    .station-list::-webkit-scrollbar {
+        width: 8px;
+    }
+    .station-list::-webkit-scrollbar-track {
+        background: #f0f7ff;
+        border-radius: 4px;
+    }
+    .station-list::-webkit-scrollbar-thumb {
+        background: #b9ddfd;
+        border-radius: 4px;
+    }
+    .station-list::-webkit-scrollbar-thumb:hover {
+        background: #7cc2fc;
+    }
+    @media screen and (max-width: 768px) {
+        .container { padding: 8px; }
+        .section-title { font-size: 16px; }
+        .section-subtitle { font-size: 13px; }
+        .station-item { font-size: 13px; height: 26px; }
+    }
+    @media screen and (max-width: 480px) {
+        .container { padding: 6px; }
+        .section-title { font-size: 15px; }
+        .section-subtitle { font-size: 12px; }
+        .station-item { font-size: 12px; height: 24px; }
+    }
+</style>
+</head>
+<body>
+<div class="container">
+    <div class="section-box">
+        <div class="section-header">
+            <div class="section-title">__TITLE__</div>
+            <div class="section-subtitle"><span id="station-count">__COUNT__</span> 개</div>
+        </div>
+        <div class="station-list" id="station-list"><div class="empty-message" id="empty-message">해당하는 대여소가 없습니다</div></div>
+    </div>
+</div>
+<script>
+(function() {
+    // [stationId, 站名]，按站点编号排序
+    var stations = __STATIONS__;
+    var category = '__CATEGORY__';
+    var list = document.getElementById('station-list');
+    var empty = document.getElementById('empty-message');
+    var count = document.getElementById('station-count');
+    var spacer = document.createElement('div');
+    var view = document.createElement('div');
+    view.className = 'station-window';
+    list.appendChild(spacer);
+    list.appendChild(view);
+
+    // 行高随媒体查询变化，用一个探测行测量
+    var rowHeight = 28;
+    var first = -1;
+    var last = -1;
+    function measure() {
+        var probe = document.createElement('div');
+        probe.className = 'station-item';
+        probe.textContent = '0';
+        view.appendChild(probe);
+        rowHeight = probe.offsetHeight || rowHeight;
+        view.removeChild(probe);
+        spacer.style.height = (stations.length * rowHeight) + 'px';
+        empty.style.display = stations.length ? 'none' : '';
+        first = last = -1;
+    }
+    function draw() {
+        var top = list.scrollTop;
+        var start = Math.max(0, Math.floor(top / rowHeight) - __OVERSCAN__);
+        var end = Math.min(stations.length, Math.ceil((top + list.clientHeight) / rowHeight) + __OVERSCAN__);
+        if (start === first && end === last) {
+            return;
+        }
+        first = start;
+        last = end;
+        var fragment = document.createDocumentFragment();
+        for (var i = start; i < end; i++) {
+            var row = document.createElement('div');
+            row.className = 'station-item';
+            row.textContent = stations[i][1];
+            fragment.appendChild(row);
+        }
+        view.style.transform = 'translateY(' + (start * rowHeight) + 'px)';
+        view.replaceChildren(fragment);
+    }
+    function stationNumber(id) {
+        return parseInt(String(id).replace('ST-', ''), 10) || 0;
+    }
+    var pending = false;
+    list.addEventListener('scroll', function() {
+        if (!pending) {
+            pending = true;
+            requestAnimationFrame(function() { pending = false; draw(); });
+        }
+    }, {passive: true});
+    window.addEventListener('resize', function() { measure(); draw(); });
+    // 推送的变化（bikedash-delta）：只把进出无法租赁状态的站点加入或移出列表
+    window.addEventListener('message', function(event) {
+        var message = event.data;
+        if (category !== 'no_rental' || !message || message.type !== 'bikedash-delta') {
+            return;
+        }
+        var rental = message.update.rental;
+        if (!rental.add.length && !rental.remove.length) {
+            return;
+        }
+        var drop = {};
+        rental.remove.forEach(function(id) { drop[id] = true; });
+        rental.add.forEach(function(station) { drop[station[0]] = true; });
+        stations = stations.filter(function(station) { return !drop[station[0]]; }).concat(rental.add);
+        stations.sort(function(a, b) { return stationNumber(a[0]) - stationNumber(b[0]); });
+        count.textContent = stations.length;
+        measure();
+        draw();
+    });
+    measure();
+    draw();
+})();
+</script>
+</body>
+</html>"""
+
+# (快照版本, 类别) -> 列表 HTML；内容不变时 Streamlit 只发送缓存引用
+_list_html_cache = OrderedDict()
+_LIST_HTML_CACHE_SIZE = 4
+_list_html_lock = threading.Lock()
+
+def get_station_list_html(stations, version=None, category='no_rental'):
+    """
+    生成窗口化的站点列表 HTML（每个快照版本、每个类别只生成一次）
+
+    页面中只发送 [stationId, 站点名] 数组，浏览器按滚动位置只创建可见行以及上下 OVERSCAN 行，
+    站点再多，DOM 中也只有几十个节点。推送的变化到达时在浏览器中更新列表。
+    """
+    key = (version, category)
+    with _list_html_lock:
+        if version is not None and key in _list_html_cache:
+            _list_html_cache.move_to_end(key)
+            return _list_html_cache[key]
+
+    entries = [[str(station['id']), station['name']] for station in stations]
+    # 站点名以 textContent 写入，不会被当作 HTML；这里只需避免提前结束 <script>
+    entries_json = json.dumps(entries, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    html = (
+        _LIST_TEMPLATE
+        .replace('__TITLE__', escape(CATEGORY_TITLES.get(category, category)))
+        .replace('__COUNT__', str(len(entries)))
+        .replace('__CATEGORY__', escape(category))
+        .replace('__OVERSCAN__', str(OVERSCAN))
+        .replace('__STATIONS__', entries_json)
+    )
+
+    if version is not None:
+        with _list_html_lock:
+            _list_html_cache[key] = html
+            while len(_list_html_cache) > _LIST_HTML_CACHE_SIZE:
+                _list_html_cache.popitem(last=False)
+    return html
+
 class DynamicScrollView:
     def __init__(self):
         """初始化视图"""
-        self.setup_styles()
         self.bike_status = BikeStationStatus()
-        
-    def setup_styles(self):
-        """设置自定义样式"""
-        st.markdown("""
-            <style>
-                .container {
-                    padding: 12px;
-                    background-color: white;
-                    border-radius: 8px;
-                    box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-                    height: 440px;
-                    overflow: hidden;
-                    margin: 1rem 1rem 1rem 2rem;
-                    width: calc(100% + 1rem);
-                }
-                .stats-column {
-                    display: flex;
-                    flex-direction: column;
-                    height: 100%;
-                }
-                .section-box {
-                    background-color: #f8f9fa;
-                    border-radius: 6px;
-                    padding: 10px;
-                    display: flex;
-                    flex-direction: column;
-                    height: 100%;
-                }
-                .section-header {
-                    margin-bottom: 6px;
-                }
-                .section-title {
-                    font-size: 17px;
-                    font-weight: bold;
-                    color: #2c3e50;
-                    margin-bottom: 2px;
-                    padding: 0 4px;
-                    height: 28px;
-                    display: flex;
-                    align-items: center;
-                }
-                .section-subtitle {
-                    font-size: 14px;
-                    color: #34495e;
-                    padding: 0 4px;
-                    height: 20px;
-                    display: flex;
-                    align-items: center;
-                }
-                .station-list {
-                    flex: 1;
-                    overflow-y: auto;
-                    background-color: white;
-                    border: 1px solid #e9ecef;
-                    border-radius: 4px;
-                    padding: 5px;
-                }
-                
-                .empty-message {
-                    display: flex;
-                    justify-content: center;
-                    align-items: center;
-                    height: 100%;
-                    color: #666;
-                    font-size: 0.9rem;
-                    padding: 1rem;
-                }
-                
-                .station-item {
-                    padding: 4px 6px;
-                    border-bottom: 1px solid #e9ecef;
-                    font-size: 14px;
-                    line-height: 1.5;
-                    height: 28px;
-                    display: flex;
-                    align-items: center;
-                    box-sizing: border-box;
-                }
-                .station-item:last-child {
-                    border-bottom: none;
-                }
-                /* 自定义滚动条样式 */
-                .station-list::-webkit-scrollbar {
-                    width: 8px;
-                }
-                .station-list::-webkit-scrollbar-track {
-                    background: var(--primary-50);
-                    border-radius: 4px;
-                }
-                .station-list::-webkit-scrollbar-thumb {
-                    background: var(--primary-200);
-                    border-radius: 4px;
-                }
-                .station-list::-webkit-scrollbar-thumb:hover {
-                    background: var(--primary-300);
-                }
-
-                /* 响应式布局 */
-                @media screen and (max-width: 768px) {
-                    .container {
-                        margin: 0.75rem 0.75rem 0.75rem 1.5rem;
-                        padding: 8px;
-                    }
-                    .section-title {
-                        font-size: 16px;
-                    }
-                    .section-subtitle {
-                        font-size: 13px;
-                    }
-                    .station-item {
-                        font-size: 13px;
-                        height: 26px;
-                    }
-                }
-
-                @media screen and (max-width: 480px) {
-                    .container {
-                        margin: 0.5rem 0.5rem 0.5rem 1rem;
-                        padding: 6px;
-                    }
-                    .section-title {
-                        font-size: 15px;
-                    }
-                    .section-subtitle {
-                        font-size: 12px;
-                    }
-                    .station-item {
-                        font-size: 12px;
-                        height: 24px;
-                    }
-                }
-            </style>
-        """, unsafe_allow_html=True)
 
     @error_boundary
     def render(self):
@@ -163,35 +294,13 @@ class DynamicScrollView:
             # 触发页面刷新
             st.rerun()
         data = self.bike_status.get_realtime_status()
-        unavailable_rental = data['no_rental']['stations']
-        
-        st.markdown(f"""
-            <div class="container">
-                <div class="stats-column">
-                    <div class="section-box">
-                        <div class="section-header">
-                            <div class="section-title">대여 불가 대여소</div>
-                            <div class="section-subtitle">{len(unavailable_rental)} 개</div>
-                        </div>
-                        <div class="station-list">
-                            {self._generate_station_list_html(unavailable_rental)}
-                        </div>
-                    </div>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-
-    def _generate_station_list_html(self, stations):
-        """生成站点列表的HTML"""
-        if not stations:
-            return '<div class="empty-message">해당하는 대여소가 없습니다</div>'
-            
-        station_items = []
-        for station in stations:
-            station_items.append(
-                f'<div class="station-item">{station["name"]}</div>'
+        with span('render_station_list'):
+            station_list_html = get_station_list_html(
+                data['no_rental']['stations'],
+                version=st.session_state.get('snapshot_version'),
+                category='no_rental'
             )
-        return '\n'.join(station_items)
+        st_html(station_list_html, height=LIST_HEIGHT)
 
 if __name__ == "__main__":
     from config.page_config import setup_page
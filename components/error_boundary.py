@@ -2,8 +2,6 @@ import streamlit as st
 import functools
 import logging
 
-# 设置日志记录
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def error_boundary(func):
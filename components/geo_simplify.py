@@ -0,0 +1,150 @@
+import numpy as np
+from collections import defaultdict
+
+def _polygons(geometry):
+    """返回几何对象中的多边形列表（每个多边形是若干个环）"""
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+def _rings(features):
+    for feature in features:
+        for polygon in _polygons(feature.get('geometry') or {}):
+            for ring in polygon:
+                yield ring
+
+def find_junctions(features):
+    """
+    找出拓扑节点：相邻顶点数不等于 2 的点
+
+    相邻行政区共享的边界位于两个节点之间，两侧多边形中的顶点序列完全相同，
+    只要以节点为端点分段简化，共享边界在两侧得到相同的结果，不会出现缝隙或重叠。
+    """
+    neighbours = defaultdict(set)
+    for ring in _rings(features):
+        points = [tuple(p[:2]) for p in ring]
+        for a, b in zip(points, points[1:]):
+            if a != b:
+                neighbours[a].add(b)
+                neighbours[b].add(a)
+    return {point for point, adjacent in neighbours.items() if len(adjacent) != 2}
+
+def douglas_peucker(points, tolerance):
+    """Douglas-Peucker 简化（保留两个端点），points 为 (n, 2) 数组"""
+    count = len(points)
+    if count < 3 or tolerance <= 0:
+        return points
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        offsets = points[start + 1:end] - points[start]
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+class _ArcSimplifier:
+    """按方向无关的键缓存已简化的边，保证共享边界在两侧多边形中简化结果一致"""
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self._arcs = {}
+
+    def simplify(self, arc):
+        forward = tuple(arc)
+        backward = forward[::-1]
+        key = min(forward, backward)
+        if key not in self._arcs:
+            self._arcs[key] = [tuple(p) for p in douglas_peucker(np.array(key, dtype=np.float64), self.tolerance)]
+        result = self._arcs[key]
+        return result if key is forward else result[::-1]
+
+def _simplify_ring(ring, junctions, arcs):
+    points = [tuple(p[:2]) for p in ring]
+    if len(points) > 1 and points[0] == points[-1]:
+        points = points[:-1]
+    if len(points) < 3:
+        return None
+
+    fixed = [i for i, p in enumerate(points) if p in junctions]
+    if not fixed:
+        # 孤立的环：固定起点和离起点最远的点，避免简化成一条线
+        coords = np.array(points)
+        farthest = int(np.argmax(np.hypot(*(coords - coords[0]).T)))
+        fixed = sorted({0, farthest})
+
+    # 从第一个节点开始，按节点把环切成若干段分别简化
+    points = points[fixed[0]:] + points[:fixed[0]]
+    fixed = [i - fixed[0] for i in fixed] + [len(points)]
+    points.append(points[0])
+    result = [points[0]]
+    for start, end in zip(fixed, fixed[1:]):
+        result.extend(arcs.simplify(points[start:end + 1])[1:])
+    return result
+
+def _quantize_ring(ring, precision):
+    """坐标保留 precision 位小数，并去掉量化后重复的相邻点"""
+    result = []
+    for lng, lat in ring:
+        point = [round(lng, precision), round(lat, precision)]
+        if not result or result[-1] != point:
+            result.append(point)
+    if result[0] != result[-1]:
+        result.append(list(result[0]))
+    return result if len(result) >= 4 else None
+
+def simplify_features(features, tolerance, precision, junctions=None):
+    """
+    保持拓扑的简化 + 坐标量化
+
+    Args:
+        features: GeoJSON Feature 列表（Polygon / MultiPolygon）
+        tolerance: 简化容差（度），0 表示不简化
+        precision: 坐标保留的小数位数
+        junctions: 预先计算的节点集合（多个级别共用）
+    Returns:
+        新的 Feature 列表，properties 原样保留
+    """
+    junctions = find_junctions(features) if junctions is None else junctions
+    arcs = _ArcSimplifier(tolerance)
+    simplified = []
+    for feature in features:
+        geometry = feature.get('geometry') or {}
+        polygons = []
+        for polygon in _polygons(geometry):
+            rings = []
+            for index, ring in enumerate(polygon):
+                simple = _simplify_ring(ring, junctions, arcs)
+                quantized = _quantize_ring(simple, precision) if simple else None
+                if quantized is None:
+                    # 简化后退化的小环：外环保留原始形状，内环（洞）直接丢弃
+                    if index > 0:
+                        continue
+                    quantized = _quantize_ring([tuple(p[:2]) for p in ring], precision) or ring
+                rings.append(quantized)
+            polygons.append(rings)
+
+        if geometry.get('type') == 'Polygon' and polygons:
+            geometry = {'type': 'Polygon', 'coordinates': polygons[0]}
+        elif geometry.get('type') == 'MultiPolygon':
+            geometry = {'type': 'MultiPolygon', 'coordinates': polygons}
+        simplified.append({'type': 'Feature', 'properties': feature.get('properties', {}), 'geometry': geometry})
+    return simplified
+
+def vertex_count(features):
+    """统计顶点数"""
+    return sum(len(ring) for ring in _rings(features))
@@ -0,0 +1,229 @@
+import json
+import threading
+import numpy as np
+import streamlit as st
+from streamlit.components.v1 import html as st_html
+from config.settings import PUSH_CONFIG
+from utils.push_server import push_hub, start_push_server
+from utils.snapshot_cache import snapshot_cache
+
+try:
+    # 当作为包的一部分导入时
+    from .snapshot_delta import delta_tracker, station_positions
+except ImportError:
+    # 当直接运行文件时
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from components.snapshot_delta import delta_tracker, station_positions
+
+# 浏览器端 postMessage 的消息类型（地图和列表 iframe 据此识别）
+MESSAGE_TYPE = 'bikedash-delta'
+
+def _names(frame):
+    return frame['stationName'].astype(str).str.strip().tolist()
+
+def _coords(values):
+    """坐标保留 5 位小数，NaN 转为 null"""
+    return [None if np.isnan(v) else round(float(v), 5) for v in values]
+
+def encode_delta(delta, snapshot):
+    """
+    把相邻快照的变化编码为推送消息（紧凑 JSON，数组按位置取值）
+
+    changed: [station_idx, 车辆数, 车架数]，只含车辆数或车架数变化的站点
+    added:   [station_idx, 车辆数, 车架数, 纬度, 经度, 站名]
+    removed: station_idx
+    rental:  无法租赁列表的进出（add: [stationId, 站名]，remove: stationId）
+    totals:  页头的统计值
+    """
+    frame = snapshot.data
+    changed = delta.changed
+    bikes_before = changed['parkingBikeTotCnt_before'].to_numpy()
+    bikes_after = changed['parkingBikeTotCnt_after'].to_numpy()
+    moved = (bikes_before != bikes_after) | (
+        changed['rackTotCnt_before'].to_numpy() != changed['rackTotCnt_after'].to_numpy()
+    )
+    rows = changed[moved]
+
+    added = delta.added
+    removed = delta.removed
+    # 车辆数变为 0 的站点进入无法租赁列表，从 0 变为非 0 的离开
+    emptied = changed[(bikes_before > 0) & (bikes_after == 0)]
+    refilled = changed[(bikes_before == 0) & (bikes_after > 0)]
+    added_empty = added[added['parkingBikeTotCnt'].to_numpy() == 0]
+    removed_empty = removed[removed['parkingBikeTotCnt'].to_numpy() == 0]
+    if len(emptied):
+        station_idx = frame['station_idx'].to_numpy()
+        positions = station_positions(station_idx, int(station_idx.max()) + 1)
+        emptied_names = _names(frame.iloc[positions[emptied['station_idx'].to_numpy()]])
+    else:
+        emptied_names = []
+
+    parking = frame['parkingBikeTotCnt'].to_numpy()
+    update = {
+        'v': delta.to_version,
+        'from': delta.from_version,
+        't': snapshot.fetched_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'changed': np.column_stack([
+            rows['station_idx'].to_numpy(dtype=np.int64),
+            rows['parkingBikeTotCnt_after'].to_numpy(dtype=np.int64),
+            rows['rackTotCnt_after'].to_numpy(dtype=np.int64)
+        ]).tolist(),
+        'added': [
+            list(row) for row in zip(
+                added['station_idx'].to_numpy(dtype=np.int64).tolist(),
+                added['parkingBikeTotCnt'].to_numpy(dtype=np.int64).tolist(),
+                added['rackTotCnt'].to_numpy(dtype=np.int64).tolist(),
+                _coords(added['stationLatitude'].to_numpy(dtype=np.float64)),
+                _coords(added['stationLongitude'].to_numpy(dtype=np.float64)),
+                _names(added)
+            )
+        ],
+        'removed': removed['station_idx'].to_numpy(dtype=np.int64).tolist(),
+        'rental': {
+            'add': [
+                list(row) for row in zip(emptied['stationId'].astype(str).tolist(), emptied_names)
+            ] + [
+                list(row) for row in zip(added_empty['stationId'].astype(str).tolist(), _names(added_empty))
+            ],
+            'remove': (
+                refilled['stationId'].astype(str).tolist() + removed_empty['stationId'].astype(str).tolist()
+            )
+        },
+        'totals': {
+            'stations': len(frame),
+            'bikes': int(parking.sum()),
+            'no_rental': int((parking == 0).sum())
+        }
+    }
+    return json.dumps(update, ensure_ascii=False, separators=(',', ':'))
+
+class LiveUpdates:
+    """
+    SnapshotCache 的订阅者：每个新快照只编码一次变化，并广播给所有打开的页面
+
+    必须在 delta_tracker 之后订阅（同一快照的变化已经计算好）。
+    与上一版本不相邻时（首个快照、变化已过期）发送 reset，页面据此重新加载。
+    """
+    def __init__(self, hub=None, tracker=None):
+        self.hub = hub or push_hub
+        self.tracker = tracker or delta_tracker
+        self._version = None
+
+    def seed(self, snapshot):
+        """以订阅前已经发布的快照（例如启动时载入的本地快照）为起点，之后的新快照作为它的变化推送"""
+        if snapshot is not None and self._version is None:
+            self._version = snapshot.version
+
+    def on_snapshot(self, snapshot):
+        delta = self.tracker.get(self._version, snapshot.version)
+        self._version = snapshot.version
+        if delta is None:
+            self.hub.publish('reset', str(snapshot.version), snapshot.version)
+            return
+        self.hub.publish('delta', encode_delta(delta, snapshot), snapshot.version)
+
+live_updates = LiveUpdates()
+_start_lock = threading.Lock()
+_started = False
+
+def start_live_updates():
+    """启动推送服务并订阅快照（整个进程只执行一次）"""
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+        snapshot_cache.subscribe(live_updates.on_snapshot)
+        live_updates.seed(snapshot_cache.peek())
+        start_push_server()
+
+# 隐藏的 iframe：维持一个 EventSource 连接，更新页头的统计值，并把变化转发给地图和列表 iframe
+_BRIDGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<body>
+<script>
+(function() {
+    var version = __VERSION__;
+    var parentWindow = window.parent;
+    var parentDocument = null;
+    try {
+        parentDocument = parentWindow.document;
+        // 页面样式统一设置了 iframe 高度，这里把自己和外层容器都隐藏
+        var frame = window.frameElement;
+        if (frame) {
+            frame.style.setProperty('display', 'none', 'important');
+            var container = frame.closest('.element-container');
+            if (container) {
+                container.style.setProperty('display', 'none', 'important');
+            }
+        }
+    } catch (e) {
+        parentDocument = null;
+    }
+    if (!window.EventSource) {
+        return;
+    }
+    var url = __URL__;
+    if (!url) {
+        var page = parentDocument ? parentWindow.location : window.location;
+        url = page.protocol + '//' + page.hostname + ':__PORT__/events';
+    }
+    var source = new EventSource(url + '?since=' + version);
+
+    function setText(name, value) {
+        if (!parentDocument) {
+            return;
+        }
+        var elements = parentDocument.querySelectorAll('[data-live="' + name + '"]');
+        for (var i = 0; i < elements.length; i++) {
+            elements[i].textContent = value;
+        }
+    }
+    function relay(update) {
+        var frames = parentWindow.frames;
+        for (var i = 0; i < frames.length; i++) {
+            if (frames[i] !== window) {
+                frames[i].postMessage({type: '__TYPE__', update: update}, '*');
+            }
+        }
+    }
+    source.addEventListener('delta', function(event) {
+        var update = JSON.parse(event.data);
+        if (update.from !== version) {
+            // 中间缺少版本，只能重新加载
+            parentWindow.location.reload();
+            return;
+        }
+        version = update.v;
+        setText('stations', update.totals.stations.toLocaleString('en-US'));
+        setText('bikes', update.totals.bikes.toLocaleString('en-US'));
+        setText('updated', update.t);
+        relay(update);
+    });
+    source.addEventListener('reset', function(event) {
+        if (Number(event.data) !== version) {
+            parentWindow.location.reload();
+        }
+    });
+})();
+</script>
+</body>
+</html>"""
+
+def get_bridge_html(version):
+    """生成推送连接的 iframe HTML（同一版本内容不变，Streamlit 重绘时不会重新加载）"""
+    return (
+        _BRIDGE_TEMPLATE
+        .replace('__VERSION__', json.dumps(version))
+        .replace('__URL__', json.dumps(PUSH_CONFIG['public_url']))
+        .replace('__PORT__', str(PUSH_CONFIG['port']))
+        .replace('__TYPE__', MESSAGE_TYPE)
+    )
+
+def render_live_updates():
+    """在页面中加入推送连接（会话已有快照版本时）"""
+    version = st.session_state.get('snapshot_version')
+    if version is not None:
+        st_html(get_bridge_html(version), height=0)
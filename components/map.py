@@ -1,15 +1,31 @@
-import folium
 import json
 import os
-import requests
 import logging
+import threading
+import time
 import streamlit as st
 from pathlib import Path
+from config.settings import GEOJSON_LOD_CONFIG
 from utils.data_refresh import should_refresh_data
 
+try:
+    from .geo_simplify import find_junctions, simplify_features, vertex_count
+except ImportError:
+    from components.geo_simplify import find_junctions, simplify_features, vertex_count
+
 logger = logging.getLogger(__name__)
 
 class MapService:
+    """
+    首尔行政区划 GeoJSON 服务
+
+    原始几何数据在进程内只读取一次，并预先生成各个细节级别（GEOJSON_LOD_CONFIG）
+    的简化、量化版本，之后的请求直接返回对应级别的数据。
+    """
+    _lock = threading.Lock()
+    _levels = None          # 级别名 -> 紧凑 JSON 文本
+    _level_stats = None     # 级别名 -> 顶点数/大小/生成耗时
+
     def __init__(self):
         self.cache_dir = Path("cache")
         self.geojson_path = self.cache_dir / "seoul_municipalities.geojson"
@@ -19,30 +35,99 @@ class MapService:
         """Ensure cache directory exists"""
         self.cache_dir.mkdir(exist_ok=True)
         
-    def get_seoul_geojson(self):
-        """Get Seoul GeoJSON data with fallback mechanisms"""
+    def get_seoul_geojson(self, lod=None):
+        """
+        Get Seoul GeoJSON data at the requested level of detail
+
+        Args:
+            lod: GEOJSON_LOD_CONFIG 中的级别名，默认使用 "default" 指定的级别
+        Returns:
+            新的 GeoJSON dict（调用方可以修改）
+        """
         try:
-            # Try to load from cache first
-            if self.geojson_path.exists():
-                with open(self.geojson_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            
-            # If not in cache, download from GitHub
-            url = "https://raw.githubusercontent.com/southkorea/seoul-maps/master/kostat/2013/json/seoul_municipalities_geo_simple.json"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            geojson_data = response.json()
-            
-            # Cache the downloaded data
-            with open(self.geojson_path, 'w', encoding='utf-8') as f:
-                json.dump(geojson_data, f)
-            
-            return geojson_data
-            
+            return json.loads(self.get_seoul_geojson_text(lod))
         except Exception as e:
             logger.error(f"Error loading Seoul GeoJSON data: {str(e)}")
             # Return simplified fallback GeoJSON if everything fails
             return self.get_fallback_geojson()
+
+    def get_seoul_geojson_text(self, lod=None):
+        """返回指定级别的紧凑 GeoJSON 文本（直接嵌入页面时无需再序列化）"""
+        lod = lod or GEOJSON_LOD_CONFIG["default"]
+        levels = self._load_levels()
+        if lod not in levels:
+            raise ValueError(f"Unknown GeoJSON level of detail: {lod}")
+        return levels[lod]
+
+    def geometry_loaded(self):
+        """行政区划数据是否已成功加载（失败时 get_seoul_geojson 返回的是备用轮廓）"""
+        with MapService._lock:
+            return MapService._levels is not None
+
+    def get_level_stats(self):
+        """返回各级别的顶点数、大小（字节）和生成耗时（毫秒）"""
+        self._load_levels()
+        return dict(MapService._level_stats)
+
+    @staticmethod
+    def lod_for_zoom(zoom):
+        """返回适用于某一缩放级别的细节级别"""
+        levels = sorted(GEOJSON_LOD_CONFIG["levels"].items(), key=lambda item: item[1]["min_zoom"], reverse=True)
+        for name, level in levels:
+            if zoom >= level["min_zoom"]:
+                return name
+        return levels[-1][0]
+
+    def _load_levels(self):
+        with MapService._lock:
+            if MapService._levels is None:
+                started = time.perf_counter()
+                features = self._read_source()["features"]
+                parse_ms = (time.perf_counter() - started) * 1000
+                junctions = find_junctions(features)
+
+                levels, stats = {}, {}
+                for name, level in GEOJSON_LOD_CONFIG["levels"].items():
+                    started = time.perf_counter()
+                    simplified = simplify_features(features, level["tolerance"], level["precision"], junctions)
+                    text = json.dumps(
+                        {"type": "FeatureCollection", "features": simplified},
+                        ensure_ascii=False, separators=(',', ':')
+                    )
+                    levels[name] = text
+                    stats[name] = {
+                        "vertices": vertex_count(simplified),
+                        "bytes": len(text.encode('utf-8')),
+                        "build_ms": round((time.perf_counter() - started) * 1000, 2)
+                    }
+                stats["source"] = {
+                    "vertices": vertex_count(features),
+                    "bytes": self.geojson_path.stat().st_size,
+                    "build_ms": round(parse_ms, 2)
+                }
+                MapService._levels, MapService._level_stats = levels, stats
+                logger.info(f"Seoul GeoJSON levels prepared: {stats}")
+            return MapService._levels
+
+    def _read_source(self):
+        """读取原始 GeoJSON，本地没有缓存时从 GitHub 下载"""
+        # Try to load from cache first
+        if self.geojson_path.exists():
+            with open(self.geojson_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
+        # If not in cache, download from GitHub
+        import requests
+        url = "https://raw.githubusercontent.com/southkorea/seoul-maps/master/kostat/2013/json/seoul_municipalities_geo_simple.json"
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        geojson_data = response.json()
+        
+        # Cache the downloaded data
+        with open(self.geojson_path, 'w', encoding='utf-8') as f:
+            json.dump(geojson_data, f)
+        
+        return geojson_data
     
     def get_fallback_geojson(self):
         """Return a simplified GeoJSON with basic Seoul boundaries"""
@@ -62,16 +147,20 @@ class MapService:
             }]
         }
 
+# 进程级实例
+map_service = MapService()
+
 def render_map():
     """渲染地图"""
+    # folium 较重，只在构建地图时导入（district_index 等只需要 map_service）
+    import folium
+    
     # 检查是否需要刷新数据
     if should_refresh_data():
         # 触发页面刷新
         st.rerun()
     
     try:
-        map_service = MapService()
-        
         # Create base map
         folium_map = folium.Map(
             location=[37.5665, 126.9780],
@@ -83,7 +172,7 @@ def render_map():
         
         # Add GeoJSON layer with error handling
         try:
-            geojson_data = map_service.get_seoul_geojson()
+            geojson_data = map_service.get_seoul_geojson(MapService.lod_for_zoom(11))
             folium.GeoJson(
                 geojson_data,
                 name='Seoul Districts',
@@ -0,0 +1,266 @@
+import json
+import numpy as np
+from branca.element import MacroElement
+from jinja2 import Template
+
+# 按可用自行车数分级的样式：(下限（不含）, 颜色, 半径, 图例文字)，从多到少排列
+STATION_BUCKETS = [
+    (20, '#2ecc71', 6, '20대 이상'),    # 多 (绿色)
+    (10, '#f1c40f', 5, '10-20대'),      # 中 (黄色)
+    (None, '#e74c3c', 4, '10대 미만')   # 少 (红色)
+]
+
+# 坐标保留 5 位小数（约 1m），足够地图显示
+COORD_DECIMALS = 5
+
+def station_buckets(bikes):
+    """向量化计算每个站点的样式分级（STATION_BUCKETS 的下标）"""
+    bikes = np.asarray(bikes)
+    thresholds = [bucket[0] for bucket in STATION_BUCKETS[:-1]]
+    return np.select([bikes > t for t in thresholds], range(len(thresholds)), default=len(thresholds))
+
+def station_payload(bike_data):
+    """将站点数据打包为紧凑的列式 JSON（经纬度、分级、车辆数、站名、station_idx 各一个数组）"""
+    lat = bike_data['stationLatitude'].to_numpy(dtype=np.float64)
+    lng = bike_data['stationLongitude'].to_numpy(dtype=np.float64)
+    valid = ~(np.isnan(lat) | np.isnan(lng))
+    bikes = bike_data['parkingBikeTotCnt'].to_numpy()[valid]
+    payload = {
+        'lat': np.round(lat[valid], COORD_DECIMALS).tolist(),
+        'lng': np.round(lng[valid], COORD_DECIMALS).tolist(),
+        'b': station_buckets(bikes).tolist(),
+        'c': bikes.tolist(),
+        'n': np.asarray(bike_data['stationName'], dtype=object)[valid].tolist()
+    }
+    if 'station_idx' in bike_data.columns:
+        # 推送的变化按 station_idx 定位站点
+        payload['i'] = bike_data['station_idx'].to_numpy()[valid].tolist()
+    # 避免站名中的 "</script>" 提前结束脚本
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+class StationLayer(MacroElement):
+    """
+    以单个数据层渲染所有站点
+
+    所有站点作为一个列式数组发送到浏览器，由客户端按分级字段设置样式，
+    使用 canvas 渲染，弹出框在点击时才生成。
+    cluster 为 Leaflet.markercluster 的选项时按距离聚类显示（页面需要已加载 markercluster 的脚本和样式）。
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function(map) {
+            var data = {{ this.payload }};
+            var styles = {{ this.styles }};
+            var renderer = L.canvas({padding: 0.5});
+            var layer = {% if this.cluster %}L.markerClusterGroup({{ this.cluster }}){% else %}L.featureGroup(){% endif %};
+            function escapeHtml(text) {
+                return String(text).replace(/[&<>"']/g, function(c) {
+                    return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+                });
+            }
+            var markers = {};
+            function bucket(bikes) {
+                for (var k = 0; k < styles.length - 1; k++) {
+                    if (bikes > styles[k].min) {
+                        return k;
+                    }
+                }
+                return styles.length - 1;
+            }
+            function addMarker(i) {
+                var style = styles[data.b[i]];
+                var marker = L.circleMarker([data.lat[i], data.lng[i]], {
+                    renderer: renderer, radius: style.radius, color: style.color,
+                    fill: true, fillOpacity: 0.7, weight: 1
+                });
+                marker.stationIndex = i;
+                marker.bindPopup(function(m) {
+                    return "<div style='font-family: \\"Noto Sans KR\\", sans-serif; text-align: center; padding: 5px;'>"
+                        + "<b>" + escapeHtml(data.n[m.stationIndex]) + "</b><br>"
+                        + "대여 가능한 자전거: <b>" + data.c[m.stationIndex] + "대</b></div>";
+                }, {maxWidth: 200});
+                if (data.i) {
+                    markers[data.i[i]] = marker;
+                }
+                return marker;
+            }
+            function setBikes(marker, bikes) {
+                var i = marker.stationIndex;
+                data.c[i] = bikes;
+                var b = bucket(bikes);
+                if (b !== data.b[i]) {
+                    data.b[i] = b;
+                    marker.setStyle({color: styles[b].color});
+                    marker.setRadius(styles[b].radius);
+                }
+            }
+            var initial = [];
+            for (var i = 0; i < data.lat.length; i++) {
+                initial.push(addMarker(i));
+            }
+            // 聚类图层一次性加入所有站点（逐个加入时每次都要重新聚类）
+            if (layer.addLayers) {
+                layer.addLayers(initial);
+            } else {
+                initial.forEach(function(marker) { layer.addLayer(marker); });
+            }
+            // 推送的变化（bikedash-delta）：只更新变化站点的样式，弹出框打开时读取最新车辆数
+            window.addEventListener('message', function(event) {
+                var message = event.data;
+                if (!data.i || !message || message.type !== 'bikedash-delta') {
+                    return;
+                }
+                var update = message.update;
+                update.changed.forEach(function(row) {
+                    if (markers[row[0]]) {
+                        setBikes(markers[row[0]], row[1]);
+                    }
+                });
+                update.added.forEach(function(row) {
+                    if (markers[row[0]]) {
+                        setBikes(markers[row[0]], row[1]);
+                    } else if (row[3] !== null && row[4] !== null) {
+                        data.i.push(row[0]);
+                        data.c.push(row[1]);
+                        data.b.push(bucket(row[1]));
+                        data.lat.push(row[3]);
+                        data.lng.push(row[4]);
+                        data.n.push(row[5]);
+                        layer.addLayer(addMarker(data.lat.length - 1));
+                    }
+                });
+                update.removed.forEach(function(idx) {
+                    if (markers[idx]) {
+                        layer.removeLayer(markers[idx]);
+                        delete markers[idx];
+                    }
+                });
+            });
+            return layer.addTo(map);
+        })({{ this.map_name or this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, bike_data, map_name=None, cluster=None):
+        super().__init__()
+        self._name = 'StationLayer'
+        self.map_name = map_name
+        self.cluster = json.dumps(cluster) if cluster else None
+        self.payload = station_payload(bike_data)
+        self.styles = json.dumps([
+            {'min': threshold, 'color': color, 'radius': radius} for threshold, color, radius, _ in STATION_BUCKETS
+        ])
+
+    def render_script(self):
+        """不挂到地图上，单独生成脚本（需要在构造时指定 map_name）"""
+        return self._template.module.script(self, {})
+
+class GeoJsonRestyle(MacroElement):
+    """
+    以另一种样式再次显示已有的 GeoJson 图层
+
+    几何数据只在 source 图层中嵌入一次，这里在浏览器端复用它的要素。
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = L.geoJson({{ this.source.get_name() }}.toGeoJSON(), {
+            style: function() { return {{ this.style }}; }
+        }).addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, source, style):
+        super().__init__()
+        self._name = 'GeoJsonRestyle'
+        self.source = source
+        self.style = json.dumps(style)
+
+class LayerSlot(MacroElement):
+    """在预先渲染好的底图 HTML 中为动态图层占位"""
+    MARKER = '/* __dynamic_layer_slot__ */'
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        {{ this.MARKER }}
+        {% endmacro %}
+    """)
+
+# 按车辆占比（可用车辆 / 车架数）分级的区域颜色：(下限（不含）, 颜色, 图例文字)
+DISTRICT_BUCKETS = [
+    (0.6, '#2ecc71', '60% 이상'),
+    (0.3, '#f1c40f', '30-60%'),
+    (None, '#e74c3c', '30% 미만')
+]
+
+def district_styles(stats):
+    """为每个区预先计算填充样式和提示框内容，stats 为 district_stats 的汇总结果"""
+    utilization = stats['utilization'].to_numpy()
+    thresholds = [bucket[0] for bucket in DISTRICT_BUCKETS[:-1]]
+    buckets = np.select([utilization > t for t in thresholds], range(len(thresholds)), default=len(thresholds))
+    styles, tooltips = {}, {}
+    for name, bucket, row in zip(stats.index, buckets, stats.itertuples(index=False)):
+        styles[name] = {
+            'fillColor': DISTRICT_BUCKETS[bucket][1] if row.stations else '#bdc3c7',
+            'fillOpacity': 0.55, 'color': '#128970', 'weight': 1
+        }
+        tooltips[name] = (
+            f"<b>{name}</b><br>대여 가능 자전거: {row.bikes}대 / 거치대 {row.racks}개 ({row.utilization:.0%})"
+            f"<br>정류소 {row.stations}곳 · 빈 정류소 {row.empty_stations} · 가득 찬 정류소 {row.full_stations}"
+        )
+    return styles, tooltips
+
+class DistrictChoropleth(MacroElement):
+    """
+    按区汇总的分级设色图层
+
+    复用底图中已嵌入的行政区划几何数据（source 为该 GeoJson 图层的变量名），
+    只发送 25 个区的样式和提示框内容；同时隐藏站点图例，显示按占比分级的图例。
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function(map, source) {
+            var styles = {{ this.styles }};
+            var tooltips = {{ this.tooltips }};
+            var legend = document.getElementById('station-legend');
+            if (legend) { legend.style.display = 'none'; }
+            var control = L.control({position: 'bottomright'});
+            control.onAdd = function() {
+                var div = L.DomUtil.create('div');
+                div.innerHTML = {{ this.legend }};
+                return div;
+            };
+            control.addTo(map);
+            return L.geoJson(source.toGeoJSON(), {
+                style: function(feature) { return styles[feature.properties.name] || {fillOpacity: 0, weight: 1}; },
+                onEachFeature: function(feature, layer) {
+                    var tip = tooltips[feature.properties.name];
+                    if (tip) { layer.bindTooltip(tip, {sticky: true}); }
+                }
+            }).addTo(map);
+        })({{ this.map_name or this._parent.get_name() }}, {{ this.source_name }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, stats, source_name, map_name=None):
+        super().__init__()
+        self._name = 'DistrictChoropleth'
+        self.map_name = map_name
+        self.source_name = source_name
+        styles, tooltips = district_styles(stats)
+        self.styles = json.dumps(styles, ensure_ascii=False)
+        self.tooltips = json.dumps(tooltips, ensure_ascii=False).replace('</', '<\\/')
+        items = ''.join(
+            f'<p style="margin: 4px 0;">■ <span style="color: {color};">{label}</span></p>'
+            for _, color, label in DISTRICT_BUCKETS
+        )
+        self.legend = json.dumps(
+            '<div style="border-radius: 8px; background-color: rgba(255, 255, 255, 0.95); '
+            'box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1); padding: 12px 15px; '
+            "font-family: 'Noto Sans KR', sans-serif; font-size: 13px; color: #2c3e50;\">"
+            f'<p style="margin: 0 0 8px 0;"><strong>구별 자전거 비율</strong></p>{items}</div>',
+            ensure_ascii=False
+        ).replace('</', '<\\/')
+
+    def render_script(self):
+        """不挂到地图上，单独生成脚本（需要在构造时指定 map_name）"""
+        return self._template.module.script(self, {})
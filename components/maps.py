@@ -1,59 +1,59 @@
 import streamlit as st
-import folium
-from streamlit_folium import folium_static
-import pandas as pd
-import requests
-from folium.plugins import MarkerCluster
+from streamlit.components.v1 import html as st_html
 from .error_boundary import error_boundary
 import time
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+import threading
+from collections import OrderedDict, namedtuple
+from utils.instrumentation import span
+from utils.snapshot_cache import Snapshot
 
 try:
     # When imported as a package
     from .station_panel import StationPanel
-    from .data_service import BikeDataService
-    from .map import MapService
+    from .data_service import get_bike_data, district_stats_snapshot
+    from .map import MapService, map_service
+    from .district_stats import aggregate_districts
+    from .map_layers import StationLayer, DistrictChoropleth, GeoJsonRestyle, LayerSlot, STATION_BUCKETS, station_buckets
 except ImportError:
     # When run directly
     import os
     import sys
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from components.station_panel import StationPanel
-    from components.data_service import BikeDataService
-    from components.map import MapService
+    from components.data_service import get_bike_data, district_stats_snapshot
+    from components.map import MapService, map_service
+    from components.district_stats import aggregate_districts
+    from components.map_layers import StationLayer, DistrictChoropleth, GeoJsonRestyle, LayerSlot, STATION_BUCKETS, station_buckets
 
 # 지도 설정
 MAP_CONFIG = {
     "seoul_center": [37.5665, 126.9780],
     "zoom_level": 11,
-    "tile_style": 'OpenStreetMap'
+    "tile_style": 'OpenStreetMap',
+    "station_layer": 'compact',  # 'compact': 单个数据层; 'districts': 按区分级设色; 'markers': 每个站点一个 CircleMarker
+    # 站点聚类（Leaflet.markercluster 的选项），'compact' 和 'markers' 模式共用；None 时不聚类
+    "station_cluster": {
+        'maxClusterRadius': 50,
+        'disableClusteringAtZoom': 14,
+        'spiderfyOnMaxZoom': True,
+        'maxZoom': 15  # 限制聚类的最大缩放级别
+    }
 }
 
-# 配置 requests 的重试策略
-retry_strategy = Retry(
-    total=3,  # 最多重试3次
-    backoff_factor=1,  # 重试间隔
-    status_forcelist=[500, 502, 503, 504]  # 需要重试的HTTP状态码
-)
-adapter = HTTPAdapter(max_retries=retry_strategy)
-http = requests.Session()
-http.mount("https://", adapter)
-http.mount("http://", adapter)
-
-def get_bike_data():
-    """서울시 공공자전거 실시간 대여정보 API 호출"""
-    service = BikeDataService()
-    return service.get_bike_data()
+# 页面上可切换的地图显示方式
+MAP_MODES = {
+    'compact': '정류소',
+    'districts': '자치구'
+}
 
 def render_metrics(bike_data):
     """Display bike usage metrics"""
     if not bike_data.empty:
         try:
             total_stations = len(bike_data)
-            # 确保转换为数值类型
-            total_bikes = pd.to_numeric(bike_data['parkingBikeTotCnt'], errors='coerce').sum()
-            total_racks = pd.to_numeric(bike_data['rackTotCnt'], errors='coerce').sum()
+            # 快照中的数值列已是整数类型
+            total_bikes = bike_data['parkingBikeTotCnt'].sum()
+            total_racks = bike_data['rackTotCnt'].sum()
             usage_rate = (total_bikes / total_racks * 100) if total_racks > 0 else 0
             
             # Create metrics container with custom styling
@@ -82,184 +82,274 @@ def render_metrics(bike_data):
             st.warning(f"통계 데이터를 계산하는 중 오류가 발생했습니다: {str(e)}")
 
 @error_boundary
-def get_geojson_data():
-    """안전하게 GeoJSON 데이터를 가져옵니다"""
+def get_geojson_data(lod=None):
+    """안전하게 GeoJSON 데이터를 가져옵니다 (기본값: 초기 줌 레벨에 맞는 해상도)"""
     try:
-        map_service = MapService()
-        return map_service.get_seoul_geojson()
+        return map_service.get_seoul_geojson(lod or MapService.lod_for_zoom(MAP_CONFIG["zoom_level"]))
     except Exception as e:
         st.error(f"지도 데이터를 불러올 수 없습니다: {str(e)}")
         return None
 
-@error_boundary
-def render_seoul_map():
-    st.markdown("""
-        <style>
-            /* 地图容器样式 */
-            [data-testid="column"] > div:has(> iframe) {
-                height: 440px !important;  /* 保持一致的高度 */
-                margin: 2.5rem 0.5rem 1rem 3rem !important;
-                padding: 0 !important;
-                width: calc(100% - 1.2rem) !important;
-                position: relative;
+def _build_base_map():
+    """构建不随快照变化的底图：瓦片、边界、行政区划图层和图例，返回 (地图, 行政区划图层)"""
+    # folium 较重，只在第一次构建底图时导入（导入本模块不加载 folium）
+    import folium
+    
+    # 首尔市的大致边界坐标 - 扩大边界范围
+    SEOUL_BOUNDS = {
+        'sw': [37.325, 126.664],  # 扩大西南角范围
+        'ne': [37.801, 127.283]   # 扩大东北角范围
+    }
+    
+    # 创建地图，设置限制范围
+    m = folium.Map(
+        location=MAP_CONFIG["seoul_center"],
+        zoom_start=10.5,
+        tiles='OpenStreetMap',
+        control_scale=True,
+        width='100%',
+        height='440px',  # 增加回440px
+        min_zoom=9.5,
+        max_zoom=15,
+        zoom_control=True,
+        scrollWheelZoom=True,
+        dragging=True
+    )
+    
+    # 设置地图的最大边界并调整缩放级别
+    m.fit_bounds([SEOUL_BOUNDS['sw'], SEOUL_BOUNDS['ne']], padding=[50, 50])  # 添加边界padding
+    
+    # 确保地图始终保持在首尔边界内
+    m.options['maxBounds'] = [
+        [SEOUL_BOUNDS['sw'][0] - 0.1, SEOUL_BOUNDS['sw'][1] - 0.1],  # 进一步扩大边界
+        [SEOUL_BOUNDS['ne'][0] + 0.1, SEOUL_BOUNDS['ne'][1] + 0.1]
+    ]
+    m.options['minZoom'] = 9.5  # 微调最小缩放级别
+    m.options['maxZoom'] = 15  # 限制最大缩放级别
+    m.options['bounceAtZoomLimits'] = True  # 在缩放限制处反弹
+    
+    # 获取 GeoJSON 数据
+    geo_data = get_geojson_data()
+    districts = None
+    if geo_data:
+        # 添加首尔整体边界（外部边界）
+        districts = folium.GeoJson(
+            geo_data,
+            style_function=lambda x: {
+                'fillColor': 'transparent',
+                'color': '#128970',  # 使用 bermuda-600 的深色
+                'weight': 3,         # 较粗的线条
+                'opacity': 0.9
             }
+        ).add_to(m)
+        
+        # 添加内部行政区划（内部边界），复用上面图层中的几何数据
+        GeoJsonRestyle(districts, {
+            'fillColor': 'transparent',
+            'color': '#20a98a',  # 使用 bermuda-500 的颜色
+            'weight': 1,         # 较细的线条
+            'dashArray': '5, 5', # 虚线样式
+            'opacity': 0.7       # 稍微增加不透明度
+        }).add_to(m)
+    
+    # 站点聚类的脚本和样式（动态图层插入预先渲染的底图，需要由底图加载）
+    if MAP_CONFIG["station_cluster"]:
+        from folium.plugins import MarkerCluster
+        header = m.get_root().header
+        for name, url in MarkerCluster.default_js:
+            header.add_child(folium.JavascriptLink(url), name=name)
+        for name, url in MarkerCluster.default_css:
+            header.add_child(folium.CssLink(url), name=name)
+    
+    # 添加图例
+    m.get_root().html.add_child(folium.Element(_legend_html()))
+    return m, districts
+
+# 预先渲染的底图：HTML、地图变量名、行政区划图层变量名（没有行政区划数据时为 None）
+BaseMap = namedtuple('BaseMap', ['html', 'map_name', 'districts_name'])
+
+# 进程级底图缓存
+_base_map = None
+_base_map_lock = threading.Lock()
+
+# 最近几个快照版本的完整地图 HTML，各会话共享
+_map_html_cache = OrderedDict()
+_MAP_HTML_CACHE_SIZE = 4
+
+def get_base_map():
+    """返回预先渲染的底图（行政区划加载成功后进程内只构建一次）"""
+    global _base_map
+    with _base_map_lock:
+        if _base_map is not None:
+            return _base_map
+        m, districts = _build_base_map()
+        # 动态图层的位置：在行政区划图层之后，保证站点绘制在上层
+        LayerSlot().add_to(m)
+        base = BaseMap(m.get_root().render(), m.get_name(), districts.get_name() if districts else None)
+        # 行政区划加载失败（只有备用轮廓）时不缓存，下一次重绘重新加载
+        if map_service.geometry_loaded():
+            _base_map = base
+        return base
+
+def get_seoul_map_html(bike_data, version=None, station_layer=None):
+    """
+    生成完整的地图 HTML
+
+    'compact' / 'districts' 模式下只为每个快照版本生成一次动态图层（站点或按区设色），
+    并插入到缓存的底图中；'markers' 模式每次完整构建（仅用于对比）。
+    """
+    station_layer = station_layer or MAP_CONFIG["station_layer"]
+    if station_layer == 'markers':
+        return build_seoul_map(bike_data, station_layer).get_root().render()
+    
+    key = (version, station_layer)
+    with _base_map_lock:
+        if version is not None and key in _map_html_cache:
+            _map_html_cache.move_to_end(key)
+            return _map_html_cache[key]
+    
+    base = get_base_map()
+    script = ''
+    with span('render_map', layer=station_layer):
+        if bike_data is not None and not bike_data.empty:
+            if station_layer == 'districts':
+                if base.districts_name and 'district' in bike_data.columns:
+                    # 25 个区的多边形代替数千个站点
+                    script = DistrictChoropleth(
+                        _district_totals(bike_data, version), base.districts_name, map_name=base.map_name
+                    ).render_script()
+            else:
+                script = StationLayer(
+                    bike_data, map_name=base.map_name, cluster=MAP_CONFIG["station_cluster"]
+                ).render_script()
+        html = base.html.replace(LayerSlot.MARKER, script, 1)
+    
+    # 底图没有缓存（行政区划加载失败）时，也不缓存由它生成的地图
+    if version is not None and base is _base_map:
+        with _base_map_lock:
+            _map_html_cache[key] = html
+            while len(_map_html_cache) > _MAP_HTML_CACHE_SIZE:
+                _map_html_cache.popitem(last=False)
+    return html
+
+def _district_totals(bike_data, version):
+    """各区汇总：有版本号时使用各会话共享、按快照增量维护的 DistrictStatsView，否则直接汇总"""
+    if version is None:
+        return aggregate_districts(bike_data)
+    return district_stats_snapshot(Snapshot(version, bike_data, None))
+
+def build_seoul_map(bike_data, station_layer=None, version=None):
+    """
+    构建首尔自行车地图
+
+    Args:
+        bike_data: 站点快照，为 None 或空时只绘制底图
+        station_layer: 'compact'（单个数据层，客户端设置样式）、'districts'（按区分级设色）
+            或 'markers'（每个站点一个 CircleMarker）
+        version: bike_data 的快照版本，用于取得共享的各区汇总
+    """
+    station_layer = station_layer or MAP_CONFIG["station_layer"]
+    m, districts = _build_base_map()
+    
+    if bike_data is not None and not bike_data.empty:
+        if station_layer == 'districts':
+            if districts is not None and 'district' in bike_data.columns:
+                DistrictChoropleth(_district_totals(bike_data, version), districts.get_name()).add_to(m)
+        elif station_layer == 'markers':
+            _add_station_markers(m, bike_data)
+        else:
+            # 所有站点作为一个紧凑的数据层发送，由浏览器按分级设置样式
+            StationLayer(bike_data, cluster=MAP_CONFIG["station_cluster"]).add_to(m)
+    
+    return m
+
+def _add_station_markers(m, bike_data):
+    """每个站点一个 CircleMarker（旧的渲染方式，站点多时 HTML 体积很大）"""
+    import folium
+    from folium.plugins import MarkerCluster
+    
+    # 调整聚类设置
+    marker_cluster = MarkerCluster(options=MAP_CONFIG["station_cluster"] or {}).add_to(m)
+    
+    buckets = station_buckets(bike_data['parkingBikeTotCnt'])
+    for bucket, (_, row) in zip(buckets, bike_data.iterrows()):
+        try:
+            bikes = int(row['parkingBikeTotCnt'])
+            lat = float(row['stationLatitude'])
+            lon = float(row['stationLongitude'])
             
-            /* iframe样式 */
-            iframe {
-                height: 440px !important;  /* 保持一致的高度 */
-                width: 100% !important;
-                border-radius: 8px !important;
-                box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1) !important;
-                margin: 0 !important;
-                padding: 0 !important;
-            }
+            # 根据自行车数量设置颜色和大小
+            _, color, radius, _ = STATION_BUCKETS[bucket]
             
-            /* 移除地图周围的任何额外空间 */
-            .element-container:has(> iframe) {
-                margin: 2.5rem 0.5rem 1rem 3rem !important;
-                padding: 0 !important;
-                width: calc(100% - 1.2rem) !important;
-                overflow: visible !important;
-            }
-        </style>
-    """, unsafe_allow_html=True)
-    
+            folium.CircleMarker(
+                location=[lat, lon],
+                radius=radius,
+                color=color,
+                fill=True,
+                popup=folium.Popup(
+                    f"""<div style='font-family: "Noto Sans KR", sans-serif; 
+                                          text-align: center;
+                                          padding: 5px;'>
+                        <b>{row['stationName']}</b><br>
+                        대여 가능한 자전거: <b>{bikes}대</b>
+                    </div>""",
+                    max_width=200
+                ),
+                fill_opacity=0.7,
+                weight=1
+            ).add_to(marker_cluster)
+        except (ValueError, KeyError) as e:
+            continue  # 跳过有问题的数据点
+
+def _legend_html():
+    """根据 STATION_BUCKETS 生成图例"""
+    items = ''.join(
+        f'<p style="margin: 4px 0;">● <span style="color: {color};">{label}</span></p>'
+        for _, color, _, label in STATION_BUCKETS
+    )
+    return f'''
+    <div id="station-legend"
+         style="position: fixed; 
+                bottom: 50px; right: 50px; 
+                border-radius: 8px;
+                background-color: rgba(255, 255, 255, 0.95);
+                box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
+                padding: 12px 15px;
+                font-family: 'Noto Sans KR', sans-serif;
+                font-size: 13px;
+                color: #2c3e50;
+                z-index: 9999;">
+        <p style="margin: 0 0 8px 0;"><strong>자전거 대여 현황</strong></p>
+        {items}
+    </div>
+    '''
+
+@error_boundary
+def render_seoul_map():
     # 使用单个容器而不是嵌套列
     with st.container():
         try:
-            # 首尔市的大致边界坐标 - 扩大边界范围
-            SEOUL_BOUNDS = {
-                'sw': [37.325, 126.664],  # 扩大西南角范围
-                'ne': [37.801, 127.283]   # 扩大东北角范围
-            }
-            
-            # 创建地图，设置限制范围
-            m = folium.Map(
-                location=MAP_CONFIG["seoul_center"],
-                zoom_start=10.5,
-                tiles='OpenStreetMap',
-                control_scale=True,
-                width='100%',
-                height='440px',  # 增加回440px
-                min_zoom=9.5,
-                max_zoom=15,
-                zoom_control=True,
-                scrollWheelZoom=True,
-                dragging=True
+            # 显示方式：站点 / 按区汇总（缩小查看全市时只需绘制 25 个区）
+            modes = list(MAP_MODES)
+            default_layer = MAP_CONFIG["station_layer"] if MAP_CONFIG["station_layer"] in MAP_MODES else 'compact'
+            label = st.radio(
+                "지도 표시",
+                list(MAP_MODES.values()),
+                index=modes.index(default_layer),
+                horizontal=True,
+                key='map_mode',
+                label_visibility='collapsed'
             )
+            station_layer = modes[list(MAP_MODES.values()).index(label)]
             
-            # 设置地图的最大边界并调整缩放级别
-            m.fit_bounds([SEOUL_BOUNDS['sw'], SEOUL_BOUNDS['ne']], padding=[50, 50])  # 添加边界padding
-            
-            # 确保地图始终保持在首尔边界内
-            m.options['maxBounds'] = [
-                [SEOUL_BOUNDS['sw'][0] - 0.1, SEOUL_BOUNDS['sw'][1] - 0.1],  # 进一步扩大边界
-                [SEOUL_BOUNDS['ne'][0] + 0.1, SEOUL_BOUNDS['ne'][1] + 0.1]
-            ]
-            m.options['minZoom'] = 9.5  # 微调最小缩放级别
-            m.options['maxZoom'] = 15  # 限制最大缩放级别
-            m.options['bounceAtZoomLimits'] = True  # 在缩放限制处反弹
-            
-            # 获取 GeoJSON 数据
-            geo_data = get_geojson_data()
-            if geo_data:
-                # 添加首尔整体边界（外部边界）
-                folium.GeoJson(
-                    geo_data,
-                    style_function=lambda x: {
-                        'fillColor': 'transparent',
-                        'color': '#128970',  # 使用 bermuda-600 的深色
-                        'weight': 3,         # 较粗的线条
-                        'opacity': 0.9
-                    }
-                ).add_to(m)
-                
-                # 添加内部行政区划（内部边界）
-                folium.GeoJson(
-                    geo_data,
-                    style_function=lambda x: {
-                        'fillColor': 'transparent',
-                        'color': '#20a98a',  # 使用 bermuda-500 的颜色
-                        'weight': 1,         # 较细的线条
-                        'dashArray': '5, 5', # 虚线样式
-                        'opacity': 0.7       # 稍微增加不透明度
-                    }
-                ).add_to(m)
-            
-            # 获取自行车数据
-            bike_data = st.session_state.get('bike_data')
-            
-            if bike_data is not None and not bike_data.empty:
-                # 调整聚类设置
-                marker_cluster = MarkerCluster(
-                    options={
-                        'maxClusterRadius': 50,
-                        'disableClusteringAtZoom': 14,
-                        'spiderfyOnMaxZoom': True,
-                        'maxZoom': 15  # 限制聚类的最大缩放级别
-                    }
-                ).add_to(m)
-                
-                for _, row in bike_data.iterrows():
-                    try:
-                        bikes = int(row['parkingBikeTotCnt'])
-                        lat = float(row['stationLatitude'])
-                        lon = float(row['stationLongitude'])
-                        
-                        # 根据自行车数量设置颜色和大小
-                        if bikes > 20:
-                            color = '#2ecc71'    # 多 (绿色)
-                            radius = 6           # 大圆点
-                        elif bikes > 10:
-                            color = '#f1c40f'    # 中 (黄色)
-                            radius = 5           # 中圆点
-                        else:
-                            color = '#e74c3c'    # 少 (红色)
-                            radius = 4           # 小圆点
-                        
-                        folium.CircleMarker(
-                            location=[lat, lon],
-                            radius=radius,
-                            color=color,
-                            fill=True,
-                            popup=folium.Popup(
-                                f"""<div style='font-family: "Noto Sans KR", sans-serif; 
-                                                      text-align: center;
-                                                      padding: 5px;'>
-                                    <b>{row['stationName']}</b><br>
-                                    대여 가능한 자전거: <b>{bikes}대</b>
-                                </div>""",
-                                max_width=200
-                            ),
-                            fill_opacity=0.7,
-                            weight=1
-                        ).add_to(marker_cluster)
-                    except (ValueError, KeyError) as e:
-                        continue  # 跳过有问题的数据点
-                
-                # 添加图例
-                legend_html = '''
-                <div style="position: fixed; 
-                            bottom: 50px; right: 50px; 
-                            border-radius: 8px;
-                            background-color: rgba(255, 255, 255, 0.95);
-                            box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-                            padding: 12px 15px;
-                            font-family: 'Noto Sans KR', sans-serif;
-                            font-size: 13px;
-                            color: #2c3e50;
-                            z-index: 9999;">
-                    <p style="margin: 0 0 8px 0;"><strong>자전거 대여 현황</strong></p>
-                    <p style="margin: 4px 0;">● <span style="color: #2ecc71;">20대 이상</span></p>
-                    <p style="margin: 4px 0;">● <span style="color: #f1c40f;">10-20대</span></p>
-                    <p style="margin: 4px 0;">● <span style="color: #e74c3c;">10대 미만</span></p>
-                </div>
-                '''
-                m.get_root().html.add_child(folium.Element(legend_html))
+            # 获取自行车数据，同一快照版本的地图 HTML 在进程内只生成一次
+            map_html = get_seoul_map_html(
+                st.session_state.get('bike_data'),
+                version=st.session_state.get('snapshot_version'),
+                station_layer=station_layer
+            )
             
-            # 在上方添加一些空间
-            st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
-            folium_static(m, width=1000, height=440)  # 增加回440px
+            st_html(map_html, width=1000, height=450)  # 增加回440px
             
         except Exception as e:
             st.error(f"地图渲染错误: {str(e)}")
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 
 try:
     # 当作为包的一部分导入时
@@ -15,10 +14,6 @@ def render_metrics():
     # Get real-time bike data
     bike_data = get_bike_data()
     
-    # Convert string columns to numeric
-    bike_data['parkingBikeTotCnt'] = pd.to_numeric(bike_data['parkingBikeTotCnt'])
-    bike_data['rackTotCnt'] = pd.to_numeric(bike_data['rackTotCnt'])
-    
     def render_left_metrics(col):
         """메트릭 표시"""
         # 使用st.columns在一行中创建三个等宽列
@@ -0,0 +1,127 @@
+import json
+import numpy as np
+
+try:
+    from .snapshot import COUNT_COLUMNS, COORD_COLUMNS, COUNT_DTYPE, COORD_DTYPE
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from components.snapshot import COUNT_COLUMNS, COORD_COLUMNS, COUNT_DTYPE, COORD_DTYPE
+
+STRING_COLUMNS = ['stationId', 'stationName']
+# 车辆数或车架数无法解析时丢弃该站点；使用率无法解析时记为 0
+REQUIRED_COUNTS = {'parkingBikeTotCnt', 'rackTotCnt'}
+
+_STRING, _REQUIRED, _COUNT, _COORD = 'string', 'required', 'count', 'coord'
+_KINDS = dict(
+    {col: _STRING for col in STRING_COLUMNS},
+    **{col: _REQUIRED if col in REQUIRED_COUNTS else _COUNT for col in COUNT_COLUMNS},
+    **{col: _COORD for col in COORD_COLUMNS}
+)
+
+def _parse_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+class ColumnBuffer:
+    """
+    按列预分配的站点缓冲区
+
+    解码时每行的字段直接写入对应的类型化数组，只保留 dashboard 用到的列，
+    不为每行生成 dict；容量不足时按两倍扩容。
+    """
+    def __init__(self, capacity):
+        self.count = 0
+        self._plans = {}
+        self.columns = self._allocate(max(int(capacity), 1))
+        self.valid = np.zeros(len(self.columns['stationId']), dtype=bool)
+
+    @staticmethod
+    def _allocate(capacity):
+        columns = {col: np.full(capacity, None, dtype=object) for col in STRING_COLUMNS}
+        for col in COUNT_COLUMNS:
+            columns[col] = np.zeros(capacity, dtype=COUNT_DTYPE)
+        for col in COORD_COLUMNS:
+            columns[col] = np.full(capacity, np.nan, dtype=COORD_DTYPE)
+        return columns
+
+    def _grow(self):
+        size = len(self.valid)
+        grown = self._allocate(size * 2)
+        for col, values in self.columns.items():
+            grown[col][:size] = values
+        self.columns = grown
+        valid = np.zeros(size * 2, dtype=bool)
+        valid[:size] = self.valid
+        self.valid = valid
+
+    def _plan(self, keys):
+        """按一行的字段顺序生成写入计划 [(列名, 位置, 类型)]，不是站点行时为 None"""
+        if 'stationId' not in keys:
+            return None
+        return [(col, keys.index(col), _KINDS[col]) for col in self.columns if col in keys]
+
+    def append(self, pairs):
+        """写入一行 (key, value) 列表，不是站点行（没有 stationId）时返回 False"""
+        keys, values = zip(*pairs) if pairs else ((), ())
+        # 同一接口返回的各行字段顺序相同，写入计划只生成一次
+        plan = self._plans.get(keys, False)
+        if plan is False:
+            plan = self._plans[keys] = self._plan(keys)
+        if plan is None:
+            return False
+        i = self.count
+        if i == len(self.valid):
+            self._grow()
+        columns = self.columns
+        # 缺少的字段保持初始值：站点名为空，使用率为 0，坐标为 NaN
+        columns['stationName'][i] = ''
+        required = 0
+        valid = True
+        for col, position, kind in plan:
+            value = values[position]
+            if kind is _REQUIRED or kind is _COUNT:
+                required += kind is _REQUIRED
+                try:
+                    columns[col][i] = _parse_int(value)
+                except (TypeError, ValueError, OverflowError):
+                    columns[col][i] = 0
+                    valid = valid and kind is not _REQUIRED
+            elif kind is _COORD:
+                try:
+                    columns[col][i] = float(value)
+                except (TypeError, ValueError):
+                    columns[col][i] = np.nan
+            elif value is not None:
+                columns[col][i] = value
+        self.valid[i] = valid and required == len(REQUIRED_COUNTS) and columns['stationId'][i] is not None
+        self.count = i + 1
+        return True
+
+    def trim(self):
+        """返回 (各列的有效部分, valid 掩码)，均为缓冲区的视图"""
+        return {col: values[:self.count] for col, values in self.columns.items()}, self.valid[:self.count]
+
+def decode_page(body, capacity):
+    """
+    解码一页 bikeList 响应体
+
+    站点行在 JSON 解析过程中直接写入 ColumnBuffer（row 数组中只留下 None），
+    其余对象（rentBikeStatus、RESULT）照常解析为 dict。
+
+    Returns:
+        (ColumnBuffer, data)：data 为顶层对象
+    """
+    buffer = ColumnBuffer(capacity)
+    data = json.loads(body, object_pairs_hook=lambda pairs: None if buffer.append(pairs) else dict(pairs))
+    return buffer, data
+
+def concat_columns(parts):
+    """把多页的 (columns, valid) 拼接为一份"""
+    if len(parts) == 1:
+        return parts[0]
+    columns = {col: np.concatenate([part[0][col] for part in parts]) for col in parts[0][0]}
+    return columns, np.concatenate([part[1] for part in parts])
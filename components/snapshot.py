@@ -0,0 +1,131 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 快照中各列的紧凑类型
+COUNT_COLUMNS = ['parkingBikeTotCnt', 'rackTotCnt', 'shared']
+COORD_COLUMNS = ['stationLatitude', 'stationLongitude']
+COUNT_DTYPE = np.int16      # 车辆数/车架数/使用率都远小于 32767
+COORD_DTYPE = np.float32    # 约 1m 精度，足够地图显示
+
+class _Interner:
+    """
+    进程级字符串字典（只增不减）
+
+    为每个字符串分配稳定的整数编码，所有快照共享同一份字符串，
+    快照本身只保存编码（Categorical codes）。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes = {}
+        self._values = []
+        self._dtype = pd.CategoricalDtype([])
+
+    def encode(self, values, normalize=None):
+        """返回 (编码数组, CategoricalDtype)，编码即该字符串在字典中的位置"""
+        inverse, uniques = pd.factorize(values)
+        uniques = [normalize(u) for u in uniques] if normalize else list(uniques)
+        with self._lock:
+            new_values = [u for u in dict.fromkeys(uniques) if u not in self._codes]
+            if new_values:
+                for value in new_values:
+                    self._codes[value] = len(self._values)
+                    self._values.append(value)
+                self._dtype = pd.CategoricalDtype(list(self._values))
+            mapping = np.fromiter((self._codes[u] for u in uniques), dtype=np.int32, count=len(uniques))
+            dtype = self._dtype
+        return mapping[inverse], dtype
+
+    def __len__(self):
+        return len(self._values)
+
+# stationId 的编码同时作为站点的稠密整数索引（station_idx），在进程内保持稳定
+station_ids = _Interner()
+station_names = _Interner()
+
+def _read_only(values):
+    values.flags.writeable = False
+    return values
+
+def build_station_frame(raw_df):
+    """
+    将 API 返回的字符串列转换为紧凑、只读的快照 DataFrame
+
+    - 车辆数、车架数、使用率: int16（无法解析车辆数或车架数的站点会被丢弃）
+    - 经纬度: float32
+    - stationId / stationName: 共享字典的 Categorical
+    - station_idx: 进程内稳定的稠密整数索引
+    """
+    counts = {col: pd.to_numeric(raw_df[col], errors='coerce') for col in COUNT_COLUMNS}
+    valid = (
+        counts['parkingBikeTotCnt'].notna() & counts['rackTotCnt'].notna() & raw_df['stationId'].notna()
+    ).to_numpy()
+    columns = {
+        'stationId': raw_df['stationId'].to_numpy(),
+        'stationName': raw_df['stationName'].fillna('').to_numpy()
+    }
+    for col in COUNT_COLUMNS:
+        columns[col] = counts[col].fillna(0).to_numpy().astype(COUNT_DTYPE)
+    for col in COORD_COLUMNS:
+        columns[col] = pd.to_numeric(raw_df[col], errors='coerce').to_numpy().astype(COORD_DTYPE)
+    return frame_from_columns(columns, valid)
+
+def frame_from_columns(columns, valid=None):
+    """
+    由已经是紧凑类型的列（numpy 数组）构建只读快照 DataFrame
+
+    columns 包含 stationId、stationName（字符串对象数组）和 COUNT_COLUMNS、COORD_COLUMNS，
+    valid 为 False 的行会被丢弃。
+    """
+    if valid is not None and not valid.all():
+        logger.warning(f"Dropping {int((~valid).sum())} stations with invalid counts")
+        columns = {col: values[valid] for col, values in columns.items()}
+
+    id_codes, id_dtype = station_ids.encode(columns['stationId'])
+    name_codes, name_dtype = station_names.encode(columns['stationName'], normalize=_normalize_name)
+    return _assemble(id_codes, id_dtype, name_codes, name_dtype, columns)
+
+def frame_from_encoded(columns):
+    """
+    由字典编码的列构建只读快照 DataFrame（载入本地保存的快照时使用）
+
+    stationId、stationName 为 (编码数组, 字典取值)，字典取值来自之前的快照（站名已经规范化），
+    只需把它们转换为进程级字典的编码，不必逐行处理字符串；
+    数值列与 frame_from_columns 相同，已经是紧凑类型时不复制。
+    """
+    id_codes, id_values = columns['stationId']
+    name_codes, name_values = columns['stationName']
+    id_mapping, id_dtype = station_ids.encode(id_values)
+    name_mapping, name_dtype = station_names.encode(name_values)
+    return _assemble(id_mapping[id_codes], id_dtype, name_mapping[name_codes], name_dtype, columns)
+
+def _normalize_name(name):
+    return str(name).strip()
+
+def _assemble(id_codes, id_dtype, name_codes, name_dtype, columns):
+    frame = {
+        'stationId': pd.Categorical.from_codes(id_codes, dtype=id_dtype, validate=False),
+        'stationName': pd.Categorical.from_codes(name_codes, dtype=name_dtype, validate=False),
+        'station_idx': _read_only(id_codes)
+    }
+    for col in COUNT_COLUMNS:
+        frame[col] = _read_only(np.asarray(columns[col], dtype=COUNT_DTYPE))
+    for col in COORD_COLUMNS:
+        frame[col] = _read_only(np.asarray(columns[col], dtype=COORD_DTYPE))
+
+    # copy=False：保留只读数组，每列单独一个 block
+    return pd.DataFrame(frame, copy=False)
+
+def snapshot_nbytes(df):
+    """快照自身占用的字节数（不含进程级共享字典）"""
+    total = 0
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            total += series.cat.codes.nbytes
+        else:
+            total += series.memory_usage(index=False, deep=True)
+    return total + df.index.memory_usage()
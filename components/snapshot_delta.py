@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict, namedtuple
+import numpy as np
+import pandas as pd
+
+# 需要比较的列
+DELTA_COLUMNS = ['parkingBikeTotCnt', 'rackTotCnt', 'shared']
+
+# 两个快照之间的变化：changed 含 <col>_before / <col>_after 列，added / removed 为完整的站点行
+SnapshotDelta = namedtuple('SnapshotDelta', ['from_version', 'to_version', 'changed', 'added', 'removed'])
+
+def station_positions(station_idx, size):
+    """station_idx -> 行号的映射数组，不存在的站点为 -1"""
+    positions = np.full(size, -1, dtype=np.int64)
+    positions[station_idx] = np.arange(len(station_idx))
+    return positions
+
+def diff_snapshots(prev, curr, from_version=None, to_version=None, columns=DELTA_COLUMNS):
+    """
+    按站点比较两个快照
+
+    利用进程内稳定的 station_idx（stationId 的稠密编码）做向量化连接，
+    返回发生变化、新增和被移除的站点。
+    """
+    prev_idx = prev['station_idx'].to_numpy()
+    curr_idx = curr['station_idx'].to_numpy()
+    size = int(max(prev_idx.max(initial=-1), curr_idx.max(initial=-1))) + 1
+    prev_pos = station_positions(prev_idx, size)
+    curr_pos = station_positions(curr_idx, size)
+
+    matched = prev_pos[curr_idx]
+    in_prev = matched >= 0
+    common_curr = np.flatnonzero(in_prev)
+    common_prev = matched[in_prev]
+
+    changed_mask = np.zeros(len(common_curr), dtype=bool)
+    before = {}
+    after = {}
+    for col in columns:
+        before[col] = prev[col].to_numpy()[common_prev]
+        after[col] = curr[col].to_numpy()[common_curr]
+        changed_mask |= before[col] != after[col]
+
+    changed_rows = common_curr[changed_mask]
+    changed = pd.DataFrame({
+        'station_idx': curr_idx[changed_rows],
+        'stationId': curr['stationId'].to_numpy()[changed_rows]
+    })
+    for col in columns:
+        changed[f'{col}_before'] = before[col][changed_mask]
+        changed[f'{col}_after'] = after[col][changed_mask]
+
+    return SnapshotDelta(
+        from_version,
+        to_version,
+        changed,
+        curr.iloc[np.flatnonzero(~in_prev)],
+        prev.iloc[np.flatnonzero(curr_pos[prev_idx] < 0)]
+    )
+
+def apply_delta(frame, delta, columns=None):
+    """
+    将变化应用到以 station_idx 为索引的派生 DataFrame 上
+
+    frame 必须是派生视图自己持有的可写副本；只更新变化的行、追加新增站点、删除被移除的站点。
+    """
+    columns = [col for col in (columns or DELTA_COLUMNS) if col in frame.columns]
+    if len(delta.removed):
+        frame = frame.drop(index=delta.removed['station_idx'].to_numpy(), errors='ignore')
+
+    if len(delta.changed):
+        rows = frame.index.get_indexer(delta.changed['station_idx'].to_numpy())
+        found = rows >= 0
+        for col in columns:
+            frame.iloc[rows[found], frame.columns.get_loc(col)] = delta.changed[f'{col}_after'].to_numpy()[found]
+
+    if len(delta.added):
+        added = delta.added.set_index('station_idx')
+        frame = pd.concat([frame, added[[col for col in frame.columns if col in added.columns]]])
+    return frame
+
+class DeltaTracker:
+    """
+    记录相邻快照版本之间的变化
+
+    作为 SnapshotCache 的订阅者，每次发布新快照时只计算一次与上一版本的差异，
+    各会话的派生视图按版本号取用，避免重复计算。
+    """
+    def __init__(self, max_deltas=8):
+        self.max_deltas = max_deltas
+        self._lock = threading.Lock()
+        self._previous = None
+        self._deltas = OrderedDict()
+
+    def on_snapshot(self, snapshot):
+        """SnapshotCache 订阅回调"""
+        previous, self._previous = self._previous, snapshot
+        if previous is None:
+            return
+        delta = diff_snapshots(previous.data, snapshot.data, previous.version, snapshot.version)
+        with self._lock:
+            self._deltas[snapshot.version] = delta
+            while len(self._deltas) > self.max_deltas:
+                self._deltas.popitem(last=False)
+
+    def get(self, from_version, to_version):
+        """返回 from_version -> to_version 的变化，不是相邻版本或已过期时返回 None"""
+        with self._lock:
+            delta = self._deltas.get(to_version)
+        if delta is None or delta.from_version != from_version:
+            return None
+        return delta
+
+# 进程级变化记录
+delta_tracker = DeltaTracker()
@@ -0,0 +1,205 @@
+import json
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from config.settings import SNAPSHOT_STORE_CONFIG, STATION_TIER_CONFIG
+from utils.instrumentation import metrics, span
+
+try:
+    from .snapshot import COUNT_COLUMNS, COORD_COLUMNS, frame_from_encoded
+    from .station_classifier import classify_stations
+    from .district_stats import SUM_COLUMNS, aggregate_districts
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from components.snapshot import COUNT_COLUMNS, COORD_COLUMNS, frame_from_encoded
+    from components.station_classifier import classify_stations
+    from components.district_stats import SUM_COLUMNS, aggregate_districts
+
+logger = logging.getLogger(__name__)
+
+# 文件格式版本，列或元数据的结构变化时递增（旧文件不再载入）
+FORMAT_VERSION = 3
+METADATA_KEY = b'bikedash'
+DICTIONARY_COLUMNS = ['stationId', 'stationName', 'district']
+# 保留全部类别的字典列：district 的类别编码被 DistrictStatsView 当作下标使用，载入后必须与 district_index.dtype 一致
+FULL_DICTIONARY_COLUMNS = ['district']
+
+# 载入的快照：分类结果和各区汇总与保存时的快照一致（分级阈值变化后为 None，需要重新计算）
+SavedSnapshot = namedtuple('SavedSnapshot', ['data', 'fetched_at', 'classification', 'district_stats'])
+
+def _dictionary_array(series, keep_categories=False):
+    """Categorical 列 -> Arrow 字典数组（默认只保留用到的取值，缺失值为 null）"""
+    if not keep_categories:
+        series = series.cat.remove_unused_categories()
+    codes = series.cat.codes.to_numpy()
+    indices = pa.array(codes.astype(np.int32), mask=codes < 0)
+    return pa.DictionaryArray.from_arrays(indices, pa.array(series.cat.categories.astype(str).to_numpy()))
+
+def _dictionary_codes(column):
+    """Arrow 字典列 -> (编码数组, 字典取值)，null 的编码为 -1"""
+    array = column.combine_chunks()
+    indices = array.indices.fill_null(-1).to_numpy()
+    return indices, array.dictionary.to_numpy(zero_copy_only=False)
+
+def _numeric(column):
+    """数值列：单个 chunk 时直接引用内存映射的缓冲区（只读，不复制）"""
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy()
+    return column.to_numpy()
+
+def snapshot_table(snapshot):
+    """
+    把快照连同派生结果编码为 Arrow 表
+
+    stationId、stationName、district 为字典列，车辆数等为 int16、经纬度为 float32（与内存中的快照相同）；
+    站点分类结果、各区汇总和抓取时间以 JSON 保存在 schema 元数据中。
+    """
+    frame = snapshot.data
+    arrays = {
+        col: _dictionary_array(frame[col], keep_categories=col in FULL_DICTIONARY_COLUMNS)
+        for col in DICTIONARY_COLUMNS
+    }
+    for col in COUNT_COLUMNS + COORD_COLUMNS:
+        arrays[col] = pa.array(frame[col].to_numpy())
+    totals = aggregate_districts(frame)
+    metadata = {
+        'format': FORMAT_VERSION,
+        'version': snapshot.version,
+        'fetched_at': snapshot.fetched_at.isoformat(),
+        'tier_config': STATION_TIER_CONFIG,
+        'classification': classify_stations(frame),
+        'district_stats': {
+            'index': totals.index.astype(str).tolist(),
+            'sums': totals[SUM_COLUMNS].to_numpy(dtype=np.int64).tolist()
+        }
+    }
+    table = pa.table(arrays)
+    return table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata, ensure_ascii=False)})
+
+def read_snapshot(table):
+    """由 snapshot_table 编码的 Arrow 表恢复 SavedSnapshot（无法识别时返回 None）"""
+    metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+    if metadata.get('format') != FORMAT_VERSION:
+        return None
+    columns = {col: _dictionary_codes(table.column(col)) for col in ['stationId', 'stationName']}
+    for col in COUNT_COLUMNS + COORD_COLUMNS:
+        columns[col] = _numeric(table.column(col))
+    frame = frame_from_encoded(columns)
+    district_codes, districts = _dictionary_codes(table.column('district'))
+    frame['district'] = pd.Categorical.from_codes(
+        district_codes, dtype=pd.CategoricalDtype(districts), validate=False
+    )
+
+    classification = district_stats = None
+    if metadata['tier_config'] == STATION_TIER_CONFIG:
+        classification = metadata['classification']
+        stats = metadata['district_stats']
+        district_stats = pd.DataFrame(
+            np.asarray(stats['sums'], dtype=np.int64).reshape(-1, len(SUM_COLUMNS)),
+            index=pd.Index(stats['index'], name='district'), columns=SUM_COLUMNS
+        )
+    return SavedSnapshot(frame, datetime.fromisoformat(metadata['fetched_at']), classification, district_stats)
+
+class SnapshotStore:
+    """
+    最近一次成功刷新的快照（本地 Arrow IPC 文件，不压缩）
+
+    save() 先写入临时文件再替换，读取方永远不会看到写了一半的文件；
+    load() 通过内存映射读取，数值列直接引用映射的页，站点 ID 和站名只需转换字典取值，
+    数千个站点的快照可以在几毫秒内载入。
+    submit() 把快照交给后台线程写入，写入较慢时只保留最新的一个快照。
+    """
+    def __init__(self, path, max_age=86400):
+        self.path = Path(path)
+        self.max_age = max_age
+        self._cond = threading.Condition()
+        self._pending = None
+        self._writer = None
+        self._stats = {'saved': 0, 'skipped': 0, 'loaded': 0, 'errors': 0}
+
+    def submit(self, snapshot):
+        """SnapshotCache 订阅回调：在后台线程中保存快照（不阻塞发布）"""
+        with self._cond:
+            if self._pending is not None:
+                self._stats['skipped'] += 1
+            self._pending = snapshot
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name='snapshot-store-writer', daemon=True)
+                self._writer.start()
+            self._cond.notify()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                snapshot = self._pending
+            self.save(snapshot)
+            with self._cond:
+                if self._pending is snapshot:
+                    self._pending = None
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """等待已提交的快照写入完成"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None, timeout)
+
+    def save(self, snapshot):
+        """保存快照（原子替换），成功时返回写入的字节数"""
+        try:
+            with span('persist'):
+                table = snapshot_table(snapshot)
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(self.path.name + '.tmp')
+                with pa.OSFile(str(tmp), 'wb') as sink:
+                    with ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+                tmp.replace(self.path)
+            size = self.path.stat().st_size
+            self._stats['saved'] += 1
+            metrics.set('snapshot_store_bytes', size)
+            return size
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Error saving snapshot v{snapshot.version}: {str(e)}")
+            return None
+
+    def load(self):
+        """载入保存的快照，文件不存在、过旧或无法读取时返回 None"""
+        if not self.path.exists():
+            return None
+        try:
+            source = pa.memory_map(str(self.path), 'r')
+            saved = read_snapshot(ipc.open_file(source).read_all())
+            if saved is None:
+                logger.info(f"Ignoring {self.path}: unsupported format")
+                return None
+            age = (datetime.now() - saved.fetched_at).total_seconds()
+            if age > self.max_age:
+                logger.info(f"Ignoring {self.path}: saved {age:.0f}s ago")
+                return None
+            self._stats['loaded'] += 1
+            return saved
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Error loading saved snapshot {self.path}: {str(e)}")
+            return None
+
+    def get_stats(self):
+        """返回保存/跳过（被更新的快照取代）/载入/出错计数"""
+        with self._cond:
+            return dict(self._stats)
+
+# 进程级本地快照
+snapshot_store = SnapshotStore(SNAPSHOT_STORE_CONFIG['path'], max_age=SNAPSHOT_STORE_CONFIG['max_age'])
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+from config.settings import STATION_TIER_CONFIG
+
+# 站点分级（按优先级排列）
+TIERS = ['empty', 'near_empty', 'full', 'near_full', 'normal']
+
+def station_numbers(station_ids):
+    """向量化提取站点编号（移除 'ST-' 前缀），无法解析时为 0"""
+    if isinstance(station_ids.dtype, pd.CategoricalDtype):
+        # 只解析出现过的字典取值，再按编码映射回每一行
+        used, inverse = np.unique(station_ids.cat.codes.to_numpy(), return_inverse=True)
+        return station_numbers(pd.Series(station_ids.cat.categories[used]))[inverse]
+    numbers = pd.to_numeric(
+        station_ids.astype(str).str.replace('ST-', '', regex=False),
+        errors='coerce'
+    )
+    return numbers.fillna(0).astype(np.int64).to_numpy()
+
+def compute_tiers(df, config=None):
+    """
+    按列掩码计算每个站点的分级
+
+    empty: 没有可用车辆; near_empty: 可用车辆不超过阈值;
+    full: 没有剩余车架; near_full: 剩余车架不超过阈值; 其余为 normal
+    """
+    config = config or STATION_TIER_CONFIG
+    parking = df['parkingBikeTotCnt'].to_numpy()
+    remaining = df['rackTotCnt'].to_numpy() - parking
+    labels = np.select(
+        [
+            parking <= 0,
+            parking <= config['near_empty_max_bikes'],
+            remaining <= 0,
+            remaining <= config['near_full_max_racks']
+        ],
+        TIERS[:-1],
+        default=TIERS[-1]
+    )
+    return pd.Categorical(labels, categories=TIERS)
+
+# 站点列表的分类：no_rental 没有可用车辆；no_return 无法返还（剩余车架为 0，即车架已满）；
+# no_racks 没有车架（与车架已满分开统计）
+CATEGORIES = {
+    'no_rental': lambda df: df['parkingBikeTotCnt'].to_numpy() == 0,
+    'no_return': lambda df: df['rackTotCnt'].to_numpy() - df['parkingBikeTotCnt'].to_numpy() == 0,
+    'no_racks': lambda df: df['rackTotCnt'].to_numpy() == 0
+}
+
+def to_records(df):
+    """将站点子集转换为按站点编号排序的记录列表"""
+    parking = df['parkingBikeTotCnt'].to_numpy()
+    rack_total = df['rackTotCnt'].to_numpy()
+    records = pd.DataFrame({
+        'id': df['stationId'].to_numpy(),
+        'name': df['stationName'].astype(str).str.strip().to_numpy(),
+        'parking': parking.astype(np.int64),
+        'rack_count': rack_total.astype(np.int64),
+        'remaining_racks': (rack_total - parking).astype(np.int64),
+        'shared': df['shared'].fillna(0).to_numpy().astype(np.int64),
+        'lat': df['stationLatitude'].to_numpy(dtype=np.float64),
+        'lng': df['stationLongitude'].to_numpy(dtype=np.float64)
+    })
+    # 按站点编号排序（稳定排序，编号相同时保持原有顺序）
+    order = np.argsort(station_numbers(df['stationId']), kind='stable')
+    return records.iloc[order].to_dict('records')
+
+def classify_stations(df, config=None):
+    """
+    对所有站点进行分类
+
+    Returns:
+        dict: no_rental（没有可用车辆）、no_return（车架已满，剩余车架为 0）、no_racks（没有车架）
+              三类站点的数量和按编号排序的列表，以及各分级的站点数
+    """
+    total_stations = len(df)
+    # 跳过车辆数或车架数无法解析的站点
+    df = df[df['parkingBikeTotCnt'].notna() & df['rackTotCnt'].notna()]
+
+    tier_counts = pd.Series(compute_tiers(df, config)).value_counts()
+    result = {}
+    for name, mask in CATEGORIES.items():
+        stations = df[mask(df)]
+        result[name] = {'count': len(stations), 'stations': to_records(stations)}
+
+    return {
+        **result,
+        'tiers': {tier: int(tier_counts.get(tier, 0)) for tier in TIERS},
+        'total_stations': total_stations
+    }
+
+class StationStatusView:
+    """
+    可增量更新的站点分类结果
+
+    rebuild() 对整个快照做一次完整分类；apply_delta() 只重新判断发生变化、新增和
+    移除的站点，并按变化前后的分级调整各分级计数。
+    """
+    CATEGORIES = CATEGORIES
+
+    def __init__(self, config=None):
+        self.config = config
+        self.version = None
+        self.total_stations = 0
+        self.tier_counts = dict.fromkeys(TIERS, 0)
+        self._members = {name: {} for name in self.CATEGORIES}
+        self._result = None
+
+    def rebuild(self, df, version=None):
+        """对整个快照重新分类"""
+        self.restore(classify_stations(df, self.config), version)
+
+    def restore(self, result, version=None):
+        """直接使用已有的完整分类结果（classify_stations 的返回值，例如本地保存的快照）"""
+        self.version = version
+        self.total_stations = result['total_stations']
+        self.tier_counts = dict(result['tiers'])
+        self._members = {
+            name: {record['id']: record for record in result[name]['stations']}
+            for name in self.CATEGORIES
+        }
+        self._result = result
+
+    def apply_delta(self, df, delta):
+        """根据快照变化更新分类结果，df 为变化之后的快照"""
+        touched = np.concatenate([
+            delta.changed['station_idx'].to_numpy(),
+            delta.added['station_idx'].to_numpy()
+        ])
+        stations = df[np.isin(df['station_idx'].to_numpy(), touched)]
+        gone = set(delta.removed['stationId']) | set(stations['stationId'])
+        for name, mask in self.CATEGORIES.items():
+            members = self._members[name]
+            for station_id in gone:
+                members.pop(station_id, None)
+            for record in to_records(stations[mask(stations)]):
+                members[record['id']] = record
+
+        # 分级计数：减去变化前/被移除的站点，加上变化后/新增的站点
+        before = pd.DataFrame({
+            col: np.concatenate([delta.changed[f'{col}_before'].to_numpy(), delta.removed[col].to_numpy()])
+            for col in ['parkingBikeTotCnt', 'rackTotCnt']
+        })
+        after = pd.DataFrame({
+            col: np.concatenate([delta.changed[f'{col}_after'].to_numpy(), delta.added[col].to_numpy()])
+            for col in ['parkingBikeTotCnt', 'rackTotCnt']
+        })
+        for tiers, sign in ((compute_tiers(before, self.config), -1), (compute_tiers(after, self.config), 1)):
+            for tier, count in pd.Series(tiers).value_counts().items():
+                self.tier_counts[tier] += sign * int(count)
+
+        self.version = delta.to_version
+        self.total_stations += len(delta.added) - len(delta.removed)
+        self._result = None
+
+    def to_dict(self):
+        """返回与 classify_stations 相同结构的结果（各会话共享，请勿修改）"""
+        if self._result is None:
+            result = {}
+            for name, members in self._members.items():
+                records = list(members.values())
+                ids = pd.Series([record['id'] for record in records], dtype=object)
+                order = np.argsort(station_numbers(ids), kind='stable') if records else []
+                result[name] = {'count': len(records), 'stations': [records[i] for i in order]}
+            result['tiers'] = dict(self.tier_counts)
+            result['total_stations'] = self.total_stations
+            self._result = result
+        return self._result
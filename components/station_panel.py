@@ -1,14 +1,102 @@
 import streamlit as st
 from utils.data_refresh import should_refresh_data
+from config.settings import STATION_PANEL_CONFIG
+import numpy as np
 import pandas as pd
 
+try:
+    # 当作为包的一部分导入时
+    from .station_search import SORT_OPTIONS, search_snapshot
+except ImportError:
+    # 当直接运行文件时
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from components.station_search import SORT_OPTIONS, search_snapshot
+
+# 表格显示的列及其标题
+DISPLAY_COLUMNS = {
+    'stationName': '대여소명',
+    'parkingBikeTotCnt': '대여 가능 대수',
+    'rackTotCnt': '총 거치대 수'
+}
+
+UTILIZATION_COLUMN = '거치율'
+
 class StationPanel:
     def __init__(self):
         self.bike_data = None
+        self.display_data = None
         
     def update_data(self, bike_data):
         """Update the bike data"""
         self.bike_data = bike_data
+        self.display_data = self._prepare(bike_data)
+    
+    @staticmethod
+    def _prepare(bike_data):
+        """Build the panel's own (writable) table indexed by station_idx"""
+        return bike_data.set_index('station_idx')[list(DISPLAY_COLUMNS)].copy()
+    
+    def query(self, text='', sort=None, page=0, page_size=None, version=None):
+        """
+        Filter, sort and page the table on the server
+
+        Returns (page of the display table with display headers, SearchPage)
+        """
+        search = search_snapshot(self.bike_data, version)
+        result = search.query(
+            text,
+            sort=sort or STATION_PANEL_CONFIG['default_sort'],
+            page=page,
+            page_size=page_size or STATION_PANEL_CONFIG['page_size']
+        )
+        station_idx = self.bike_data['station_idx'].to_numpy()[result.rows]
+        rows = self.display_data.reindex(station_idx).rename(columns=DISPLAY_COLUMNS)
+        rows[UTILIZATION_COLUMN] = np.round(search.utilization[result.rows] * 100)
+        return rows, result
+    
+    @staticmethod
+    def _reset_page():
+        st.session_state['station_page'] = 0
+    
+    @staticmethod
+    def _turn_page(step):
+        st.session_state['station_page'] = st.session_state.get('station_page', 0) + step
+    
+    def _render_controls(self):
+        """Search box and sort order; changing either goes back to the first page"""
+        query_col, sort_col = st.columns([3, 2])
+        with query_col:
+            query = st.text_input(
+                "대여소 검색",
+                placeholder="대여소명 또는 번호 (예: 망원역, 102)",
+                key='station_query',
+                on_change=self._reset_page,
+                label_visibility='collapsed'
+            )
+        with sort_col:
+            labels = list(SORT_OPTIONS.values())
+            label = st.selectbox(
+                "정렬",
+                labels,
+                index=list(SORT_OPTIONS).index(STATION_PANEL_CONFIG['default_sort']),
+                key='station_sort',
+                on_change=self._reset_page,
+                label_visibility='collapsed'
+            )
+        return query, list(SORT_OPTIONS)[labels.index(label)]
+    
+    def _render_pager(self, result):
+        prev_col, info_col, next_col = st.columns([1, 3, 1])
+        with prev_col:
+            st.button("◀", key='station_prev', disabled=result.page == 0,
+                      on_click=self._turn_page, args=(-1,))
+        with info_col:
+            st.caption(f"{result.page + 1} / {result.pages} 페이지 · {result.total:,}개 대여소")
+        with next_col:
+            st.button("▶", key='station_next', disabled=result.page >= result.pages - 1,
+                      on_click=self._turn_page, args=(1,))
         
     def render(self):
         """Render the station panel"""
@@ -17,167 +105,6 @@ class StationPanel:
             # 触发页面刷新
             st.rerun()
         
-        st.markdown("""
-            <style>
-                /* 主容器样式 */
-                .station-panel {
-                    margin-left: 1rem;
-                    border-radius: 12px;                    
-                    padding: 0.5rem !important;  /* 减小内边距 */
-                    overflow: hidden !important;
-                    
-                }
-
-                /* 移除表格上方的空白 */
-                div[data-testid="stVerticalBlock"] > div {
-                    padding-top: 0 !important;
-                    padding-bottom: 0 !important;
-                    margin-top: 0 !important;
-                    margin-bottom: 0 !important;
-                }
-
-                /* 移除 DataFrame 容器的多余空白 */
-                div[data-testid="stDataFrameResizable"] {
-                    padding: 0 !important;
-                    margin: 0 !important;
-                }
-
-                /* 调整表格容器样式 */
-                .element-container {
-                    margin: 0 !important;
-                    padding: 0 !important;
-                }
-
-                /* 确保列容器没有额外的空白 */
-                [data-testid="column"] {
-                    padding: 0 !important;
-                    margin: 0 !important;
-                }
-
-                .station-panel-content {
-                    height: 100% !important;
-                    display: flex !important;
-                    flex-direction: column !important;
-                    padding: 0 !important;
-                    margin: 0 !important;
-                }
-
-                /* 表格容器样式 */
-                .station-table {
-                    flex: 1 !important;
-                    overflow: auto !important;
-                    padding: 0 !important;
-                    margin: 0 !important;
-                    border-radius: 4px !important;
-                }
-                
-                /* 调整表格单元格样式 */
-                div[data-testid="stDataFrameResizable"] td, 
-                div[data-testid="stDataFrameResizable"] th {
-                    padding: 4px 8px !important;
-                    font-size: 10px !important;
-                    border: 1px solid #e0e0e0 !important;
-                }
-
-                /* 调整表格行高 */
-                div[data-testid="stDataFrameResizable"] tr {
-                    height: 24px !important;
-                }
-                
-                /* 表格头部样式 */
-                div[data-testid="stDataFrameResizable"] th {
-                    font-size: 11px !important;
-                    font-weight: 600 !important;
-                    background-color: #f8f9fa !important;
-                    border-bottom: 2px solid rgba(0, 0, 0, 0.1) !important;
-                    padding: 8px !important;
-                    height: 32px !important;
-                    white-space: nowrap !important;
-                }
-                
-                /* 调整表格滚动区域样式 */
-                .stDataFrameResizable > div:first-child {
-                    overflow: auto !important;
-                    border-radius: 12px !important;
-                }
-
-                /* 隐藏全屏按钮 */
-                div[data-testid="stDataFrameResizable"] [data-testid="StyledFullScreenButton"] {
-                    display: none !important;
-                }
-                
-                /* 设置表格编辑器变量 */
-                .stDataFrameGlideDataEditor {
-                    --gdg-header-font-style: normal !important;
-                    --gdg-base-font-style: normal !important;
-                    --gdg-font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif !important;
-                }
-
-                /* 响应式布局 */
-                @media screen and (max-width: 768px) {
-                    .station-panel {
-                        height: calc(100vh - 240px) !important;
-                    }
-                    
-                    div[data-testid="stDataFrameResizable"] td {
-                        padding: 3px 6px !important;
-                        font-size: 11px !important;
-                    }
-                    
-                    div[data-testid="stDataFrameResizable"] th {
-                        font-size: 12px !important;
-                        padding: 6px !important;
-                        height: 28px !important;
-                    }
-                }
-
-                @media screen and (max-width: 480px) {
-                    .station-panel {
-                        height: calc(100vh - 200px) !important;
-                    }
-                    
-                    div[data-testid="stDataFrameResizable"] td {
-                        padding: 2px 4px !important;
-                        font-size: 10px !important;
-                    }
-                    
-                    div[data-testid="stDataFrameResizable"] th {
-                        font-size: 11px !important;
-                        padding: 4px !important;
-                        height: 24px !important;
-                    }
-                }
-
-                /* 调整表格列宽 */
-                div[data-testid="stDataFrameResizable"] table {
-                    table-layout: fixed !important;
-                }
-                
-                /* 设置第一列宽度 */
-                div[data-testid="stDataFrameResizable"] td:first-child,
-                div[data-testid="stDataFrameResizable"] th:first-child {
-                    width: 200px !important;
-                    max-width: 200px !important;
-                }
-                
-                /* 设置数字列宽度 */
-                div[data-testid="stDataFrameResizable"] td:not(:first-child),
-                div[data-testid="stDataFrameResizable"] th:not(:first-child) {
-                    width: 100px !important;
-                    max-width: 100px !important;
-                    text-align: center !important;
-                }
-
-                /* 确保单元格内容不换行 */
-                div[data-testid="stDataFrameResizable"] td,
-                div[data-testid="stDataFrameResizable"] th {
-                    white-space: nowrap !important;
-                    overflow: hidden !important;
-                    text-overflow: ellipsis !important;
-                }
-            </style>
-        """, unsafe_allow_html=True)
-
         # 创建主容器，移除额外的 padding
         with st.container():
             st.markdown('<div class="station-panel">', unsafe_allow_html=True)
@@ -193,23 +120,18 @@ class StationPanel:
                 """, unsafe_allow_html=True)
             else:
                 try:
-                    # 直接显示数据，移除搜索相关代码
-                    filtered_data = self.bike_data
-                    
-                    # 重命名列并选择要显示的列
-                    filtered_data = filtered_data.rename(columns={
-                        'stationName': '대여소명',
-                        'parkingBikeTotCnt': '대여 가능 대수',
-                        'rackTotCnt': '총 거치대 수'
-                    })[['대여소명', '대여 가능 대수', '총 거치대 수']]
-                    
-                    # 确保数值列为数值类型
-                    filtered_data['대여 가능 대수'] = pd.to_numeric(filtered_data['대여 가능 대수'], errors='coerce')
-                    filtered_data['총 거치대 수'] = pd.to_numeric(filtered_data['총 거치대 수'], errors='coerce')
+                    # 在服务端检索、排序和分页，每次重绘只发送一页
+                    query, sort = self._render_controls()
+                    page_rows, result = self.query(
+                        query, sort,
+                        page=st.session_state.get('station_page', 0),
+                        version=st.session_state.get('snapshot_version')
+                    )
+                    # 数据变化后页数可能减少
+                    st.session_state['station_page'] = result.page
 
-                    # 使用st.dataframe显示数据，移除额外的样式包装
                     st.dataframe(
-                        filtered_data,
+                        page_rows,
                         hide_index=True,
                         use_container_width=True,
                         height=None,
@@ -225,9 +147,15 @@ class StationPanel:
                             "총 거치대 수": st.column_config.NumberColumn(
                                 "총 거치대 수",
                                 width=100,  # 减小宽度
+                            ),
+                            UTILIZATION_COLUMN: st.column_config.NumberColumn(
+                                UTILIZATION_COLUMN,
+                                width=80,
+                                format="%d%%"
                             )
                         }
                     )
+                    self._render_pager(result)
                 except Exception as e:
                     st.error(f"데이터를 불러오는 중 오류가 발생했습니다: {str(e)}")
             
@@ -238,7 +166,8 @@ if __name__ == "__main__":
     
     # 测试数据
     test_data = pd.DataFrame({
-        'stationName': ['Station 1', 'Station 2'],
+        'station_idx': [0, 1],
+        'stationName': pd.Categorical(['Station 1', 'Station 2']),
         'parkingBikeTotCnt': [10, 20],
         'rackTotCnt': [15, 25],
         'shared': [30, 40]
@@ -0,0 +1,249 @@
+import functools
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+
+# ---- 한글 자모 분해 ----
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+             'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# 复合元音和复合收音拆成基本字母，输入过程中的 "고" 也能匹配 "과"
+COMPOUND_JAMO = {
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ'
+}
+CONSONANTS = set(CHOSEONG)
+
+# 站点名开头的编号，例如 "102. 망원역 1번출구 앞"
+_NUMBER_PATTERN = re.compile(r'^\s*(\d+)(?:[.)\s]+|$)')
+# 检索时忽略空白和标点
+_IGNORED_PATTERN = re.compile(r'[\s\W_]+')
+SEPARATOR = '\x00'
+
+# NFKC 会把兼容字母（ㄱ U+3131）转换为组合字母（ᄀ U+1100），检索时统一换回兼容字母
+_COMPAT_JAMO = {
+    ord(unicodedata.normalize('NFKC', chr(code))): chr(code) for code in range(0x3131, 0x3164)
+}
+
+def fold_width(text):
+    """NFKC 统一全角/半角（"１０２" -> "102"），兼容字母保持不变"""
+    return unicodedata.normalize('NFKC', str(text)).translate(_COMPAT_JAMO)
+
+def normalize(text):
+    """统一全角/半角、大小写，去掉空白和标点"""
+    return _IGNORED_PATTERN.sub('', fold_width(text).lower())
+
+def _decompose_syllable(code):
+    offset = code - HANGUL_BASE
+    jamo = CHOSEONG[offset // 588] + JUNGSEONG[(offset % 588) // 28] + JONGSEONG[offset % 28]
+    return ''.join(COMPOUND_JAMO.get(j, j) for j in jamo)
+
+@functools.lru_cache(maxsize=None)
+def _translation_tables():
+    """
+    str.translate 的映射表：11172 个音节各自的字母序列 / 初声（在 C 中逐字符替换）
+
+    构建约需 20ms，第一次建立索引或检索时才构建，不计入导入时间。
+    """
+    jamo = {code: _decompose_syllable(code) for code in range(HANGUL_BASE, HANGUL_LAST + 1)}
+    jamo.update({ord(letter): parts for letter, parts in COMPOUND_JAMO.items()})
+    choseong = {code: CHOSEONG[(code - HANGUL_BASE) // 588] for code in range(HANGUL_BASE, HANGUL_LAST + 1)}
+    return jamo, choseong
+
+def to_jamo(text):
+    """把完整音节拆成兼容字母序列（"망원" -> "ㅁㅏㅇㅇㅜㅓㄴ"）"""
+    return text.translate(_translation_tables()[0])
+
+def to_choseong(text):
+    """每个音节只取初声（"망원역" -> "ㅁㅇㅇ"），非韩文字符保持不变"""
+    return text.translate(_translation_tables()[1])
+
+def split_number(name):
+    """拆出站点名开头的编号，返回 (编号字符串或 '', 其余部分)"""
+    match = _NUMBER_PATTERN.match(name)
+    if match is None:
+        return '', name
+    return match.group(1), name[match.end():]
+
+class _Blob:
+    """以分隔符连接的一组字符串，子串检索在整个字符串上一次完成（re 在 C 中扫描）"""
+    def __init__(self):
+        self._parts = []
+        self._starts = []
+        self._length = 0
+        self._text = None
+        self._start_array = None
+
+    def append(self, texts):
+        for text in texts:
+            self._starts.append(self._length)
+            self._parts.append(text)
+            self._length += len(text) + 1
+        self._text = None
+
+    def find(self, needle, count, prefix=False):
+        """返回包含 needle（prefix=True 时为以 needle 开头）的字符串的布尔掩码（长度 count）"""
+        if self._text is None:
+            # 开头也加一个分隔符，前缀检索即检索 "分隔符 + needle"
+            self._text = SEPARATOR + SEPARATOR.join(self._parts)
+            self._start_array = np.asarray(self._starts, dtype=np.int64) + 1
+        pattern = re.escape(SEPARATOR + needle if prefix else needle)
+        offsets = np.fromiter(
+            (m.start() + prefix for m in re.finditer(pattern, self._text)), dtype=np.int64
+        )
+        mask = np.zeros(count, dtype=bool)
+        if len(offsets):
+            mask[np.searchsorted(self._start_array, offsets, side='right') - 1] = True
+        return mask
+
+class NameIndex:
+    """
+    站点名检索索引
+
+    与站点名的共享字典（snapshot.station_names）一一对应：位置即 stationName 的类别编码。
+    字典只增不减，新的快照只需要为新出现的名称建索引。
+    支持：
+    - 编号前缀："102" 匹配 102, 1020, 1021 ...
+    - 자모 子串："망원역"、"망원여"（输入中）、"ㅁㅏㅇ" 都匹配 "망원역"
+    - 초성："ㅁㅇㅇ" 匹配 "망원역"
+    - 编号加名称："102 망원" 两个条件同时满足
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names = []
+        self._numbers = np.empty(0, dtype=np.int64)
+        self._number_text = _Blob()
+        self._jamo = _Blob()
+        self._choseong = _Blob()
+
+    def __len__(self):
+        return len(self._names)
+
+    def extend(self, categories):
+        """为 categories 中尚未建索引的名称（位置 >= len(self)）建索引"""
+        with self._lock:
+            new_names = [str(name) for name in categories[len(self._names):]]
+            if not new_names:
+                return
+            numbers = []
+            bodies = []
+            for name in new_names:
+                number, body = split_number(fold_width(name))
+                numbers.append(number)
+                bodies.append(normalize(body))
+            self._names.extend(new_names)
+            self._numbers = np.concatenate([
+                self._numbers, np.asarray([int(n) if n else -1 for n in numbers], dtype=np.int64)
+            ])
+            self._number_text.append(numbers)
+            self._jamo.append(to_jamo(body) for body in bodies)
+            self._choseong.append(to_choseong(body) for body in bodies)
+
+    @property
+    def numbers(self):
+        """各名称开头的编号（没有编号时为 -1）"""
+        return self._numbers
+
+    def match(self, query):
+        """返回与 query 匹配的名称掩码（按类别编码），query 为空时返回 None 表示不过滤"""
+        number, body = split_number(fold_width(query))
+        body = normalize(body)
+        if not number and not body:
+            return None
+        with self._lock:
+            count = len(self._names)
+            mask = np.ones(count, dtype=bool)
+            if number:
+                mask &= self._number_text.find(number, count, prefix=True)
+            if body:
+                mask &= self._match_body(body, count)
+            return mask
+
+    def _match_body(self, body, count):
+        if all(ch in CONSONANTS for ch in body):
+            return self._choseong.find(body, count) | self._jamo.find(body, count)
+        return self._jamo.find(to_jamo(body), count)
+
+# 进程级站点名索引（与 station_names 字典对应）
+name_index = NameIndex()
+
+SORT_OPTIONS = OrderedDict([
+    ('number', '번호순'),
+    ('bikes_desc', '대여 가능 많은 순'),
+    ('bikes_asc', '대여 가능 적은 순'),
+    ('utilization_desc', '거치율 높은 순'),
+    ('utilization_asc', '거치율 낮은 순')
+])
+
+# 一页检索结果：页内的行位置（快照中的位置）、匹配总数、页码（从 0 开始）、总页数
+SearchPage = namedtuple('SearchPage', ['rows', 'total', 'page', 'pages'])
+
+class SnapshotSearch:
+    """
+    一个快照的检索视图（每个快照版本构建一次，各会话共享）
+
+    保存站点名编码和预先计算好的各种排序顺序，查询时只做掩码运算和切片。
+    """
+    def __init__(self, frame, version=None):
+        self.version = version
+        names = frame['stationName']
+        name_index.extend(names.cat.categories)
+        self.name_codes = names.cat.codes.to_numpy()
+        parking = frame['parkingBikeTotCnt'].to_numpy().astype(np.int64)
+        racks = frame['rackTotCnt'].to_numpy().astype(np.int64)
+        utilization = np.divide(parking, racks, out=np.zeros(len(frame)), where=racks > 0)
+        numbers = name_index.numbers[self.name_codes]
+        # 没有编号的站点排在最后
+        numbers = np.where(numbers < 0, np.iinfo(np.int64).max, numbers)
+        self._orders = {
+            'number': np.argsort(numbers, kind='stable'),
+            'bikes_desc': np.argsort(-parking, kind='stable'),
+            'bikes_asc': np.argsort(parking, kind='stable'),
+            'utilization_desc': np.argsort(-utilization, kind='stable'),
+            'utilization_asc': np.argsort(utilization, kind='stable')
+        }
+        self.utilization = utilization
+
+    def __len__(self):
+        return len(self.name_codes)
+
+    def query(self, text='', sort='number', page=0, page_size=50):
+        """
+        过滤、排序并分页
+
+        Returns:
+            SearchPage；rows 为快照中的行位置（可直接用于 iloc）
+        """
+        order = self._orders.get(sort, self._orders['number'])
+        name_mask = name_index.match(text)
+        if name_mask is not None:
+            order = order[name_mask[self.name_codes[order]]]
+        total = len(order)
+        pages = max(1, -(-total // page_size))
+        page = min(max(int(page), 0), pages - 1)
+        return SearchPage(order[page * page_size:(page + 1) * page_size], total, page, pages)
+
+_search_cache = OrderedDict()
+_SEARCH_CACHE_SIZE = 2
+_search_lock = threading.Lock()
+
+def search_snapshot(frame, version=None):
+    """返回快照的检索视图；有版本号时同一版本只构建一次"""
+    with _search_lock:
+        if version is not None and version in _search_cache:
+            _search_cache.move_to_end(version)
+            return _search_cache[version]
+    search = SnapshotSearch(frame, version)
+    if version is not None:
+        with _search_lock:
+            _search_cache[version] = search
+            while len(_search_cache) > _SEARCH_CACHE_SIZE:
+                _search_cache.popitem(last=False)
+    return search
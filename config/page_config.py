@@ -8,19 +8,3 @@ def setup_page():
         layout="wide",
         initial_sidebar_state="collapsed"
     )
-
-    # 设置全局样式
-    st.markdown("""
-        <style>
-            .main {
-                max-width: 1920px;
-                padding: 1rem;
-                background-color: white;
-            }
-            
-            /* 隐藏Streamlit默认元素 */
-            #MainMenu {visibility: hidden;}
-            footer {visibility: hidden;}
-            header {visibility: hidden;}
-        </style>
-    """, unsafe_allow_html=True) 
\ No newline at end of file
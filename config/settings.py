@@ -1,3 +1,5 @@
+import os
+
 # 기본 설정
 PAGE_CONFIG = {
     "layout": "wide",
@@ -17,4 +19,95 @@ MAP_CONFIG = {
     "seoul_center": [37.5665, 126.9780],
     "zoom_level": 11,
     "tile_style": 'kakao'  # 카카오맵으로 변경
-} 
\ No newline at end of file
+}
+
+# 서울시 공공자전거 OpenAPI 설정
+# 环境变量 SEOUL_API_BASE_URL / SEOUL_API_KEY 可以指向本地模拟服务（python -m mock_api.seoul_openapi）
+SEOUL_API_CONFIG = {
+    "base_url": os.environ.get("SEOUL_API_BASE_URL", "http://openapi.seoul.go.kr:8088"),
+    "api_key": os.environ.get("SEOUL_API_KEY", "4a5148476d7a657238397858415851"),
+    "page_size": 1000,   # bikeList 单次请求最多返回 1000 条
+    "max_workers": 4,    # 并发请求的最大线程数
+    "timeout": 10,       # 单页请求超时（秒）
+    "rate_limit": 5,     # 令牌桶：每秒最多发出的请求数
+    "burst": 4,          # 令牌桶容量（一次刷新开始时可以立即并发的请求数）
+    "max_retries": 3,    # 单页请求失败后的最大重试次数
+    "backoff_base": 0.5, # 指数退避的基数（秒），第 n 次重试前最多等待 base * 2^n
+    "backoff_max": 8,    # 单次退避的上限（秒）
+    "refresh_budget": 30,     # 一次刷新（所有分页、等待和重试）的时间预算（秒），用完时沿用上一次的快照
+    "breaker_failures": 5,    # 连续多少个请求失败（重试用完后计一次）后熔断
+    "breaker_reset": 60       # 熔断后多少秒再放行一次探测请求
+}
+
+# 快照缓存设置（所有会话共享）
+SNAPSHOT_CONFIG = {
+    "refresh_interval": 300,  # 后台刷新线程的轮询周期（秒）
+    "ttl": 360,               # 略长于刷新周期，后台线程正常工作时请求路径不会触发加载
+    "retry_interval": 30      # 加载失败后，请求路径至少间隔多久再触发加载（秒）
+}
+
+# 站点分级阈值（near_empty / near_full 的判断标准）
+STATION_TIER_CONFIG = {
+    "near_empty_max_bikes": 2,   # 可用车辆 1~2 辆视为即将无车
+    "near_full_max_racks": 2     # 剩余车架 1~2 个视为即将满架
+}
+
+# 历史快照存储（按天分区的 Parquet 文件）
+HISTORY_CONFIG = {
+    "enabled": True,
+    "path": "data/history",
+    "queue_size": 16,          # 写入队列长度，队列满时丢弃新快照而不阻塞页面
+    "row_group_size": 65536
+}
+
+# 最近一次成功刷新的快照（连同分类结果）保存在本地 Arrow 文件中，进程启动时直接内存映射载入，
+# 首次渲染不必等待 OpenAPI，随后由后台刷新追上最新数据
+SNAPSHOT_STORE_CONFIG = {
+    "enabled": True,
+    "path": "data/snapshot/last_good.arrow",
+    "max_age": 86400    # 超过该时间（秒）的文件不再载入
+}
+
+# 행정구역 GeoJSON 多分辨率设置
+# tolerance: 简化容差（度），precision: 坐标保留的小数位数，min_zoom: 该级别适用的最小缩放级别
+GEOJSON_LOD_CONFIG = {
+    "default": "medium",
+    "levels": {
+        "full":   {"tolerance": 0,      "precision": 6, "min_zoom": 15},
+        "high":   {"tolerance": 0.0002, "precision": 5, "min_zoom": 13},
+        "medium": {"tolerance": 0.0008, "precision": 4, "min_zoom": 11},
+        "low":    {"tolerance": 0.003,  "precision": 3, "min_zoom": 0}
+    }
+}
+
+# 流水线指标（Prometheus 文本格式，由独立的后台 HTTP 服务提供 /metrics）
+METRICS_CONFIG = {
+    "enabled": True,
+    "host": os.environ.get("METRICS_HOST", "127.0.0.1"),
+    "port": int(os.environ.get("METRICS_PORT", 9108)),
+    "window": 1024     # 计算分位数时保留的最近观测值个数
+}
+
+# 대여소 목록：检索、排序和分页（每次重绘只发送一页）
+STATION_PANEL_CONFIG = {
+    "page_size": 50,
+    "default_sort": "number"
+}
+
+# 只读 JSON API（python -m api.snapshot_api），供其他工具读取快照，避免各自请求 OpenAPI
+API_CONFIG = {
+    "host": os.environ.get("API_HOST", "127.0.0.1"),
+    "port": int(os.environ.get("API_PORT", 8099)),
+    "gzip_min_bytes": 1024,    # 小于该大小的响应不压缩
+    "gzip_level": 6
+}
+
+# 实时推送（server-sent events）：新快照发布时只把变化推送到打开的页面，地图、列表和统计值在浏览器中原地更新
+PUSH_CONFIG = {
+    "enabled": True,
+    "host": os.environ.get("PUSH_HOST", "127.0.0.1"),
+    "port": int(os.environ.get("PUSH_PORT", 8098)),
+    "public_url": os.environ.get("PUSH_PUBLIC_URL"),   # 浏览器访问的地址，默认为页面主机名 + port
+    "heartbeat": 15,    # 没有消息时发送注释行的间隔（秒），用于发现断开的连接
+    "history": 32       # 保留的最近消息数，重连时据此补发
+}
@@ -0,0 +1,230 @@
+"""
+서울시 공공자전거 OpenAPI (bikeList) 本地模拟服务
+
+实现与真实接口相同的 /{key}/json/bikeList/{start}/{end} 协议（rentBikeStatus.row、list_total_count、
+INFO-200 等结果码），数据来自录制的真实快照或合成数据，并按固定周期变化。
+可以注入延迟、错误、被截断的分页和限流响应，用于在无网络环境下开发和压测抓取流程。
+
+运行:
+    python -m mock_api.seoul_openapi [--stations 3000 | --payload benchmarks/payloads/bikeList.json.gz]
+        [--port 8088] [--tick 60] [--latency 0.2] [--error-rate 0.05] [--rate-limit 20]
+然后以 SEOUL_API_BASE_URL=http://127.0.0.1:8088 启动 dashboard。
+"""
+import argparse
+import gzip
+import json
+import logging
+import random
+import threading
+import time
+
+from flask import Flask, Response, jsonify
+
+try:
+    from benchmarks.fixtures import make_rows
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from benchmarks.fixtures import make_rows
+
+logger = logging.getLogger(__name__)
+
+# bikeList 单次请求最多返回的行数（超过时真实接口返回 ERROR-336）
+MAX_PAGE_SIZE = 1000
+
+def _result(code, message):
+    return {'RESULT': {'CODE': code, 'MESSAGE': message}}
+
+class StationTimeline:
+    """
+    随时间变化的站点快照
+
+    每经过 tick 秒，随机选取 change_rate 比例的站点改变可用车辆数（不超过车架数），
+    使用率随之更新；churn 大于 0 时每个周期还会以该概率移除一个站点或恢复一个已移除的站点。
+    """
+    def __init__(self, rows, tick=60, change_rate=0.1, churn=0.0, seed=0):
+        self.tick = tick
+        self.change_rate = change_rate
+        self.churn = churn
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._rows = [dict(row) for row in rows]
+        self._removed = []
+        self._started = time.monotonic()
+        self.generation = 0
+
+    def rows(self):
+        """返回当前时刻的站点行（推进到当前周期）"""
+        with self._lock:
+            target = int((time.monotonic() - self._started) // self.tick) if self.tick > 0 else 0
+            while self.generation < target:
+                self._advance()
+                self.generation += 1
+            return self._rows
+
+    def _advance(self):
+        rows = [dict(row) for row in self._rows]
+        count = int(len(rows) * self.change_rate)
+        for row in self._rng.sample(rows, min(count, len(rows))):
+            rack_total = int(row['rackTotCnt'])
+            parking = max(0, min(rack_total, int(row['parkingBikeTotCnt']) + self._rng.randint(-3, 3)))
+            row['parkingBikeTotCnt'] = str(parking)
+            row['shared'] = str(parking * 100 // rack_total if rack_total else 0)
+        if self.churn and self._rng.random() < self.churn:
+            if self._removed and self._rng.random() < 0.5:
+                rows.insert(self._rng.randrange(len(rows) + 1), self._removed.pop())
+            elif rows:
+                self._removed.append(rows.pop(self._rng.randrange(len(rows))))
+        # 替换整个列表，正在返回的分页不受影响
+        self._rows = rows
+
+class FaultInjector:
+    """按概率注入延迟、错误、截断分页和限流"""
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, truncate_rate=0.0, rate_limit=0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self.rate_limit = rate_limit
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(rate_limit)
+        self._refilled = time.monotonic()
+
+    def delay(self):
+        with self._lock:
+            seconds = self.latency + self._rng.uniform(0, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def roll(self, rate):
+        with self._lock:
+            return rate > 0 and self._rng.random() < rate
+
+    def truncate(self, rows):
+        """截掉分页末尾的一部分行"""
+        with self._lock:
+            keep = self._rng.randrange(len(rows)) if rows else 0
+        return rows[:keep]
+
+    def allow(self):
+        """令牌桶限流，rate_limit 为每秒请求数（0 表示不限流）"""
+        if not self.rate_limit:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+def create_app(timeline, faults=None, api_key=None):
+    """
+    创建模拟服务
+
+    Args:
+        timeline: StationTimeline
+        faults: FaultInjector，None 表示不注入故障
+        api_key: 只接受该密钥（None 表示接受任意密钥）
+    """
+    faults = faults or FaultInjector()
+    app = Flask(__name__)
+    app.json.ensure_ascii = False
+    stats = {'requests': 0, 'errors': 0, 'truncated': 0, 'rate_limited': 0}
+    stats_lock = threading.Lock()
+
+    def count(name):
+        with stats_lock:
+            stats[name] += 1
+
+    @app.route('/<key>/json/bikeList/<int:start>/<int:end>')
+    @app.route('/<key>/json/bikeList/<int:start>/<int:end>/')
+    def bike_list(key, start, end):
+        count('requests')
+        if not faults.allow():
+            count('rate_limited')
+            response = jsonify(_result('ERROR-429', '요청이 너무 많습니다. 잠시 후 다시 시도하세요.'))
+            response.status_code = 429
+            response.headers['Retry-After'] = '1'
+            return response
+
+        faults.delay()
+        if api_key is not None and key != api_key:
+            return jsonify(_result('INFO-100', '인증키가 유효하지 않습니다.'))
+        if start < 1 or end < start:
+            return jsonify(_result('ERROR-300', '필수 값이 누락되어 있습니다.'))
+        if end - start + 1 > MAX_PAGE_SIZE:
+            return jsonify(_result('ERROR-336', '데이터요청은 한번에 최대 1000건을 넘을 수 없습니다.'))
+        if faults.roll(faults.error_rate):
+            count('errors')
+            # 一半返回 HTTP 500，一半返回 200 + 错误结果码
+            if faults.roll(0.5):
+                return Response('Internal Server Error', status=500)
+            return jsonify(_result('ERROR-500', '서버 오류입니다.'))
+
+        rows = timeline.rows()
+        page = rows[start - 1:end]
+        if not page:
+            return jsonify(_result('INFO-200', '해당하는 데이터가 없습니다.'))
+        if faults.roll(faults.truncate_rate):
+            count('truncated')
+            page = faults.truncate(page)
+        return jsonify({
+            'rentBikeStatus': {
+                'list_total_count': len(rows),
+                **_result('INFO-000', '정상 처리되었습니다.'),
+                'row': page
+            }
+        })
+
+    @app.route('/_mock/status')
+    def status():
+        """模拟服务自身的状态：当前周期、站点数、请求与故障计数"""
+        with stats_lock:
+            counters = dict(stats)
+        return jsonify(dict(counters, generation=timeline.generation, stations=len(timeline.rows())))
+
+    return app
+
+def load_rows(payload=None, stations=3000, seed=0):
+    """读取录制的快照（benchmarks.suite record 的输出），没有时生成合成数据"""
+    if payload:
+        with gzip.open(payload, 'rt', encoding='utf-8') as f:
+            return json.load(f)['rows']
+    return make_rows(stations, seed=seed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8088)
+    parser.add_argument('--payload', help='录制的真实快照（gzip JSON），默认使用合成数据')
+    parser.add_argument('--stations', type=int, default=3000, help='合成数据的站点数')
+    parser.add_argument('--api-key', help='只接受该密钥，默认接受任意密钥')
+    parser.add_argument('--tick', type=float, default=60, help='快照变化周期（秒），0 表示不变化')
+    parser.add_argument('--change-rate', type=float, default=0.1, help='每个周期变化的站点比例')
+    parser.add_argument('--churn', type=float, default=0.0, help='每个周期移除/恢复一个站点的概率')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='额外的随机延迟上限（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回错误的概率')
+    parser.add_argument('--truncate-rate', type=float, default=0.0, help='分页被截断的概率')
+    parser.add_argument('--rate-limit', type=float, default=0, help='每秒允许的请求数，超出时返回 429')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    timeline = StationTimeline(
+        load_rows(args.payload, args.stations, args.seed),
+        tick=args.tick, change_rate=args.change_rate, churn=args.churn, seed=args.seed
+    )
+    faults = FaultInjector(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        truncate_rate=args.truncate_rate, rate_limit=args.rate_limit, seed=args.seed
+    )
+    logger.info(f"Serving {len(timeline.rows())} stations on http://{args.host}:{args.port}")
+    create_app(timeline, faults, args.api_key).run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import hashlib
+import logging
+import re
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+STYLES_DIR = Path(__file__).resolve().parent.parent / 'static' / 'styles'
+
+# 按顺序拼接（后面的规则覆盖前面优先级相同的规则）
+STYLE_SOURCES = ['page.css', 'main.css', 'layout.css', 'header.css', 'map.css', 'station_panel.css']
+
+# 打包后的样式：压缩后的 CSS、内容哈希、压缩前的字节数
+StyleBundle = namedtuple('StyleBundle', ['css', 'digest', 'source_bytes'])
+
+# 引号中的字符串原样保留；注释在字符串之外才是注释
+_STRING_OR_COMMENT = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/''', re.S)
+_WHITESPACE = re.compile(r'\s+')
+_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+_AFTER_COLON = re.compile(r':\s+')
+
+def minify_css(css):
+    """
+    去掉注释和多余的空白
+
+    引号中的字符串（例如 content 的取值）原样保留。
+    冒号之前的空白保留（选择器中 `a :hover` 与 `a:hover` 含义不同），
+    因此 `color : red` 压缩为 `color :red`；calc() 中运算符两侧的空白也保留。
+    """
+    parts = []
+    text = []
+    position = 0
+    for match in _STRING_OR_COMMENT.finditer(css):
+        text.append(css[position:match.start()])
+        position = match.end()
+        if match.group(1):
+            parts.append(_minify_text(''.join(text)))
+            parts.append(match.group(1))
+            text = []
+    text.append(css[position:])
+    parts.append(_minify_text(''.join(text)))
+    return ''.join(parts).strip()
+
+def _minify_text(css):
+    """压缩字符串之外的一段 CSS"""
+    css = _WHITESPACE.sub(' ', css)
+    css = _PUNCTUATION.sub(r'\1', css)
+    css = _AFTER_COLON.sub(':', css)
+    return css.replace(';}', '}')
+
+def build_bundle(sources=None, directory=None):
+    """读取并拼接样式文件，返回压缩后的 StyleBundle"""
+    directory = Path(directory) if directory else STYLES_DIR
+    source = '\n'.join(
+        (directory / name).read_text(encoding='utf-8') for name in (sources or STYLE_SOURCES)
+    )
+    css = minify_css(source)
+    digest = hashlib.blake2b(css.encode('utf-8'), digest_size=8).hexdigest()
+    return StyleBundle(css, digest, len(source.encode('utf-8')))
+
+# 进程级样式包，第一次使用时构建，之后不再读取文件
+_bundle = None
+_bundle_lock = threading.Lock()
+
+def get_bundle():
+    global _bundle
+    with _bundle_lock:
+        if _bundle is None:
+            _bundle = build_bundle()
+            logger.info(
+                f"Style bundle {_bundle.digest}: {_bundle.source_bytes} -> {len(_bundle.css.encode('utf-8'))} bytes"
+            )
+        return _bundle
+
+def get_bundle_html():
+    """样式包的 <style> 元素（同一进程内内容不变）"""
+    bundle = get_bundle()
+    return f'<style data-bundle="{bundle.digest}">{bundle.css}</style>'
+
+def render_styles():
+    """
+    在页面最前面注入样式包（每次重绘都调用）
+
+    Streamlit 会移除本次重绘没有输出的元素，因此每次都要输出；但不小于
+    global.minCachedMessageSize（默认 10KB）的消息由 ForwardMsg 缓存处理：
+    同一会话只在第一次发送完整内容，之后只发送内容哈希的引用，浏览器从缓存中取出。
+    """
+    st.markdown(get_bundle_html(), unsafe_allow_html=True)
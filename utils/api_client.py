@@ -0,0 +1,292 @@
+import logging
+import random
+import threading
+import time
+from config.settings import SEOUL_API_CONFIG
+from utils.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+# 可以重试的 HTTP 状态码（限流和服务端错误）
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class ApiUnavailable(Exception):
+    """上游暂时不可用（时间预算用完、熔断打开或重试后仍失败），调用方应沿用上一次的数据"""
+    reason = 'error'
+
+class BudgetExceeded(ApiUnavailable):
+    reason = 'budget'
+
+class CircuitOpen(ApiUnavailable):
+    reason = 'circuit_open'
+
+class UpstreamError(ApiUnavailable):
+    """请求失败；retryable 为 False 时（例如 4xx）不再重试"""
+    reason = 'upstream'
+
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+class Budget:
+    """一次刷新可以使用的时间（所有分页请求、等待和重试共用）"""
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+class TokenBucket:
+    """
+    令牌桶限流：每秒补充 rate 个令牌，最多积累 burst 个
+
+    acquire 在令牌不足时等待，超过 timeout 仍拿不到令牌时返回 False（不消耗令牌）。
+    """
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def drain(self, seconds):
+        """上游要求等待（429 Retry-After）时，seconds 秒内不再发出请求"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+class CircuitBreaker:
+    """
+    单个接口的熔断器
+
+    closed: 正常请求；连续 failure_threshold 个请求失败后 open（一个请求重试用完后只计一次失败），
+    reset_timeout 秒内直接拒绝；之后 half_open 只放行一个探测请求，成功则 closed，失败则重新 open。
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """是否放行一次请求"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release(self):
+        """放行的请求没有发出（例如预算用完），half_open 时允许下一次探测"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+class OpenApiClient:
+    """
+    서울시 OpenAPI 的共享客户端
+
+    所有请求共用一个 keep-alive 连接池和一个令牌桶；每个接口（例如 bikeList）各有一个熔断器。
+    失败时按带抖动的指数退避重试（full jitter），所有等待都不超过调用方传入的时间预算。
+    """
+    def __init__(self, config=None):
+        config = config or SEOUL_API_CONFIG
+        self.timeout = config['timeout']
+        self.max_retries = config['max_retries']
+        self.backoff_base = config['backoff_base']
+        self.backoff_max = config['backoff_max']
+        self.refresh_budget = config['refresh_budget']
+        self.breaker_failures = config['breaker_failures']
+        self.breaker_reset = config['breaker_reset']
+        self.bucket = TokenBucket(config['rate_limit'], config['burst'])
+        self.pool_size = config['max_workers']
+        self._lock = threading.Lock()
+        self._session = None
+        self._breakers = {}
+        self._rng = random.Random()
+
+    def budget(self, seconds=None):
+        """开始一次刷新的时间预算"""
+        return Budget(self.refresh_budget if seconds is None else seconds)
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                # requests 只在第一次请求时导入（后台刷新线程中），不拖慢页面的首次渲染
+                import requests
+                from requests.adapters import HTTPAdapter
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def breaker(self, endpoint):
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(self.breaker_failures, self.breaker_reset)
+            return breaker
+
+    def breaker_states(self):
+        """各接口熔断器的状态"""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {endpoint: breaker.state for endpoint, breaker in breakers.items()}
+
+    def backoff(self, attempt):
+        """第 attempt 次重试前的等待时间：[0, min(backoff_max, base * 2^attempt)] 内均匀分布"""
+        with self._lock:
+            return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url, endpoint, budget=None, validate=None):
+        """
+        GET 请求，返回响应体字节
+
+        Args:
+            endpoint: 熔断器的名称
+            budget: Budget，None 时使用单独的 refresh_budget
+            validate: validate(body)，响应体表示上游错误时抛出 UpstreamError
+        Raises:
+            ApiUnavailable: 预算用完、熔断打开或重试后仍然失败
+        """
+        budget = budget or self.budget()
+        breaker = self.breaker(endpoint)
+        # 熔断器按逻辑请求计数：只在发出前检查一次，重试用完（或没有时间再重试）后才记一次失败
+        if not breaker.allow():
+            metrics.inc('upstream_rejected_total', endpoint=endpoint, reason='circuit_open')
+            raise CircuitOpen(f"{endpoint} circuit is open")
+        attempt = 0
+        while True:
+            try:
+                body = self._attempt(url, endpoint, budget, validate)
+            except UpstreamError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    breaker.record_failure()
+                    raise
+                wait = max(e.retry_after or 0.0, self.backoff(attempt))
+                if wait >= budget.remaining():
+                    breaker.record_failure()
+                    metrics.inc('upstream_rejected_total', endpoint=endpoint, reason='budget')
+                    raise BudgetExceeded(f"{endpoint}: no time left to retry ({str(e)})") from e
+                if e.retry_after:
+                    self.bucket.drain(e.retry_after)
+                metrics.inc('upstream_retries_total', endpoint=endpoint)
+                time.sleep(wait)
+                attempt += 1
+                continue
+            except BudgetExceeded:
+                metrics.inc('upstream_rejected_total', endpoint=endpoint, reason='budget')
+                # 这次没有发出请求：之前的尝试已经失败时记一次失败，否则不计入熔断
+                if attempt:
+                    breaker.record_failure()
+                else:
+                    breaker.release()
+                raise
+            breaker.record_success()
+            return body
+
+    def _attempt(self, url, endpoint, budget, validate):
+        """发出一次请求（先从令牌桶取令牌，超时不超过剩余预算）"""
+        import requests
+        waited = time.perf_counter()
+        if not self.bucket.acquire(timeout=budget.remaining()):
+            raise BudgetExceeded(f"{endpoint}: rate limit wait exceeds the refresh budget")
+        metrics.observe('upstream_rate_limit_wait_seconds', time.perf_counter() - waited)
+        remaining = budget.remaining()
+        if remaining <= 0:
+            raise BudgetExceeded(f"{endpoint}: refresh budget exhausted")
+
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=min(self.timeout, remaining))
+        except requests.RequestException as e:
+            raise UpstreamError(f"{endpoint}: {str(e)}") from e
+        finally:
+            metrics.observe('upstream_request_seconds', time.perf_counter() - started)
+
+        if response.status_code in RETRYABLE_STATUS:
+            raise UpstreamError(
+                f"{endpoint}: HTTP {response.status_code}",
+                retry_after=_retry_after(response.headers.get('Retry-After'))
+            )
+        if response.status_code >= 400:
+            raise UpstreamError(f"{endpoint}: HTTP {response.status_code}", retryable=False)
+        body = response.content
+        if validate is not None:
+            validate(body)
+        return body
+
+def _retry_after(value):
+    """Retry-After 头（秒数形式），无法解析时返回 None"""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+# 进程级 OpenAPI 客户端
+api_client = OpenApiClient()
+metrics.gauge_callback('upstream_circuit_open', lambda: {
+    (('endpoint', endpoint),): int(state != CircuitBreaker.CLOSED)
+    for endpoint, state in api_client.breaker_states().items()
+})
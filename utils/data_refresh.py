@@ -1,41 +1,64 @@
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import datetime
+import logging
+import threading
 import time
+from config.settings import SNAPSHOT_CONFIG
+from utils.snapshot_cache import snapshot_cache
 
-def should_refresh_data():
-    """检查是否需要刷新数据"""
-    current_time = datetime.now()
-    
-    # 获取或初始化上次更新时间
-    if 'last_update_time' not in st.session_state:
-        st.session_state['last_update_time'] = current_time
-        return True
-        
-    last_update = st.session_state['last_update_time']
-    
-    # 如果距离上次更新已经超过5分钟，则需要更新
-    if (current_time - last_update) >= timedelta(minutes=5):
-        st.session_state['last_update_time'] = current_time
+logger = logging.getLogger(__name__)
+
+REFRESHER_THREAD_NAME = 'snapshot-refresher'
+_refresher_lock = threading.Lock()
+
+def _refresh_loop(refresh, interval):
+    """后台线程：按固定周期从 API 加载并发布新快照"""
+    while True:
+        try:
+            refresh()
+        except Exception as e:
+            logger.error(f"Error refreshing snapshot: {str(e)}")
+        time.sleep(interval)
+
+def start_refresher(refresh, interval=None):
+    """启动进程级后台刷新线程（整个进程只启动一次）"""
+    with _refresher_lock:
+        # 按线程名判断，避免 Streamlit 重新加载模块后重复启动
+        if any(t.name == REFRESHER_THREAD_NAME and t.is_alive() for t in threading.enumerate()):
+            return False
+        thread = threading.Thread(
+            target=_refresh_loop,
+            args=(refresh, interval or SNAPSHOT_CONFIG['refresh_interval']),
+            name=REFRESHER_THREAD_NAME,
+            daemon=True
+        )
+        thread.start()
         return True
-    return False
 
-def update_timestamp():
-    """更新时间戳"""
-    st.session_state['last_update_time'] = datetime.now()
+def should_refresh_data():
+    """检查是否有新的数据快照（只比较版本号，不请求 API）"""
+    return st.session_state.get('snapshot_version') != snapshot_cache.version
 
 def get_current_time():
     """获取当前时间"""
     return datetime.now()
 
 def get_last_update_time():
-    """获取上次更新时间"""
-    if 'last_update_time' not in st.session_state:
-        st.session_state['last_update_time'] = datetime.now()
-    return st.session_state['last_update_time']
-
-def setup_auto_refresh():
-    """设置自动刷新"""
-    # 使用 Streamlit 的 rerun 触发自动刷新
-    if should_refresh_data():
-        time.sleep(1)  # 短暂延迟以避免过于频繁刷新
-        st.rerun()
+    """获取当前会话所用快照的更新时间"""
+    snapshot = snapshot_cache.peek()
+    # 上游内容未变时快照版本不变，但抓取时间会更新
+    if snapshot is not None and (
+        'last_update_time' not in st.session_state
+        or st.session_state.get('snapshot_version') == snapshot.version
+    ):
+        return snapshot.fetched_at
+    return st.session_state.get('last_update_time', datetime.now())
+
+def is_data_stale():
+    """最近一次刷新是否失败（页面仍在显示上一次成功获取的快照）"""
+    snapshot = snapshot_cache.peek()
+    return snapshot is not None and snapshot.stale
+
+def setup_auto_refresh(refresh):
+    """设置自动刷新：启动后台刷新线程，会话中不再 sleep 和主动 rerun"""
+    start_refresher(refresh)
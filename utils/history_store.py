@@ -0,0 +1,215 @@
+import functools
+import logging
+import operator
+import queue
+import threading
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from config.settings import HISTORY_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 历史记录的列：每个快照中的每个站点一行
+HISTORY_SCHEMA = pa.schema([
+    ('ts', pa.timestamp('s')),
+    ('stationId', pa.string()),          # Parquet 中按字典编码存储
+    ('parkingBikeTotCnt', pa.int16()),
+    ('rackTotCnt', pa.int16()),
+    ('shared', pa.int16())
+])
+COUNT_COLUMNS = ['parkingBikeTotCnt', 'rackTotCnt', 'shared']
+DAY_FILE = 'day.parquet'
+
+# pyarrow.parquet / pyarrow.dataset 导入较慢，只在写入、合并和读取时（后台线程或历史视图中）才导入
+
+class HistoryStore:
+    """
+    本地只追加的站点历史存储
+
+    目录结构: <path>/date=YYYY-MM-DD/part-*.parquet
+    每个快照写成当天分区下的一个小文件；进入新的一天后，前一天的小文件会被合并为
+    按 (stationId, ts) 排序的 day.parquet，读取时可以按时间窗口裁剪分区、
+    按站点利用行组统计信息跳过无关数据。
+    写入在后台线程中进行，append() 永远不会阻塞页面。
+    """
+    def __init__(self, path, queue_size=16, row_group_size=65536):
+        self.path = Path(path)
+        self.row_group_size = row_group_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._stats = {'written': 0, 'dropped': 0, 'compacted_days': 0}
+
+    def append(self, snapshot):
+        """将快照放入写入队列（不阻塞，队列满时丢弃该快照）"""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(snapshot)
+        except queue.Full:
+            self._stats['dropped'] += 1
+            logger.warning(f"History queue full, dropping snapshot v{snapshot.version}")
+
+    def get_stats(self):
+        """返回写入/丢弃/合并计数"""
+        return dict(self._stats, pending=self._queue.qsize())
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name='history-writer', daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            snapshot = self._queue.get()
+            try:
+                self.write_snapshot(snapshot)
+                self.compact_pending(before=snapshot.fetched_at.date())
+            except Exception as e:
+                logger.error(f"Error writing history snapshot v{snapshot.version}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """等待队列中的快照全部写入"""
+        self._queue.join()
+
+    def write_snapshot(self, snapshot):
+        """同步写入一个快照"""
+        df = snapshot.data
+        count = len(df)
+        table = pa.table({
+            'ts': pa.array(np.full(count, np.datetime64(snapshot.fetched_at, 's'))),
+            'stationId': pa.array(np.asarray(df['stationId'], dtype=object), pa.string()),
+            **{col: pa.array(df[col].to_numpy(), pa.int16()) for col in COUNT_COLUMNS}
+        }, schema=HISTORY_SCHEMA)
+
+        day_dir = self._day_dir(snapshot.fetched_at.date())
+        day_dir.mkdir(parents=True, exist_ok=True)
+        name = f"part-{snapshot.fetched_at:%H%M%S%f}.parquet"
+        self._write_atomic(table, day_dir / name)
+        self._stats['written'] += 1
+
+    def compact_pending(self, before):
+        """合并 before 之前所有仍有小文件的日期分区"""
+        if not self.path.exists():
+            return
+        for day_dir in sorted(self.path.glob('date=*')):
+            if day_dir.name[5:] < before.isoformat() and any(day_dir.glob('part-*.parquet')):
+                self.compact_day_dir(day_dir)
+
+    def compact_day(self, day):
+        """将某一天的小文件合并为 day.parquet"""
+        return self.compact_day_dir(self._day_dir(day))
+
+    def compact_day_dir(self, day_dir):
+        parts = sorted(day_dir.glob('part-*.parquet'))
+        if not parts:
+            return False
+        import pyarrow.parquet as pq
+        sources = parts + ([day_dir / DAY_FILE] if (day_dir / DAY_FILE).exists() else [])
+        table = pa.concat_tables([pq.read_table(p, schema=HISTORY_SCHEMA) for p in sources])
+        table = table.sort_by([('stationId', 'ascending'), ('ts', 'ascending')])
+        self._write_atomic(table, day_dir / DAY_FILE)
+        for part in parts:
+            part.unlink()
+        self._stats['compacted_days'] += 1
+        return True
+
+    def _write_atomic(self, table, target):
+        import pyarrow.parquet as pq
+        tmp = target.with_name(target.name + '.tmp')
+        pq.write_table(
+            table, tmp,
+            row_group_size=self.row_group_size,
+            compression='zstd',
+            use_dictionary=['stationId']
+        )
+        tmp.replace(target)
+
+    def _day_dir(self, day):
+        return self.path / f"date={day.isoformat()}"
+
+    def read(self, start, end, station_ids=None, columns=None):
+        """
+        读取 [start, end) 时间窗口内的历史记录
+
+        Args:
+            start, end: datetime，按天裁剪分区
+            station_ids: 可选，只读取这些站点
+            columns: 可选，只读取这些列
+        Returns:
+            DataFrame，stationId 为 Categorical
+        """
+        files = self._list_files(start, end)
+        if not files:
+            return pd.DataFrame(columns=columns or HISTORY_SCHEMA.names)
+
+        import pyarrow.dataset as ds
+        expression = (
+            (ds.field('ts') >= pa.scalar(start, pa.timestamp('s'))) &
+            (ds.field('ts') < pa.scalar(end, pa.timestamp('s')))
+        )
+        if station_ids is not None:
+            expression &= self._station_filter([str(s) for s in station_ids])
+
+        try:
+            table = self._read_files(files, columns, expression)
+        except FileNotFoundError:
+            # 读取期间小文件被合并，重新列出文件后再读一次（只重试一次，再失败时抛出）
+            files = self._list_files(start, end)
+            if not files:
+                return pd.DataFrame(columns=columns or HISTORY_SCHEMA.names)
+            table = self._read_files(files, columns, expression)
+
+        if 'stationId' in table.column_names:
+            index = table.column_names.index('stationId')
+            table = table.set_column(index, 'stationId', table.column('stationId').dictionary_encode())
+        return table.to_pandas()
+
+    def _list_files(self, start, end):
+        """[start, end] 涉及的各天分区中的 parquet 文件"""
+        files = []
+        day = start.date()
+        while day <= end.date():
+            day_dir = self._day_dir(day)
+            if day_dir.exists():
+                files.extend(str(f) for f in sorted(day_dir.glob('*.parquet')))
+            day += timedelta(days=1)
+        return files
+
+    @staticmethod
+    def _read_files(files, columns, expression):
+        import pyarrow.dataset as ds
+        return ds.dataset(files, format='parquet', schema=HISTORY_SCHEMA).to_table(
+            columns=columns, filter=expression
+        )
+
+    @staticmethod
+    def _station_filter(station_ids):
+        """站点过滤条件：少量站点时用等值条件的 OR，使行组统计信息可以跳过无关行组（isin 不会裁剪）"""
+        import pyarrow.dataset as ds
+        field = ds.field('stationId')
+        if not station_ids or len(station_ids) > 64:
+            return field.isin(station_ids)
+        return functools.reduce(operator.or_, (field == station_id for station_id in station_ids))
+
+    def hourly_totals(self, start, end):
+        """按小时统计全市可用自行车总数（每小时内各快照总数的平均值）"""
+        df = self.read(start, end, columns=['ts', 'parkingBikeTotCnt'])
+        if df.empty:
+            return pd.Series(dtype='float64')
+        per_snapshot = df.groupby('ts')['parkingBikeTotCnt'].sum()
+        return per_snapshot.groupby(per_snapshot.index.floor('h')).mean()
+
+# 进程级历史存储
+history_store = HistoryStore(
+    HISTORY_CONFIG['path'],
+    queue_size=HISTORY_CONFIG['queue_size'],
+    row_group_size=HISTORY_CONFIG['row_group_size']
+)
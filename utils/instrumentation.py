@@ -0,0 +1,214 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config.settings import METRICS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'bikedash_'
+QUANTILES = (0.5, 0.9, 0.99)
+
+# 指标说明：名称 -> (类型, 说明)
+METRIC_HELP = {
+    'pipeline_stage_seconds': ('summary', 'Duration of each ingest/derive/render stage'),
+    'pipeline_stage_errors_total': ('counter', 'Stages that raised an exception'),
+    'upstream_request_seconds': ('summary', 'Latency of bikeList page requests'),
+    'upstream_page_rows': ('summary', 'Rows returned per bikeList page'),
+    'upstream_page_errors_total': ('counter', 'Failed bikeList page requests by page start and kind'),
+    'snapshot_age_seconds': ('gauge', 'Seconds since the current snapshot was fetched'),
+    'snapshot_version': ('gauge', 'Version of the current snapshot'),
+    'snapshot_stations': ('gauge', 'Stations in the current snapshot'),
+    'snapshot_cache_requests_total': ('counter', 'Snapshot cache lookups and refreshes by result'),
+    'snapshots_unchanged_total': ('counter', 'Refreshes whose pages all matched the previous snapshot'),
+    'upstream_pages_total': ('counter', 'bikeList pages by whether their body changed since the last fetch'),
+    'upstream_decode_skipped_bytes_total': ('counter', 'Bytes of unchanged page bodies that were not decoded'),
+    'push_messages_total': ('counter', 'Live update messages published by event type'),
+    'push_message_bytes': ('summary', 'Encoded size of each published live update message'),
+    'push_sent_bytes_total': ('counter', 'Bytes written to live update connections'),
+    'push_clients': ('gauge', 'Open live update connections'),
+    'upstream_retries_total': ('counter', 'Upstream requests retried after a retryable failure'),
+    'upstream_rejected_total': ('counter', 'Upstream requests not sent because the circuit was open or the budget ran out'),
+    'upstream_rate_limit_wait_seconds': ('summary', 'Time spent waiting for a rate limiter token'),
+    'upstream_circuit_open': ('gauge', 'Whether the circuit breaker of an endpoint is not closed'),
+    'refresh_aborted_total': ('counter', 'Refreshes abandoned in favour of the last good snapshot by reason'),
+    'snapshot_stale': ('gauge', 'Whether the current snapshot is being served after a failed refresh'),
+    'snapshot_store_bytes': ('gauge', 'Size of the locally saved last good snapshot file')
+}
+
+class _Summary:
+    """计数、总和，以及最近 window 个观测值（分位数在抓取时才计算）"""
+    __slots__ = ('count', 'total', 'recent')
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def quantiles(self):
+        values = sorted(self.recent)
+        if not values:
+            return [(q, float('nan')) for q in QUANTILES]
+        return [(q, values[min(len(values) - 1, int(q * len(values)))]) for q in QUANTILES]
+
+class Metrics:
+    """
+    进程级指标注册表
+
+    记录路径上只做一次加锁和常数时间的更新；分位数排序、格式化等开销都放在抓取时。
+    回调指标（gauge_callback）在抓取时才取值，适合快照时效这类随时间变化的量。
+    """
+    def __init__(self, window=1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}
+        self._callbacks = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _Summary(self.window)
+            summary.observe(value)
+
+    def gauge_callback(self, name, func):
+        """注册回调：抓取时调用 func()，返回数值或 {labels tuple: 数值}"""
+        self._callbacks[name] = func
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """记录一个阶段的耗时（秒），阶段抛出异常时同时计数"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc('pipeline_stage_errors_total', stage=stage, **labels)
+            raise
+        finally:
+            self.observe('pipeline_stage_seconds', time.perf_counter() - started, stage=stage, **labels)
+
+    def get_stats(self):
+        """返回各阶段耗时的计数和中位数（秒），便于日志和调试"""
+        with self._lock:
+            return {
+                dict(labels).get('stage'): {'count': summary.count, 'p50': summary.quantiles()[0][1]}
+                for (name, labels), summary in self._summaries.items()
+                if name == 'pipeline_stage_seconds'
+            }
+
+    def render(self):
+        """生成 Prometheus 文本格式"""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            summaries = {key: (s.count, s.total, s.quantiles()) for key, s in self._summaries.items()}
+
+        for name, func in self._callbacks.items():
+            try:
+                value = func()
+            except Exception as e:
+                logger.error(f"Error collecting metric {name}: {str(e)}")
+                continue
+            target = counters if METRIC_HELP.get(name, ('gauge',))[0] == 'counter' else gauges
+            if isinstance(value, dict):
+                for labels, item in value.items():
+                    target[(name, labels)] = item
+            elif value is not None:
+                target[(name, ())] = value
+
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described:
+                described.add(name)
+                kind, text = METRIC_HELP.get(name, ('untyped', name))
+                lines.append(f"# HELP {PREFIX}{name} {text}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()) + sorted(gauges.items()):
+            describe(name)
+            lines.append(f"{PREFIX}{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), (count, total, quantiles) in sorted(summaries.items()):
+            describe(name)
+            for q, value in quantiles:
+                lines.append(f"{PREFIX}{name}{_labels(labels + (('quantile', str(q)),))} {_number(value)}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+def _number(value):
+    if isinstance(value, float):
+        return 'NaN' if value != value else repr(value)
+    return str(value)
+
+# 进程级指标
+metrics = Metrics(window=METRICS_CONFIG['window'])
+span = metrics.span
+
+METRICS_THREAD_NAME = 'metrics-server'
+_server_lock = threading.Lock()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_metrics_server(host=None, port=None):
+    """在后台线程中启动 /metrics 服务（整个进程只启动一次），端口被占用时只记录警告"""
+    with _server_lock:
+        if any(t.name == METRICS_THREAD_NAME and t.is_alive() for t in threading.enumerate()):
+            return None
+        host = host or METRICS_CONFIG['host']
+        port = METRICS_CONFIG['port'] if port is None else port
+        try:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            logger.warning(f"Metrics server not started on {host}:{port}: {str(e)}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name=METRICS_THREAD_NAME, daemon=True).start()
+        logger.info(f"Metrics available at http://{host}:{server.server_port}/metrics")
+        return server
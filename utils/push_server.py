@@ -0,0 +1,180 @@
+import logging
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from config.settings import PUSH_CONFIG
+from utils.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+PUSH_THREAD_NAME = 'push-server'
+_server_lock = threading.Lock()
+
+def encode_event(event, data, event_id=None):
+    """编码一条 server-sent event（data 为不含换行的字符串）"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+class PushHub:
+    """
+    server-sent events 的广播中心
+
+    每条消息只编码一次，追加到共享的日志中；每个连接只保存自己读到的位置，
+    新消息到达时被唤醒、把日志中新的字节原样写出。发布的开销与连接数无关，
+    每个连接的开销只是一次唤醒和一次 socket 写入。
+    消息 id 为快照版本，断线重连（Last-Event-ID）或首次连接（?since=版本）时从日志中补发；
+    日志中已经没有所需的消息时发送 reset。
+    """
+    def __init__(self, history=32):
+        self._cond = threading.Condition()
+        self._log = deque(maxlen=history)   # (序号, 消息 id, 编码后的字节)
+        self._seq = 0
+        self._clients = 0
+        self._stats = {'published': 0, 'published_bytes': 0, 'sent_bytes': 0, 'resets': 0}
+
+    @property
+    def clients(self):
+        return self._clients
+
+    def publish(self, event, data, event_id=None):
+        """广播一条消息"""
+        message = encode_event(event, data, event_id)
+        with self._cond:
+            self._seq += 1
+            self._log.append((self._seq, event_id, message))
+            self._stats['published'] += 1
+            self._stats['published_bytes'] += len(message)
+            self._cond.notify_all()
+        metrics.inc('push_messages_total', event=event)
+        metrics.observe('push_message_bytes', len(message))
+        return message
+
+    def get_stats(self):
+        with self._cond:
+            return dict(self._stats, clients=self._clients)
+
+    def _start_cursor(self, since):
+        """
+        计算新连接的起始位置，返回 (序号, 需要先补发的消息列表)
+
+        since 为客户端已经应用的消息 id（快照版本）；日志中找不到它时返回 reset。
+        """
+        with self._cond:
+            if since is None or not self._log:
+                return self._seq, []
+            ids = [event_id for _, event_id, _ in self._log]
+            if since in ids:
+                position = ids.index(since)
+                return self._seq, [message for _, _, message in list(self._log)[position + 1:]]
+            latest = self._log[-1][1]
+            if since == latest:
+                return self._seq, []
+            self._stats['resets'] += 1
+            return self._seq, [encode_event('reset', str(latest), latest)]
+
+    def stream(self, write, since=None, heartbeat=15.0, stop=None):
+        """
+        在当前线程中向一个连接持续写出消息，连接断开（write 抛出异常）或 stop 被设置时返回
+
+        Args:
+            write: 写出字节的函数
+            since: 客户端已经应用的消息 id
+        """
+        cursor, backlog = self._start_cursor(since)
+        with self._cond:
+            self._clients += 1
+        try:
+            write(b'retry: 3000\n\n' + b''.join(backlog))
+            while stop is None or not stop.is_set():
+                with self._cond:
+                    if self._seq == cursor:
+                        self._cond.wait(heartbeat)
+                    if self._seq == cursor:
+                        pending = None
+                    elif self._log and self._log[0][0] > cursor + 1:
+                        # 连接太慢，需要的消息已经不在日志中
+                        self._stats['resets'] += 1
+                        latest = self._log[-1][1]
+                        pending = encode_event('reset', str(latest), latest)
+                    else:
+                        pending = b''.join(message for seq, _, message in self._log if seq > cursor)
+                    cursor = self._seq
+                # 在锁外写 socket，慢连接不影响其他连接
+                if pending is None:
+                    write(b': ping\n\n')
+                    continue
+                write(pending)
+                with self._cond:
+                    self._stats['sent_bytes'] += len(pending)
+                metrics.inc('push_sent_bytes_total', len(pending))
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+        finally:
+            with self._cond:
+                self._clients -= 1
+
+# 进程级推送中心
+push_hub = PushHub(history=PUSH_CONFIG['history'])
+metrics.gauge_callback('push_clients', lambda: push_hub.clients)
+
+class _PushHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/events':
+            self.send_error(404)
+            return
+        since = self.headers.get('Last-Event-ID') or parse_qs(url.query).get('since', [None])[0]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'keep-alive')
+        # dashboard 页面与推送服务端口不同
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+
+        def write(data):
+            self.wfile.write(data)
+            self.wfile.flush()
+
+        self.server.hub.stream(write, since=_parse_version(since), heartbeat=PUSH_CONFIG['heartbeat'])
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+def _parse_version(value):
+    try:
+        return int(value) if value not in (None, '') else None
+    except ValueError:
+        return None
+
+def create_push_server(hub=None, host=None, port=None):
+    """创建（不启动）推送服务"""
+    server = ThreadingHTTPServer(
+        (host or PUSH_CONFIG['host'], PUSH_CONFIG['port'] if port is None else port), _PushHandler
+    )
+    server.daemon_threads = True
+    server.hub = hub or push_hub
+    return server
+
+def start_push_server(hub=None, host=None, port=None):
+    """在后台线程中启动 /events 推送服务（整个进程只启动一次），端口被占用时只记录警告"""
+    with _server_lock:
+        if any(t.name == PUSH_THREAD_NAME and t.is_alive() for t in threading.enumerate()):
+            return None
+        try:
+            server = create_push_server(hub, host, port)
+        except OSError as e:
+            logger.warning(f"Push server not started: {str(e)}")
+            return None
+        threading.Thread(target=server.serve_forever, name=PUSH_THREAD_NAME, daemon=True).start()
+        host, port = server.server_address[:2]
+        logger.info(f"Live updates available at http://{host}:{port}/events")
+        return server
@@ -0,0 +1,161 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from config.settings import SNAPSHOT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 不可变的数据快照：version 每次发布新数据时递增；stale 表示最近一次刷新失败（或启动时载入的本地快照尚未刷新），仍在使用这份数据
+Snapshot = namedtuple('Snapshot', ['version', 'data', 'fetched_at', 'stale'], defaults=[False])
+
+class _Flight:
+    """一次正在进行中的加载"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+class SnapshotCache:
+    """
+    进程级快照缓存
+
+    所有会话和组件共享同一份数据：缓存有效期内直接返回缓存，
+    过期后第一个调用者负责加载，其余并发调用者等待同一次加载的结果（single-flight）。
+    已有快照时过期不阻塞请求（stale-while-revalidate）：立即返回当前快照，在后台线程中加载。
+    后台刷新线程通过 refresh() 发布新版本，会话只需比较 version 即可知道是否有新数据。
+    加载失败时沿用上一次的快照并标记 stale，直到下一次加载成功。
+    """
+    def __init__(self, ttl, retry_interval=30):
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self._retry_at = 0.0
+        # 还没有快照时最近一次失败的结果（空的过期快照），retry_interval 内直接返回它
+        self._failed = None
+        self._flight = None
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'unchanged': 0, 'revalidating': 0, 'failed': 0}
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """注册回调，每次发布新快照后以 callback(snapshot) 调用"""
+        self._subscribers.append(callback)
+
+    @property
+    def version(self):
+        """当前已发布快照的版本号，尚未发布时为 0"""
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else 0
+
+    def peek(self):
+        """返回当前快照（可能为 None），不触发加载"""
+        return self._snapshot
+
+    def get(self, loader):
+        """获取缓存快照；还没有快照时调用 loader() 加载，已有快照但已过期时返回它并在后台加载"""
+        with self._lock:
+            snapshot = self._snapshot
+            now = time.monotonic()
+            # 加载失败后 retry_interval 秒内不再由请求路径触发加载（还没有快照时返回空的过期快照）
+            if snapshot is None and self._failed is not None and now < self._retry_at:
+                self._stats['hits'] += 1
+                return self._failed
+            if snapshot is not None and (now - self._loaded_at < self.ttl or now < self._retry_at):
+                self._stats['hits'] += 1
+                return snapshot
+            if snapshot is not None and not snapshot.data.empty:
+                self._stats['revalidating'] += 1
+                if self._flight is None:
+                    threading.Thread(
+                        target=self._load, args=(loader, False), name='snapshot-revalidate', daemon=True
+                    ).start()
+                return snapshot
+        return self._load(loader, count=True)
+
+    def restore(self, data, fetched_at):
+        """
+        发布进程启动前保存的快照（版本 1，标记为 stale，不通知订阅者）
+
+        只在还没有快照时生效，否则返回 None。缓存视为已过期：
+        下一次 get 立即返回它，同时在后台加载新数据。
+        """
+        with self._lock:
+            if self._snapshot is not None or data is None or data.empty:
+                return None
+            self._snapshot = Snapshot(1, data, fetched_at, stale=True)
+            self._loaded_at = 0.0
+            return self._snapshot
+
+    def refresh(self, loader):
+        """强制加载一次新数据（与正在进行的加载合并）"""
+        return self._load(loader, count=False)
+
+    def _load(self, loader, count):
+        with self._lock:
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+            if count:
+                # 已有加载在进行中时，等待它的结果
+                self._stats['misses' if leader else 'coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            return flight.result
+
+        published = False
+        try:
+            data = loader()
+            with self._lock:
+                if self._snapshot is not None and data is self._snapshot.data:
+                    # 加载器返回了同一份数据（上游内容未变）：版本号不变，只更新抓取时间
+                    self._snapshot = self._snapshot._replace(fetched_at=datetime.now(), stale=False)
+                    self._loaded_at = time.monotonic()
+                    self._stats['unchanged'] += 1
+                    flight.result = self._snapshot
+                elif data is not None and not getattr(data, 'empty', False):
+                    self._snapshot = Snapshot(self.version + 1, data, datetime.now())
+                    self._loaded_at = time.monotonic()
+                    flight.result = self._snapshot
+                    published = True
+                else:
+                    # 加载失败时沿用上一次的快照（若有）并标记为过期，retry_interval 秒后 get 才会再次尝试
+                    self._stats['failed'] += 1
+                    self._retry_at = time.monotonic() + self.retry_interval
+                    if self._snapshot is not None:
+                        self._snapshot = self._snapshot._replace(stale=True)
+                    flight.result = self._snapshot or Snapshot(0, data, datetime.now(), True)
+                    if self._snapshot is None:
+                        self._failed = flight.result
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.done.set()
+
+        if published:
+            self._notify(flight.result)
+        return flight.result
+
+    def _notify(self, snapshot):
+        """通知订阅者有新快照，单个订阅者出错不影响其他订阅者"""
+        for callback in self._subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Error in snapshot subscriber {callback}: {str(e)}")
+
+    def invalidate(self):
+        """使缓存失效，下一次 get 会重新加载"""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def get_stats(self):
+        """返回命中/未命中/合并请求/内容未变/后台重新加载/加载失败计数"""
+        with self._lock:
+            return dict(self._stats)
+
+# 进程级快照缓存，所有会话和组件共用同一次 API 请求结果
+snapshot_cache = SnapshotCache(ttl=SNAPSHOT_CONFIG['ttl'], retry_interval=SNAPSHOT_CONFIG['retry_interval'])